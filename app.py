@@ -4,36 +4,38 @@ import pandas as pd
 import ast
 from collections import Counter
 from itertools import combinations
-import nltk
-import ssl
 
 st.set_page_config(layout = 'wide')
 
-# This is a direct approach to ensure data is downloaded on deployment.
-try:
-    _create_unverified_https_context = ssl._create_unverified_context
-except AttributeError:
-    pass
-else:
-    ssl._create_default_https_context = _create_unverified_https_context
-
-# List of packages to ensure are downloaded
-packages = ['punkt', 'wordnet', 'omw-1.4', 'punkt_tab']
-for package in packages:
-    # This will download the package if it's not already present
-    # and do nothing if it is. The `quiet=True` flag supresses verbose output.
-    nltk.download(package, quiet=True)
-
-# --- Imports that depend on NLTK data ---
-# This now happens AFTER the download is complete.
-from src.data_cleaner import load_project_data
-from src.map_visualizations import (
-    create_layered_map,
-    create_species_diversity_chart,
-    create_goals_wordcloud,
-    create_impact_category_chart,
-    create_tree_type_chart
+# NLTK data is never downloaded here: the goal term counts are computed when the dataset is built,
+# from the data vendored by `python -m src.data_cleaner download-nltk`.
+# The chart module pulls in Plotly and the TES layer, so each page imports it only when it renders
+# (`python -m src.import_report` tracks the cost).
+from src.data_cleaner import (
+    DEFAULT_FILE_PATHS,
+    ROW_HASH_COLUMN,
+    TES_PRIORITY_LABELS,
+    load_project_data,
+    load_project_text,
+    without_encoded_columns
 )
+from src.compaction import with_list_values
+from src.filter_index import (
+    ORGANIZATION_COLUMN,
+    PRIORITY_COLUMN,
+    STATE_COLUMN,
+    apply_filters,
+    canonical_selection,
+    get_filter_index,
+    organization_options
+)
+from src.figure_cache import start_figure_prewarm
+from src.instrumentation import configure_timing_log, finish_rerun, start_rerun, timed, timed_fragment
+from src.rollup import get_rollup_cube, rollup_metrics
+
+# Stage timings go to the JSON log named by FAITHINPLACE_TIMING_LOG and, with ?debug=1, to a sidebar panel
+configure_timing_log()
+rerun_trace = start_rerun()
 
 st.markdown("""
 <style>
@@ -112,40 +114,43 @@ if st.sidebar.button("Community & Workforce Impact"):
     st.session_state.page = "Community & Workforce Impact"
 
 # --- DATA LOADING AND FILTERING ---
-df = load_project_data({
-    'original_data': "data/Geocoded_MCDC-Sample-Info.csv",
-    'new_data': "data/usda_species_extracted_with_ollama_and_goals.csv"
-})
+# Timed here as well, since the stages inside only run on a cache miss
+with timed("load_project_data") as timing:
+    df = load_project_data(DEFAULT_FILE_PATHS)
+    timing["rows"] = len(df) if df is not None else 0
 
 # Initialize filtered_df in case the data fails to load
 filtered_df = None
+selected_states = None
+selection = None
+rollup = None
+organization_filter_active = False
 
 if df is not None:
-    # Start with a copy that we will progressively filter
-    filtered_df = df.copy()
+    # Selections are resolved against the cached filter index and applied in one positional take at the end
+    filter_index = get_filter_index(df)
+    selections = {}
+    # The charts of the unfiltered pages are built into the shared figure cache in the background
+    start_figure_prewarm(df, filter_index.values.get(STATE_COLUMN))
     
     st.sidebar.subheader("Global Filters")
 
     # --- NEW: STATE FILTER ---
-    if 'Project Location State' in df.columns:
-        states = sorted(df['Project Location State'].unique().tolist())
+    if STATE_COLUMN in filter_index.values:
+        states = filter_index.values[STATE_COLUMN]
         selected_states = st.sidebar.multiselect(
             "Filter by State(s):",
             states,
             default=states, # Default to all states selected
             key="state_multiselect_filter"
         )
-        # Apply the state filter first
-        if selected_states:
-            filtered_df = filtered_df[filtered_df['Project Location State'].isin(selected_states)]
+        selections[STATE_COLUMN] = selected_states
 
     # --- EXISTING: ORGANIZATION NAME FILTER ---
-    # This filter now works on the dataframe that may have already been filtered by state
-    if 'Organization Name' in filtered_df.columns:
-        # Get organization names from the *already filtered* df
-        organization_names = sorted(filtered_df['Organization Name'].unique().tolist())
+    # The options only list organizations with projects in the selected states
+    if ORGANIZATION_COLUMN in filter_index.values:
         all_orgs_option = "All Organizations"
-        organization_names.insert(0, all_orgs_option)
+        organization_names = [all_orgs_option] + organization_options(filter_index, selected_states)
 
         selected_organizations = st.sidebar.multiselect(
             "Filter by Organization(s):",
@@ -156,7 +161,112 @@ if df is not None:
 
         # Only apply this filter if a specific organization is chosen
         if all_orgs_option not in selected_organizations and selected_organizations:
-            filtered_df = filtered_df[filtered_df['Organization Name'].isin(selected_organizations)]
+            selections[ORGANIZATION_COLUMN] = selected_organizations
+            organization_filter_active = True
+
+    # --- TREE EQUITY PRIORITY FILTER ---
+    if PRIORITY_COLUMN in filter_index.values:
+        priority_bands = [band for band in TES_PRIORITY_LABELS + ['Unknown'] if band in filter_index.positions[PRIORITY_COLUMN]]
+        selected_priorities = st.sidebar.multiselect(
+            "Filter by Tree Equity Priority:",
+            priority_bands,
+            default=priority_bands,
+            key="tes_priority_multiselect_filter",
+            help="Priority band of the block group each project is in. Lower Tree Equity Scores mean higher priority."
+        )
+        if selected_priorities and len(selected_priorities) < len(priority_bands):
+            selections[PRIORITY_COLUMN] = selected_priorities
+
+    with timed("filters: apply", rows=len(df)) as timing:
+        filtered_df = apply_filters(df, filter_index, selections)
+        timing["selected_rows"] = len(filtered_df)
+    # Sessions with the same effective filters share their chart figures
+    selection = canonical_selection(filter_index, selections)
+    # Summary measures of any selection are read from the cube's cells instead of the filtered rows
+    rollup = get_rollup_cube(df)
+
+# --- PAGE COMPONENTS ---
+# Each component is a fragment: its own widgets rerun only the component, with the arguments of the
+# last full run. The sidebar filters and page buttons live outside every fragment, so changing them
+# reruns the script and hands every component the new filtered rows and selection.
+
+@timed_fragment("fragment: project details")
+def project_details(projects_df, dataset_version):
+    # The application text isn't part of the cached dataset; it is fetched only for the chosen project
+    project_labels = dict(zip(
+        projects_df['Project Key'],
+        projects_df['Organization Name'].astype(str) + " (" + projects_df['Project Location City'].astype(object).fillna("Unknown city") + ")"
+    ))
+    selected_project = st.selectbox(
+        "Read a project's application:",
+        list(project_labels),
+        index=None,
+        format_func=project_labels.get,
+        placeholder="Choose a project",
+        key="project_detail_select"
+    )
+    if selected_project is not None:
+        project_text = load_project_text(selected_project, dataset_version, DEFAULT_FILE_PATHS)
+        if not project_text:
+            st.info("No application text is available for this project.")
+        for field, text in project_text.items():
+            with st.expander(field, expanded=field == 'Project Description'):
+                st.write(text)
+
+
+@timed_fragment("fragment: map")
+def map_panel(map_df, selection, states, clip_to_projects, marker_index):
+    from src.map_markers import MAX_INDIVIDUAL_MARKERS
+    from src.map_visualizations import create_layered_map
+
+    # The map settings only change the map, so they are drawn by its fragment
+    st.sidebar.subheader("Map Settings")
+    tes_background = st.sidebar.radio(
+        "Tree Equity Score background:",
+        ["Detailed (vector)", "Lightweight (image)"],
+        key="tes_background_mode",
+        help="The image version loads much faster on slow connections, but block groups can't be hovered."
+    )
+    marker_modes = {"Automatic": "auto", "Every project": "projects", "Clusters": "clusters"}
+    marker_mode = st.sidebar.radio(
+        "Project markers:",
+        list(marker_modes),
+        key="marker_mode",
+        help=f"Automatic groups nearby projects into clusters, sized by their total trees, once more than {MAX_INDIVIDUAL_MARKERS:,} projects are selected."
+    )
+    # Limit the Tree Equity Score layer to the selected states, and to the
+    # surroundings of the chosen organizations' projects when filtering by organization
+    create_layered_map(
+        map_df,
+        states=states or None,
+        clip_to_projects=clip_to_projects,
+        tes_mode="raster" if tes_background == "Lightweight (image)" else "vector",
+        marker_mode=marker_modes[marker_mode],
+        marker_index=marker_index,
+        selection=selection
+    )
+
+
+@timed_fragment("fragment: species breakdown")
+def species_breakdown(species_df, selection):
+    from src.map_visualizations import create_species_diversity_chart
+
+    # Built only while open; opening or closing it reruns just this fragment
+    breakdown = st.expander("See Detailed Species Breakdown", key="species_breakdown_expander", on_change="rerun")
+    if breakdown.open:
+        with breakdown:
+            create_species_diversity_chart(species_df, selection)
+
+
+@timed_fragment("fragment: goal word cloud")
+def goal_wordcloud(goals_df):
+    from src.map_visualizations import create_goals_wordcloud
+
+    wordcloud = st.expander("See Goal Keywords in a Word Cloud", key="wordcloud_expander", on_change="rerun")
+    if wordcloud.open:
+        with wordcloud:
+            create_goals_wordcloud(goals_df)
+
 
 # --- PAGE RENDERING ---
 
@@ -201,7 +311,11 @@ if st.session_state.page == "Project Overview":
 
     if filtered_df is not None:
         st.caption("A snapshot of the data driving these insights:")
-        st.dataframe(filtered_df.head(5))
+        st.dataframe(with_list_values(without_encoded_columns(filtered_df.head(5))).drop(columns=ROW_HASH_COLUMN, errors='ignore'))
+
+        # --- PROJECT DETAILS ---
+        if not filtered_df.empty and 'Project Key' in filtered_df.columns:
+            project_details(filtered_df, df.attrs.get('dataset_version'))
     st.markdown("---")
     st.subheader("Our Team")
     st.write("""
@@ -223,21 +337,35 @@ if st.session_state.page == "Project Overview":
     st.markdown("---")
 
 elif st.session_state.page == "Tree Planting Map":
+    from src.map_markers import get_marker_index
+    from src.map_visualizations import create_tree_type_chart
+
     st.header("Tree Planting Map")
     if filtered_df is not None and not filtered_df.empty:
         col1, col2 = st.columns([0.7, 0.3])
         with col1:
-            create_layered_map(filtered_df)
+            # Binned once per dataset version, over every project rather than the filtered ones
+            map_panel(filtered_df, selection, selected_states, organization_filter_active, get_marker_index(df))
         with col2:
             st.subheader("Key Metrics")
-            total_trees = filtered_df['# Trees To Be Planted'].sum()
-            st.metric(label="Total Trees To Be Planted", value=f"{total_trees:,.0f}")
-            num_organizations = filtered_df['Organization Name'].nunique()
-            st.metric(label="Participating Organizations", value=num_organizations)
-            num_cities = filtered_df['Project Location City'].nunique()
-            st.metric(label="Unique Project Cities", value=num_cities)
-            num_states = filtered_df['Project Location State'].nunique()
-            st.metric(label="Unique Project States", value=num_states)
+            with timed("metrics: rollup"):
+                metrics = rollup_metrics(rollup, selection, filtered_df)
+            st.metric(label="Total Trees To Be Planted", value=f"{metrics['trees']:,.0f}")
+            st.metric(label="Participating Organizations", value=metrics['organizations'])
+            st.metric(label="Unique Project Cities", value=metrics['cities'])
+            st.metric(label="Unique Project States", value=metrics['states'])
+            if 'TES' in filtered_df.columns:
+                median_tes = metrics['median_tes']
+                st.metric(
+                    label="Median Tree Equity Score",
+                    value="N/A" if pd.isna(median_tes) else f"{median_tes:.0f}",
+                    help="Median score of the block groups the projects are in. Lower scores mean a greater need for trees."
+                )
+                st.metric(
+                    label="Projects in High-Priority Block Groups",
+                    value=metrics['high_priority_projects'],
+                    help="Projects in block groups with a Tree Equity Score below 80."
+                )
 
             with st.expander("What is the Tree Equity Score?"):
                 st.write("""
@@ -251,10 +379,9 @@ elif st.session_state.page == "Tree Planting Map":
         st.header("Species Diversity Analysis")
         # Add a subheader for the new chart
         st.subheader("Projects by Tree Category")
-        create_tree_type_chart(filtered_df) # Call the new function
+        create_tree_type_chart(filtered_df, selection, rollup) # Call the new function
 
-        with st.expander("See Detailed Species Breakdown"):
-            create_species_diversity_chart(filtered_df)
+        species_breakdown(filtered_df, selection)
 
     elif filtered_df.empty:
         st.warning("No data available for the selected organization(s). Please adjust your filter.")
@@ -262,6 +389,8 @@ elif st.session_state.page == "Tree Planting Map":
         st.warning("Data not loaded. Cannot display map or metrics.")
 
 elif st.session_state.page == "Community & Workforce Impact":
+    from src.map_visualizations import create_impact_category_chart
+
     st.header("Community and Workforce Impact Analysis")
     st.write("""
     This section summarizes the primary goals of the grant projects, showing key impact areas and strategic focus.
@@ -269,13 +398,15 @@ elif st.session_state.page == "Community & Workforce Impact":
     if filtered_df is not None and not filtered_df.empty and 'Goal Categories' in filtered_df.columns:
         col1, col2 = st.columns([0.6, 0.4])
         with col1:
-            create_impact_category_chart(filtered_df)
+            create_impact_category_chart(filtered_df, selection, rollup)
         with col2:
             st.subheader("Deeper Insights")
             
             # Reverted back to the original st.metric style
-            num_multi_goal_orgs = filtered_df['Goal Categories'].apply(lambda x: len(x) > 1).sum()
-            total_orgs = len(filtered_df)
+            with timed("metrics: rollup"):
+                metrics = rollup_metrics(rollup, selection, filtered_df)
+            num_multi_goal_orgs = metrics['multi_goal_projects']
+            total_orgs = metrics['projects']
             percent_multi_goal = (num_multi_goal_orgs / total_orgs * 100) if total_orgs > 0 else 0
             
             st.metric(
@@ -288,10 +419,13 @@ elif st.session_state.page == "Community & Workforce Impact":
             st.write("##### Trees Planted per Impact Area")
             st.caption("Note: A single project's trees may be counted in multiple categories.")
             
-            trees_per_cat = filtered_df.explode('Goal Categories').groupby('Goal Categories')['# Trees To Be Planted'].sum().sort_values(ascending=False)
+            # Summed from the cube's per-cell category totals
+            trees_per_cat = metrics['goal_trees'][metrics['goal_projects'] > 0].sort_values(ascending=False)
+            trees_per_cat = trees_per_cat.rename_axis('Goal Categories').rename('# Trees To Be Planted')
             st.dataframe(trees_per_cat)
             
-        with st.expander("See Goal Keywords in a Word Cloud"):
-            create_goals_wordcloud(filtered_df)
+        goal_wordcloud(filtered_df)
     else:
-        st.warning("No goal data available for the selected filters.")
\ No newline at end of file
+        st.warning("No goal data available for the selected filters.")
+
+finish_rerun(rerun_trace)
@@ -0,0 +1,345 @@
+import argparse
+import gc
+import json
+import logging
+import multiprocessing
+import os
+import platform
+import resource
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+
+import plotly.io as pio
+from streamlit import logger as streamlit_logger
+
+# The cached functions run outside `streamlit run`, which Streamlit warns about as the modules below define them
+# and on every call; set here so every process (including the spawned benchmark runs) is quiet before importing them
+streamlit_logger.set_log_level("error")
+
+from benchmarks.synthetic_data import SIZES, dataset_dir, generate_dataset, read_manifest
+from src.compaction import compact_project_frame, count_totals
+from src.data_cleaner import (
+    GOAL_CATEGORY_COLUMN_PREFIX, ROW_HASH_COLUMN, clean_project_rows, dataset_sources, dataset_version, encode_project_columns,
+    fold_term_plurals, multi_hot, read_processed_data, read_project_sources, row_content_hashes, write_processed_data,
+)
+from src.filter_index import ORGANIZATION_COLUMN, PRIORITY_COLUMN, STATE_COLUMN, apply_filters, build_filter_index, canonical_selection
+from src.map_markers import build_marker_index, map_markers
+from src.map_visualizations import (
+    build_impact_category_figure, build_layered_map_figure, build_species_diversity_figure, build_tree_type_figure,
+    impact_category_counts, prepare_map_frame, render_wordcloud_png, species_project_counts, tree_type_organization_counts,
+)
+from src.rollup import build_rollup_cube, rollup_metrics
+from src.tes_layer import get_tes_layer
+
+logger = logging.getLogger(__name__)
+
+BASELINE_FILE = "benchmarks/baseline.json"
+# A stage regresses when it is this much slower (or uses this much more memory) than its baseline,
+# and by more than the absolute floors, which keep sub-second noise from failing the run
+DEFAULT_TIME_TOLERANCE = 0.5
+DEFAULT_MEMORY_TOLERANCE = 0.5
+MIN_REGRESSION_SECONDS = 0.1
+MIN_REGRESSION_BYTES = 32 << 20
+# Runs per benchmark, each in a fresh process; every stage keeps its best run
+DEFAULT_REPEAT = 3
+
+# How often the memory sampler reads the process's resident set size
+RSS_SAMPLE_SECONDS = 0.005
+
+
+def resident_bytes():
+    """
+    Returns the process's current resident set size, or its peak where the current one isn't available.
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        # ru_maxrss is in kilobytes on Linux and bytes on macOS
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+
+
+class RssSampler:
+    """
+    Samples the resident set size on a background thread and keeps the highest reading. Unlike tracemalloc,
+    it sees Arrow and NumPy buffers and doesn't slow the measured code down.
+    """
+
+    def __init__(self, interval=RSS_SAMPLE_SECONDS):
+        self.interval = interval
+        self.peak = resident_bytes()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, resident_bytes())
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, resident_bytes())
+
+
+class StageTimer:
+    """
+    Runs benchmark stages one after another, recording the wall time of each and how far
+    the resident memory rose above its level at the start of the stage.
+    """
+
+    def __init__(self):
+        self.stages = {}
+
+    def run(self, name, fn, *args, **kwargs):
+        gc.collect()
+        before = resident_bytes()
+        with RssSampler() as sampler:
+            start = time.perf_counter()
+            value = fn(*args, **kwargs)
+            seconds = time.perf_counter() - start
+        peak = max(0, sampler.peak - before)
+        self.stages[name] = {"seconds": round(seconds, 4), "peak_bytes": peak}
+        logger.info("%-34s %8.3fs %10.1f MiB", name, seconds, peak / 2**20)
+        return value
+
+    def note(self, name, **values):
+        self.stages[name].update(values)
+
+    def skip(self, name, reason):
+        self.stages[name] = {"skipped": reason}
+        logger.info("%-34s skipped: %s", name, reason)
+
+
+def _figure_payload(build, *args, **kwargs):
+    # Built and serialized the way st.plotly_chart ships it to the browser
+    fig = build(*args, **kwargs)
+    return fig, pio.to_json(fig, validate=False) if fig is not None else ""
+
+
+def _scan_metrics(df):
+    # The dashboard's summary measures computed from the rows, as the pages did before the rollup cube
+    goal_matrix = multi_hot(df, GOAL_CATEGORY_COLUMN_PREFIX)
+    return {
+        "trees": df['# Trees To Be Planted'].sum(),
+        "organizations": df['Organization Name'].nunique(),
+        "cities": df['Project Location City'].nunique(),
+        "states": df['Project Location State'].nunique(),
+        "median_tes": df['TES'].median(),
+        "high_priority_projects": df['TES Priority'].isin(['Highest', 'High']).sum(),
+        "multi_goal_projects": (goal_matrix.sum(axis=1) > 1).sum(),
+        "goal_trees": goal_matrix.T.dot(df['# Trees To Be Planted'].astype('int64')),
+    }
+
+
+def run_benchmarks(manifest, work_dir):
+    """
+    Times each pipeline stage and chart builder on a generated dataset. Stages run in order in one
+    process, so later stages see warm process-wide caches the way the app does.
+    """
+    file_paths, tes_paths = manifest["file_paths"], manifest["tes_paths"]
+    timer = StageTimer()
+
+    # --- PIPELINE ---
+    sources = timer.run("hash sources", dataset_sources, file_paths, tes_paths)
+    df_merged, _ = timer.run("read sources", read_project_sources, file_paths)
+    timer.note("read sources", rows=len(df_merged))
+    df_merged[ROW_HASH_COLUMN] = timer.run("row hashes", row_content_hashes, df_merged)
+    timer.run("load TES layer (full)", get_tes_layer, "full", tes_paths)
+    df_cleaned = timer.run("clean rows", clean_project_rows, df_merged, tes_paths)
+    timer.note("clean rows", rows=len(df_cleaned))
+    df_cleaned = timer.run("encode columns", encode_project_columns, df_cleaned.reset_index(drop=True))
+    del df_merged
+
+    artifact = os.path.join(work_dir, "projects.parquet")
+    timer.run("write artifact", write_processed_data, df_cleaned, sources, artifact)
+    timer.note("write artifact", bytes=os.path.getsize(artifact))
+    df_cleaned = timer.run("read artifact", read_processed_data, artifact)
+    df = timer.run("compact frame", compact_project_frame, df_cleaned)
+    df.attrs["dataset_version"] = dataset_version(sources)
+    del df_cleaned
+
+    # --- FILTERS ---
+    index = timer.run("build filter index", build_filter_index, df, df.attrs["dataset_version"])
+    busiest_state = max(index.positions[STATE_COLUMN], key=lambda state: len(index.positions[STATE_COLUMN][state]))
+    selections = [
+        {STATE_COLUMN: [busiest_state]},
+        {STATE_COLUMN: [busiest_state], PRIORITY_COLUMN: ["Highest", "High"]},
+        {ORGANIZATION_COLUMN: index.values[ORGANIZATION_COLUMN][:5]},
+    ]
+    timer.run("apply filters", lambda: [apply_filters(df, index, selection) for selection in selections])
+    df_state = apply_filters(df, index, selections[0])
+    cube = timer.run("build rollup cube", build_rollup_cube, df, df.attrs["dataset_version"])
+    timer.run("metrics: row scan", lambda: [_scan_metrics(apply_filters(df, index, selection)) for selection in [{}] + selections])
+    timer.run("metrics: rollup cube", lambda: [rollup_metrics(cube, canonical_selection(index, selection)) for selection in [{}] + selections])
+
+    # --- CHARTS ---
+    tes_layer = timer.run("load TES layer (medium)", get_tes_layer, "medium", tes_paths)
+    marker_index = timer.run("build marker index", build_marker_index, df, df.attrs["dataset_version"])
+    map_df, view = timer.run("map: prepare", prepare_map_frame, df)
+    markers, trace_name = timer.run("map: markers", map_markers, map_df, view[1], "auto", marker_index)
+    timer.note("map: markers", markers=len(markers))
+    cached_map, payload = timer.run(
+        "map: figure", _figure_payload,
+        lambda: build_layered_map_figure(markers, view, tes_layer=tes_layer, name=trace_name)
+    )
+    timer.note("map: figure", payload_bytes=len(payload))
+    # What a session served from the shared figure cache pays: Streamlit's dict conversion and serialization
+    timer.run("map: figure (cache hit)", lambda: pio.to_json(cached_map.to_dict(), validate=False))
+    state_map_df, state_view = prepare_map_frame(df_state, clip_to_projects=True)
+    state_markers, trace_name = map_markers(state_map_df, state_view[1], "auto", marker_index)
+    _, payload = timer.run(
+        "map: figure (one state, clipped)", _figure_payload,
+        lambda: build_layered_map_figure(state_markers, state_view, tes_layer=tes_layer, states=[busiest_state], name=trace_name)
+    )
+    timer.note("map: figure (one state, clipped)", payload_bytes=len(payload))
+
+    species_df = species_project_counts(df)
+    for name, build, arg in [
+        ("chart: species diversity", build_species_diversity_figure, species_df),
+        ("chart: impact categories", lambda df: build_impact_category_figure(impact_category_counts(df)), df),
+        ("chart: tree types", lambda df: build_tree_type_figure(tree_type_organization_counts(df)), df),
+    ]:
+        _, payload = timer.run(name, _figure_payload, build, arg)
+        timer.note(name, payload_bytes=len(payload))
+
+    frequencies = timer.run("word cloud: frequencies", lambda: fold_term_plurals(count_totals(df, 'Goal Term Counts')))
+    png = timer.run("word cloud: render", render_wordcloud_png, frequencies)
+    timer.note("word cloud: render", payload_bytes=len(png))
+
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+    return {"rows": manifest["rows"], "stages": timer.stages, "max_rss_bytes": max_rss}
+
+
+def _run_in_fresh_process(manifest, work_dir, log_level):
+    logging.basicConfig(level=log_level, format="%(message)s")
+    logger.setLevel(logging.INFO)
+    return run_benchmarks(manifest, work_dir)
+
+
+def best_of(results):
+    """
+    Combines repeated runs into one result holding each stage's fastest time and smallest memory peak,
+    which are the readings least disturbed by other work on the machine.
+    """
+    combined = {"rows": results[0]["rows"], "stages": {}, "max_rss_bytes": min(result["max_rss_bytes"] for result in results)}
+    for name, stage in results[0]["stages"].items():
+        runs = [result["stages"][name] for result in results]
+        combined["stages"][name] = dict(stage)
+        if "skipped" not in stage:
+            combined["stages"][name]["seconds"] = min(run["seconds"] for run in runs)
+            combined["stages"][name]["peak_bytes"] = min(run["peak_bytes"] for run in runs)
+    return combined
+
+
+def find_regressions(result, baseline, time_tolerance=DEFAULT_TIME_TOLERANCE, memory_tolerance=DEFAULT_MEMORY_TOLERANCE):
+    """
+    Returns a description of every stage slower or hungrier than its baseline beyond the tolerances.
+    Stages missing from either side are not compared.
+    """
+    regressions = []
+    for name, stage in result["stages"].items():
+        base = baseline["stages"].get(name)
+        if base is None or "skipped" in stage or "skipped" in base:
+            continue
+        if stage["seconds"] > base["seconds"] * (1 + time_tolerance) and stage["seconds"] - base["seconds"] > MIN_REGRESSION_SECONDS:
+            regressions.append(f"{name}: {stage['seconds']:.3f}s vs baseline {base['seconds']:.3f}s")
+        if stage["peak_bytes"] > base["peak_bytes"] * (1 + memory_tolerance) and stage["peak_bytes"] - base["peak_bytes"] > MIN_REGRESSION_BYTES:
+            regressions.append(f"{name}: peak {stage['peak_bytes'] / 2**20:.1f} MiB vs baseline {base['peak_bytes'] / 2**20:.1f} MiB")
+    growth = result["max_rss_bytes"] - baseline.get("max_rss_bytes", result["max_rss_bytes"])
+    if growth > baseline.get("max_rss_bytes", 0) * memory_tolerance and growth > MIN_REGRESSION_BYTES:
+        regressions.append(f"process: peak RSS {result['max_rss_bytes'] / 2**20:.0f} MiB vs baseline {baseline['max_rss_bytes'] / 2**20:.0f} MiB")
+    return regressions
+
+
+def missing_stages(result, baseline):
+    """
+    Returns the stages of `result` the baseline has no timing for, which `find_regressions` can't compare.
+    """
+    return [name for name in result["stages"] if name not in baseline["stages"]]
+
+
+def read_baseline(path=BASELINE_FILE):
+    if not os.path.exists(path):
+        return {"sizes": {}}
+    with open(path) as f:
+        return json.load(f)
+
+
+def write_baseline(baseline, size, result, path=BASELINE_FILE):
+    """
+    Stores `result` as the baseline for `size`, keeping the other sizes' baselines.
+    """
+    baseline["sizes"][size] = {
+        "recorded": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "machine": f"{platform.system()} {platform.machine()}, {os.cpu_count()} CPUs",
+        **result,
+    }
+    with open(path, "w") as f:
+        json.dump(baseline, f, indent=2)
+        f.write("\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time the data pipeline and chart builders on a synthetic dataset.")
+    parser.add_argument("--size", choices=list(SIZES), default="10k", help="Synthetic dataset size, generated on first use.")
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="Baseline file to compare against.")
+    parser.add_argument("--update-baseline", action="store_true", help="Record this run as the baseline for --size instead of comparing.")
+    parser.add_argument("--time-tolerance", type=float, default=DEFAULT_TIME_TOLERANCE, help="Allowed slowdown per stage (0.5 = 50%%).")
+    parser.add_argument("--memory-tolerance", type=float, default=DEFAULT_MEMORY_TOLERANCE, help="Allowed peak memory growth per stage.")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="Runs to take each stage's best reading from.")
+    parser.add_argument("--json", metavar="PATH", help="Also write this run's results to PATH.")
+    parser.add_argument("--verbose", action="store_true", help="Show the pipeline's own log messages.")
+    args = parser.parse_args(argv)
+
+    log_level = logging.INFO if args.verbose else logging.WARNING
+    logging.basicConfig(level=log_level, format="%(message)s")
+    logger.setLevel(logging.INFO)
+
+    out_dir = dataset_dir(args.size)
+    manifest = read_manifest(out_dir)
+    if manifest is None or manifest["rows"] != SIZES[args.size]:
+        logger.info("Generating the %s synthetic dataset in %s", args.size, out_dir)
+        manifest = generate_dataset(SIZES[args.size], out_dir)
+
+    results = []
+    for run in range(args.repeat):
+        logger.info("Run %d of %d (%d projects)", run + 1, args.repeat, manifest["rows"])
+        # A fresh process per run, so every run starts with cold caches like a newly started server
+        with tempfile.TemporaryDirectory() as work_dir, ProcessPoolExecutor(1, mp_context=multiprocessing.get_context("spawn")) as pool:
+            results.append(pool.submit(_run_in_fresh_process, manifest, work_dir, log_level).result())
+    result = best_of(results)
+    logger.info("Peak RSS: %.0f MiB", result["max_rss_bytes"] / 2**20)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"size": args.size, **result}, f, indent=2)
+
+    baseline = read_baseline(args.baseline)
+    if args.update_baseline:
+        write_baseline(baseline, args.size, result, args.baseline)
+        logger.info("Recorded the %s baseline in %s", args.size, args.baseline)
+        return 0
+    if args.size not in baseline["sizes"]:
+        logger.warning("No %s baseline in %s; record one with --update-baseline", args.size, args.baseline)
+        return 0
+    missing = missing_stages(result, baseline["sizes"][args.size])
+    if missing:
+        logger.warning("Not in the %s baseline, so not compared: %s; re-record it with --update-baseline", args.size, ", ".join(missing))
+    regressions = find_regressions(result, baseline["sizes"][args.size], args.time_tolerance, args.memory_tolerance)
+    for regression in regressions:
+        logger.error("Regression: %s", regression)
+    if not regressions:
+        logger.info("No stage regressed past the %s baseline", args.size)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,413 @@
+import argparse
+import json
+import logging
+import os
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+import shapely
+
+from src.data_cleaner import GOAL_CATEGORIES_FILE, SPECIES_NORMALIZATION_MAP
+
+logger = logging.getLogger(__name__)
+
+# Project counts of the standard benchmark datasets
+SIZES = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+BENCHMARK_DATA_DIR = "benchmarks/data"
+DEFAULT_SEED = 2024
+# Rows generated and appended to the CSVs at a time, which bounds the generator's memory at 1M rows
+GENERATE_CHUNK_ROWS = 50_000
+# Characters per long text column; the real applications average about 2,000, which makes a 1M-row
+# file tens of gigabytes, so the default is shorter. Only the Project Description is read by the pipeline.
+DEFAULT_TEXT_CHARS = 250
+
+# Both CSVs share the application columns; the NLP file adds the Ollama extraction columns
+APPLICATION_COLUMNS = [
+    'Organization Name', '# Trees To Be Planted', 'Project Description', 'Project Goals',
+    'Project Location Street', 'Project Location Street line 2', 'Project Location City', 'Project Location State',
+    'Project Location Zip', 'Organization Address 1', 'Organization Address 2', 'Organization City',
+    'Organization State', 'Organization Postal Code', 'Workforce Development', 'Planting and Maintenance Plan',
+]
+ORIGINAL_COLUMNS = APPLICATION_COLUMNS + ['Latitude', 'Longitude', 'Project Address']
+NLP_COLUMNS = APPLICATION_COLUMNS + ['USDA Matched Species', 'Species from Ollama', 'Goals from Ollama']
+
+# State bounds (minx, miny, maxx, maxy), FIPS code, zip range, and cities as (lat, lon, weight)
+STATES = {
+    "IL": {
+        "name": "Illinois", "fips": "17", "bounds": (-91.5, 37.0, -87.5, 42.5), "zips": (60001, 62999),
+        "cities": {
+            "Chicago": (41.88, -87.63, 40), "Evanston": (42.05, -87.69, 4), "Aurora": (41.76, -88.32, 4),
+            "Joliet": (41.53, -88.08, 3), "Rockford": (42.27, -89.09, 4), "Peoria": (40.69, -89.59, 3),
+            "Springfield": (39.78, -89.65, 3), "Champaign": (40.12, -88.24, 3), "Shelbyville": (39.41, -88.81, 1),
+            "Carbondale": (37.73, -89.22, 1),
+        },
+    },
+    "IN": {
+        "name": "Indiana", "fips": "18", "bounds": (-88.1, 37.8, -84.8, 41.8), "zips": (46001, 47999),
+        "cities": {
+            "Indianapolis": (39.77, -86.16, 16), "Fort Wayne": (41.08, -85.14, 3), "Gary": (41.60, -87.35, 3),
+            "South Bend": (41.68, -86.25, 3), "Bloomington": (39.17, -86.53, 2), "Evansville": (37.97, -87.57, 2),
+        },
+    },
+    "WI": {
+        "name": "Wisconsin", "fips": "55", "bounds": (-92.9, 42.5, -86.8, 47.1), "zips": (53001, 54999),
+        "cities": {
+            "Milwaukee": (43.04, -87.91, 12), "Madison": (43.07, -89.40, 5), "Green Bay": (44.51, -88.01, 2),
+            "Kenosha": (42.58, -87.82, 2), "Racine": (42.73, -87.78, 2), "Eau Claire": (44.81, -91.50, 1),
+        },
+    },
+}
+STATE_WEIGHTS = {"IL": 0.6, "IN": 0.25, "WI": 0.15}
+# Approximate block group counts of the real TES files
+TES_CELLS = {"IL": 9_900, "IN": 4_800, "WI": 4_700}
+# Points added along each polygon edge, so the polygons carry about as many vertices as real block groups
+TES_EDGE_POINTS = 12
+
+ORGANIZATION_KINDS = [
+    "Lutheran Church", "Baptist Church", "Methodist Church", "Catholic Parish", "Presbyterian Church",
+    "Islamic Center", "Masjid", "Synagogue", "Temple", "Friends Meeting", "Community Garden", "Youth Center",
+    "Parks Foundation", "Food Pantry", "Neighborhood Association", "Faith Coalition", "Episcopal Church",
+    "AME Church", "Unitarian Fellowship", "Interfaith Alliance",
+]
+ORGANIZATION_PREFIXES = [
+    "St. Mark's", "St. Paul's", "Grace", "Trinity", "Hope", "New Life", "First", "Bethel", "Zion", "Mount Olive",
+    "Peace", "Good Shepherd", "Holy Cross", "Emmanuel", "Redeemer", "Greater", "United", "Faith", "Calvary", "Shiloh",
+]
+STREETS = [
+    "Main St", "Oak Ave", "Maple St", "Washington Blvd", "Lincoln Ave", "Church St", "Park Ave", "Elm St",
+    "King Dr", "Madison St", "Jefferson St", "Grand Ave", "Cedar Ln", "Division St", "Lake St", "Prairie Ave",
+]
+SENTENCE_SUBJECTS = [
+    "Our congregation", "The green team", "Youth volunteers", "Local residents", "The grounds committee",
+    "Neighborhood families", "Our partners", "A local landscape company", "Church elders", "Students",
+]
+SENTENCE_VERBS = [
+    "will plant", "will water and mulch", "will care for", "will monitor", "have chosen", "will celebrate",
+    "will learn about", "will maintain", "will protect", "hope to expand",
+]
+SENTENCE_OBJECTS = [
+    "native shade trees along the parking lot", "fruit trees in the community garden", "the new orchard",
+    "trees on the south lawn", "a windbreak near the playground", "street trees on our block",
+    "young trees through their first summers", "a canopy that cools the neighborhood", "pollinator habitat",
+    "trees that replace those lost to emerald ash borer", "an outdoor classroom", "the memorial grove",
+]
+GOAL_VERBS = [
+    "Improve", "Increase", "Promote", "Provide", "Enhance", "Create", "Support", "Reduce", "Educate about",
+    "Restore", "Foster", "Develop", "Strengthen", "Expand",
+]
+GOAL_OBJECTS = [
+    "air quality", "tree canopy", "stormwater management", "urban heat", "biodiversity", "community engagement",
+    "youth education", "student learning", "neighborhood beautification", "volunteer participation",
+    "workforce training", "job skills", "economic development", "career pathways", "food access",
+    "fresh produce", "community orchard", "mental health", "spiritual reflection", "gathering space",
+    "environmental justice", "climate resilience", "pollinator habitat", "energy savings", "property values",
+    "intergenerational learning", "wildlife habitat", "public health", "shade for residents", "social connection",
+]
+USDA_SHORT_NAMES = ["Oak", "Maple", "Apple", "Pear", "Plum", "Cherry", "Pine", "Spruce", "Redbud", "Dogwood",
+                    "Hackberry", "Catalpa", "Tulip", "Coffee", "Pecan", "Peach", "Cypress", "Elm", "Linden"]
+
+
+def _weights(size, rng, exponent=1.1):
+    # Zipf-like popularity over a shuffled vocabulary: a few very common items and a long tail
+    weights = 1 / np.arange(1, size + 1) ** exponent
+    rng.shuffle(weights)
+    return weights / weights.sum()
+
+
+def _misspell(name, rng):
+    position = int(rng.integers(1, len(name) - 1))
+    if rng.random() < 0.5:
+        return name[:position] + name[position + 1:]
+    return name[:position] + name[position + 1] + name[position] + name[position + 2:]
+
+
+def species_vocabulary(rng, typos=150):
+    """
+    Returns the species names the synthetic Ollama extraction writes: every known spelling in the
+    casings and formats the real extraction uses, plus misspellings that go through the fuzzy resolver.
+    """
+    names = set()
+    for name in SPECIES_NORMALIZATION_MAP:
+        style = rng.random()
+        if style < 0.6:
+            names.add(name.title())
+        elif style < 0.8:
+            names.add(name)
+        else:
+            names.add(name.replace(" ", "_"))
+    long_names = sorted(name.title() for name in SPECIES_NORMALIZATION_MAP if len(name) > 6)
+    for name in rng.choice(long_names, size=min(typos, len(long_names)), replace=False):
+        names.add(_misspell(name, rng))
+    return np.array(sorted(names), dtype=object)
+
+
+def goal_vocabulary():
+    """
+    Returns the goal phrases the synthetic Ollama extraction writes, covering every goal category keyword.
+    """
+    objects = list(GOAL_OBJECTS)
+    with open(GOAL_CATEGORIES_FILE) as f:
+        categories = json.load(f)["categories"]
+    for keywords in categories.values():
+        objects.extend(keyword for keyword in keywords if keyword not in objects)
+    phrases = [f"{verb} {obj}" for verb in GOAL_VERBS for obj in objects]
+    phrases += [f"{verb} {obj} for neighborhood residents" for verb in GOAL_VERBS[:4] for obj in objects]
+    return np.array(phrases, dtype=object)
+
+
+def sentence_pool(rng, size=2_000):
+    subjects = rng.choice(SENTENCE_SUBJECTS, size)
+    verbs = rng.choice(SENTENCE_VERBS, size)
+    objects = rng.choice(SENTENCE_OBJECTS, size)
+    return [f"{s} {v} {o}." for s, v, o in zip(subjects, verbs, objects)]
+
+
+def organization_pool(size, rng):
+    """
+    Returns `size` organizations as a frame of name, state, city and street address.
+    """
+    states = rng.choice(list(STATE_WEIGHTS), size=size, p=list(STATE_WEIGHTS.values()))
+    rows = []
+    for i, state in enumerate(states):
+        cities = STATES[state]["cities"]
+        weights = np.array([spec[2] for spec in cities.values()], dtype=float)
+        city = rng.choice(list(cities), p=weights / weights.sum())
+        prefix = ORGANIZATION_PREFIXES[i % len(ORGANIZATION_PREFIXES)]
+        kind = ORGANIZATION_KINDS[(i // len(ORGANIZATION_PREFIXES)) % len(ORGANIZATION_KINDS)]
+        name = f"{prefix} {kind} of {city}"
+        # Past every prefix and kind combination, number the chapters
+        chapter = i // (len(ORGANIZATION_PREFIXES) * len(ORGANIZATION_KINDS))
+        if chapter:
+            name += f" (Chapter {chapter + 1})"
+        rows.append((name, state, city, f"{rng.integers(100, 9999)} {rng.choice(STREETS)}"))
+    return pd.DataFrame(rows, columns=["name", "state", "city", "street"])
+
+
+def _split(items, lengths):
+    # Consecutive runs of `items`, one per length
+    bounds = np.concatenate([[0], np.cumsum(lengths)])
+    return [items[start:end] for start, end in zip(bounds[:-1], bounds[1:])]
+
+
+def _literal_cells(rng, species_names, species_weights, goal_phrases, goal_weights, count):
+    """
+    Returns the 'USDA Matched Species', 'Species from Ollama' and 'Goals from Ollama' cells of `count`
+    projects, as the Python literals the extraction step writes, with some empty and unparseable cells.
+    """
+    species_counts = rng.poisson(3, count)
+    goal_counts = np.where(rng.random(count) < 0.1, 0, rng.poisson(6, count))
+    usda_counts = np.minimum(species_counts, 6)
+    # Drawn for the whole chunk at once, then split per project
+    species = _split(rng.choice(species_names, size=species_counts.sum(), p=species_weights).tolist(), species_counts)
+    plants = _split(rng.integers(1, 12, species_counts.sum()).tolist(), species_counts)
+    usda = _split(rng.choice(USDA_SHORT_NAMES, size=usda_counts.sum()).tolist(), usda_counts)
+    goals = _split(rng.choice(goal_phrases, size=goal_counts.sum(), p=goal_weights).tolist(), goal_counts)
+    unparseable = rng.random(count) < 0.02
+
+    ollama_cells = [
+        str(rng.choice(["", "None", "Not specified"])) if bad else repr(dict(zip(names, counts)))
+        for names, counts, bad in zip(species, plants, unparseable)
+    ]
+    usda_cells = [repr(list(dict.fromkeys(names))) for names in usda]
+    goal_cells = [repr(list(dict.fromkeys(phrases))) for phrases in goals]
+    return usda_cells, ollama_cells, goal_cells
+
+
+def _texts(sentences, rng, chars, count):
+    # Whole sentences until each text is about `chars` long
+    per_text = max(1, round(chars / 70))
+    picks = rng.integers(0, len(sentences), (count, per_text))
+    return [" ".join(sentences[i] for i in row) for row in picks]
+
+
+def generate_chunk(start, count, organizations, vocabularies, rng, text_chars=DEFAULT_TEXT_CHARS):
+    """
+    Returns the original and NLP rows of projects `start` to `start + count`. A few applications are
+    missing from the NLP file, a few extractions have no application, and some rows differ only
+    in whitespace or case, as in the real files.
+    """
+    species_names, species_weights, goal_phrases, goal_weights, sentences = vocabularies
+    orgs = organizations.iloc[rng.choice(len(organizations), size=count, p=organizations.attrs["weights"])]
+    trees = np.clip(np.round(rng.lognormal(np.log(20), 0.8, count)), 1, 500).astype(int)
+    years = rng.integers(2019, 2027, count)
+    # Most projects are in the organization's city, spread over its neighbourhoods
+    city_lat = np.array([STATES[state]["cities"][city][0] for state, city in zip(orgs["state"], orgs["city"])])
+    city_lon = np.array([STATES[state]["cities"][city][1] for state, city in zip(orgs["state"], orgs["city"])])
+    lats = np.round(city_lat + rng.normal(0, 0.08, count), 6)
+    lons = np.round(city_lon + rng.normal(0, 0.08, count), 6)
+    streets = [f"{number} {name}" for number, name in zip(rng.integers(100, 9999, count), rng.choice(STREETS, count))]
+    zip_low = np.array([STATES[state]["zips"][0] for state in orgs["state"]])
+    zips = (zip_low + rng.integers(0, 2000, count)).astype(str)
+    state_rolls, tree_rolls, location_rolls, original_rolls, nlp_rolls = rng.random((5, count))
+    usda, ollama, goals = _literal_cells(rng, species_names, species_weights, goal_phrases, goal_weights, count)
+    goals_text, workforce, plans, extra = (_texts(sentences, rng, text_chars, count) for _ in range(4))
+
+    original, nlp = [], []
+    for i, org in enumerate(orgs.itertuples(index=False)):
+        state = STATES[org.state]
+        description = f"Application FIP-{years[i]}-{start + i:07d}. This grant will plant {trees[i]} trees at {streets[i]}. {extra[i]}"
+        state_value = org.state
+        if state_rolls[i] > 0.95:
+            state_value = [state["name"], state["name"].upper(), f" {org.state.lower()} "][i % 3]
+        tree_value = str(trees[i]) if tree_rolls[i] > 0.005 else "TBD"
+        application = [
+            org.name, tree_value, description, goals_text[i],
+            streets[i], "", org.city, state_value, zips[i], org.street, "", org.city, org.state, zips[i],
+            workforce[i], plans[i],
+        ]
+        if original_rolls[i] > 0.01:
+            missing_location = location_rolls[i] < 0.01
+            original.append(application + [
+                np.nan if missing_location else lats[i], np.nan if missing_location else lons[i],
+                f"{streets[i]}, {org.city}, {org.state}, United States of America",
+            ])
+        if nlp_rolls[i] < 0.01:
+            continue
+        nlp_application = list(application)
+        nlp_application[1] = f"{tree_value}.0" if tree_value != "TBD" else tree_value
+        if nlp_rolls[i] < 0.05:
+            # The same application re-exported with different whitespace or case still joins on the project key
+            nlp_application[0] = org.name.upper()
+            nlp_application[2] = description.replace(". ", ".  ") + " "
+        nlp.append(nlp_application + [usda[i], ollama[i], goals[i]])
+        if nlp_rolls[i] > 0.98:
+            # An extraction whose application isn't in the original file
+            withdrawn = list(nlp_application)
+            withdrawn[2] = f"Application FIP-{years[i]}-{start + i:07d}-B. {extra[i]}"
+            nlp.append(withdrawn + [usda[i], ollama[i], goals[i]])
+    return pd.DataFrame(original, columns=ORIGINAL_COLUMNS), pd.DataFrame(nlp, columns=NLP_COLUMNS)
+
+
+def synthetic_tes_polygons(state, cells, rng):
+    """
+    Returns a GeoDataFrame of `cells` block-group-like polygons tiling a state's bounds, with GEOID and tes.
+    Polygons share wavy edges, and scores are lowest around the cities, like the real layer.
+    """
+    import geopandas as gpd
+
+    spec = STATES[state]
+    minx, miny, maxx, maxy = spec["bounds"]
+    aspect = (maxx - minx) / (maxy - miny)
+    ny = max(1, round(np.sqrt(cells / aspect)))
+    nx = max(1, round(cells / ny))
+    xs, ys = np.linspace(minx, maxx, nx + 1), np.linspace(miny, maxy, ny + 1)
+    # Corners of every cell, counter-clockwise and closed
+    ix, iy = np.meshgrid(np.arange(nx), np.arange(ny), indexing="xy")
+    ix, iy = ix.ravel(), iy.ravel()
+    corners = np.stack([
+        np.stack([xs[ix], ys[iy]], axis=1), np.stack([xs[ix + 1], ys[iy]], axis=1),
+        np.stack([xs[ix + 1], ys[iy + 1]], axis=1), np.stack([xs[ix], ys[iy + 1]], axis=1),
+        np.stack([xs[ix], ys[iy]], axis=1),
+    ], axis=1)
+    cell_size = min((maxx - minx) / nx, (maxy - miny) / ny)
+    polygons = shapely.segmentize(shapely.polygons(corners), cell_size / TES_EDGE_POINTS)
+    # Displacing every vertex by a function of its position keeps shared edges shared
+    amplitude = cell_size * 0.06
+    polygons = shapely.transform(polygons, lambda coords: coords + amplitude * np.stack([
+        np.sin(coords[:, 1] * 211.0) * np.cos(coords[:, 0] * 97.0),
+        np.cos(coords[:, 0] * 173.0) * np.sin(coords[:, 1] * 59.0),
+    ], axis=1))
+
+    centroids = shapely.get_coordinates(shapely.centroid(polygons))
+    urban = np.zeros(len(polygons))
+    for lat, lon, weight in spec["cities"].values():
+        distance = np.hypot(centroids[:, 0] - lon, centroids[:, 1] - lat)
+        urban = np.maximum(urban, np.exp(-(distance / (0.15 + 0.01 * weight)) ** 2))
+    tes = 92 - 40 * urban * rng.uniform(0.4, 1.2, len(polygons)) + rng.normal(0, 8, len(polygons))
+    tes = np.clip(np.round(tes), 0, 100).astype(int)
+    geoids = [f"{spec['fips']}{i:010d}" for i in range(len(polygons))]
+    return gpd.GeoDataFrame({"GEOID": geoids, "tes": tes}, geometry=polygons, crs="EPSG:4326")
+
+
+def dataset_dir(size, root=BENCHMARK_DATA_DIR):
+    return os.path.join(root, size)
+
+
+def read_manifest(out_dir):
+    """
+    Returns the manifest of a generated dataset, or None when it hasn't been generated.
+    """
+    path = os.path.join(out_dir, "manifest.json")
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def generate_dataset(rows, out_dir, seed=DEFAULT_SEED, text_chars=DEFAULT_TEXT_CHARS, tes_scale=1.0):
+    """
+    Writes a synthetic dataset of `rows` projects to `out_dir`: both CSVs in the real schemas, one TES
+    GeoJSON file per state, and a manifest with the file paths in the shape of DEFAULT_FILE_PATHS.
+    """
+    start = time.perf_counter()
+    rng = np.random.default_rng(seed)
+    os.makedirs(out_dir, exist_ok=True)
+    species_names = species_vocabulary(rng)
+    goal_phrases = goal_vocabulary()
+    vocabularies = (
+        species_names, _weights(len(species_names), rng), goal_phrases, _weights(len(goal_phrases), rng, 0.8),
+        sentence_pool(rng),
+    )
+    # Organizations apply in several grant cycles, some far more often than others
+    organizations = organization_pool(max(60, rows // 6), rng)
+    organizations.attrs["weights"] = _weights(len(organizations), rng, 0.7)
+
+    file_paths = {
+        "original_data": os.path.join(out_dir, "original_data.csv"),
+        "new_data": os.path.join(out_dir, "nlp_data.csv"),
+    }
+    for path in file_paths.values():
+        if os.path.exists(path):
+            os.remove(path)
+    for chunk_start in range(0, rows, GENERATE_CHUNK_ROWS):
+        count = min(GENERATE_CHUNK_ROWS, rows - chunk_start)
+        original, nlp = generate_chunk(chunk_start, count, organizations, vocabularies, rng, text_chars)
+        header = chunk_start == 0
+        original.to_csv(file_paths["original_data"], mode="a", header=header, index=False)
+        nlp.to_csv(file_paths["new_data"], mode="a", header=header, index=False)
+        logger.info("Generated %d of %d projects", chunk_start + count, rows)
+
+    tes_paths = []
+    for state, cells in TES_CELLS.items():
+        path = os.path.join(out_dir, f"{state.lower()}_tes.geojson")
+        if os.path.exists(path):
+            os.remove(path)
+        synthetic_tes_polygons(state, max(1, round(cells * tes_scale)), rng).to_file(path, driver="GeoJSON")
+        tes_paths.append(path)
+
+    manifest = {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "rows": rows,
+        "seed": seed,
+        "text_chars": text_chars,
+        "tes_scale": tes_scale,
+        "file_paths": file_paths,
+        "tes_paths": tes_paths,
+        "bytes": {path: os.path.getsize(path) for path in [*file_paths.values(), *tes_paths]},
+    }
+    with open(os.path.join(out_dir, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+    logger.info("Wrote synthetic dataset of %d projects to %s in %.1fs", rows, out_dir, time.perf_counter() - start)
+    return manifest
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic Faith in Place dataset for benchmarking.")
+    parser.add_argument("--size", choices=list(SIZES), default="10k", help="Standard dataset size.")
+    parser.add_argument("--rows", type=int, help="Number of projects, overriding --size.")
+    parser.add_argument("--out", help=f"Output directory (default: {BENCHMARK_DATA_DIR}/<size>).")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--text-chars", type=int, default=DEFAULT_TEXT_CHARS, help="Characters per long text column.")
+    parser.add_argument("--tes-scale", type=float, default=1.0, help="Block group count relative to the real TES files.")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    rows = args.rows or SIZES[args.size]
+    out_dir = args.out or dataset_dir(args.size if not args.rows else f"{rows}")
+    generate_dataset(rows, out_dir, seed=args.seed, text_chars=args.text_chars, tes_scale=args.tes_scale)
+
+
+if __name__ == "__main__":
+    main()
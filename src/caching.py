@@ -0,0 +1,73 @@
+import threading
+from collections import OrderedDict
+
+
+class ByteLRUCache:
+    """
+    A thread-safe least-recently-used cache of bytes values, bounded by their total size. Values that aren't
+    bytes are stored with an explicit size. Shared by every session, so it also counts hits and misses.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry[0]
+
+    def put(self, key, value, size=None):
+        """
+        Stores `value`, taking `size` bytes (its length by default), evicting the least recently used
+        entries until it fits. Values larger than the whole cache are not stored.
+        """
+        size = len(value) if size is None else size
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= self._entries.pop(key)[1]
+            while self._entries and self._bytes + size > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self._evictions += 1
+            self._entries[key] = (value, size)
+            self._bytes += size
+
+    def get_or_create(self, key, create):
+        """
+        Returns the cached value for `key`, calling `create()` and storing its result on a miss.
+        """
+        value = self.get(key)
+        if value is None:
+            # Rendered outside the lock: two sessions missing at once both render, but neither blocks the other
+            value = create()
+            self.put(key, value)
+        return value
+
+    def stats(self):
+        """
+        Returns the entry count, bytes held, hit ratio and eviction count.
+        """
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_ratio": self._hits / lookups if lookups else 0.0,
+                "evictions": self._evictions,
+            }
@@ -0,0 +1,188 @@
+import logging
+import sys
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+logger = logging.getLogger(__name__)
+
+# Repeated strings stored as categoricals
+CATEGORICAL_COLUMNS = ('Organization Name', 'Project Location City', 'Project Location State', 'TES Priority', 'Block Group ID')
+# Integer columns downcast to the narrowest unsigned type that holds them
+NARROW_INT_COLUMNS = ('# Trees To Be Planted',)
+# List columns and {item: count} columns stored as Arrow lists and maps of dictionary-encoded items
+COMPACT_LIST_COLUMNS = ('USDA Matched Species', 'Goals from Ollama', 'All Species', 'Cleaned Species', 'Goal Categories')
+COMPACT_COUNT_COLUMNS = ('Goal Term Counts',)
+# Only needed to ingest new CSV rows, which works from the processed artifact
+DROPPED_COLUMNS = ('Row Hash',)
+
+
+def _index_type(size):
+    return pa.int16() if size < np.iinfo(np.int16).max else pa.int32()
+
+
+def _offsets(lengths):
+    return pa.array(np.concatenate([[0], np.cumsum(lengths)]), type=pa.int32())
+
+
+def _dictionary_items(items):
+    """
+    Dictionary-encodes a flat list of strings, with the narrowest index type that holds the vocabulary.
+    """
+    encoded = pa.array(items, type=pa.string()).dictionary_encode()
+    return encoded.cast(pa.dictionary(_index_type(len(encoded.dictionary)), pa.string()))
+
+
+def arrow_list_column(lists, index=None):
+    """
+    Returns a column of lists of strings as an Arrow-backed Series: each cell still reads as a Python list,
+    but the items are stored once per vocabulary entry plus a small integer code per occurrence.
+    """
+    lengths = [len(items) for items in lists]
+    array = pa.ListArray.from_arrays(_offsets(lengths), _dictionary_items([item for items in lists for item in items]))
+    return pd.Series(array, index=index, dtype=pd.ArrowDtype(array.type))
+
+
+def arrow_count_column(dicts, index=None):
+    """
+    Returns a column of {item: count} dicts as an Arrow-backed Series of maps with dictionary-encoded keys.
+    Each cell reads as a list of (item, count) pairs; `list_values` turns them back into dicts.
+    """
+    lengths = [len(counts) for counts in dicts]
+    keys = _dictionary_items([item for counts in dicts for item in counts])
+    counts = pa.array([count for counts in dicts for count in counts.values()], type=pa.int32())
+    array = pa.MapArray.from_arrays(_offsets(lengths), keys, counts)
+    return pd.Series(array, index=index, dtype=pd.ArrowDtype(array.type))
+
+
+def _is_arrow(values):
+    return isinstance(values.dtype, pd.ArrowDtype)
+
+
+def _arrow_values(values):
+    # An Array, or a ChunkedArray once frames have been concatenated; each chunk keeps its own vocabulary
+    return pa.array(values)
+
+
+def _count_entries(values):
+    """
+    Returns the (item, count) entries of an Arrow map column's rows, flattened, as a table.
+    """
+    map_type = values.dtype.pyarrow_dtype
+    entry_type = pa.list_(pa.struct([('item', map_type.key_type), ('count', map_type.item_type)]))
+    # Map arrays can't be flattened directly, and their keys/items ignore slicing; the list cast respects it
+    entries = pc.list_flatten(_arrow_values(values).cast(entry_type))
+    return pa.table({'item': pc.struct_field(entries, 'item').cast(pa.string()), 'count': pc.struct_field(entries, 'count')})
+
+
+def list_values(df, column):
+    """
+    Returns a column of `df` as Python lists (or dicts), whether it is compacted or not.
+    """
+    values = df[column]
+    if not _is_arrow(values):
+        return values
+    decoded = values.tolist()
+    if pa.types.is_map(values.dtype.pyarrow_dtype):
+        decoded = [dict(pairs) for pairs in decoded]
+    return pd.Series(decoded, index=df.index, dtype=object)
+
+
+def joined_values(df, column, separator=', '):
+    """
+    Returns a list column of `df` as strings of its items joined by `separator`, joined in Arrow
+    rather than row by row in Python.
+    """
+    values = df[column]
+    if _is_arrow(values):
+        lists = _arrow_values(values).cast(pa.list_(pa.string()))
+    else:
+        lists = pa.array(values.tolist(), type=pa.list_(pa.string()))
+    return pd.Series(pc.binary_join(lists, separator).to_pylist(), index=df.index, dtype=object)
+
+
+def count_totals(df, column):
+    """
+    Returns {item: total count} over the rows of `df` for a column of {item: count} dicts.
+    """
+    values = df[column]
+    if not _is_arrow(values):
+        totals = Counter()
+        for counts in values:
+            totals.update(counts)
+        return dict(totals)
+    sums = _count_entries(values).group_by('item').aggregate([('count', 'sum')])
+    return dict(zip(sums['item'].to_pylist(), sums['count_sum'].to_pylist()))
+
+
+def with_list_values(df):
+    """
+    Returns `df` with its compacted columns decoded back to Python lists and dicts, for display.
+    """
+    decoded = {
+        column: list_values(df, column)
+        for column in COMPACT_LIST_COLUMNS + COMPACT_COUNT_COLUMNS if column in df.columns and _is_arrow(df[column])
+    }
+    return df.assign(**decoded) if decoded else df
+
+
+def compact_project_frame(df):
+    """
+    Returns a memory-compact copy of the cleaned project frame: categoricals for repeated strings,
+    narrow integers for tree counts, and Arrow lists and maps of dictionary-encoded items for the list
+    and {item: count} columns. Every column keeps its name and still reads as usable values.
+    """
+    compact = df.drop(columns=[col for col in DROPPED_COLUMNS if col in df.columns])
+    for col in CATEGORICAL_COLUMNS:
+        if col in compact.columns:
+            compact[col] = compact[col].astype('category')
+    for col in NARROW_INT_COLUMNS:
+        if col in compact.columns and len(compact) and compact[col].min() >= 0:
+            compact[col] = pd.to_numeric(compact[col], downcast='unsigned')
+    for col in COMPACT_LIST_COLUMNS + COMPACT_COUNT_COLUMNS:
+        if col in compact.columns and not _is_arrow(compact[col]):
+            values = compact[col].tolist()
+            encode = arrow_count_column if col in COMPACT_COUNT_COLUMNS else arrow_list_column
+            compact[col] = encode(values, index=compact.index)
+    return compact
+
+
+def _nested_bytes(value):
+    # pandas' deep memory usage counts a list or dict cell's container but not the items in it
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(_nested_bytes(key) + _nested_bytes(item) for key, item in value.items())
+    elif isinstance(value, (list, tuple)):
+        size += sum(_nested_bytes(item) for item in value)
+    return size
+
+
+def column_bytes(df):
+    """
+    Returns the bytes each column of `df` holds, including the items of list and dict cells.
+    """
+    sizes = df.memory_usage(deep=True, index=False)
+    for column in df.columns[df.dtypes == object]:
+        if len(df) and isinstance(df[column].iloc[0], (list, dict)):
+            sizes[column] = int(df[column].memory_usage(index=False)) + sum(_nested_bytes(value) for value in df[column])
+    return sizes
+
+
+def memory_report(before, after):
+    """
+    Returns bytes per column before and after compaction, largest first, with a total row.
+    """
+    report = pd.DataFrame({
+        'dtype before': before.dtypes.astype(str),
+        'bytes before': column_bytes(before),
+        'dtype after': after.dtypes.astype(str),
+        'bytes after': column_bytes(after),
+    })
+    report['bytes after'] = report['bytes after'].fillna(0).astype(np.int64)
+    report['dtype after'] = report['dtype after'].fillna('(dropped)')
+    report = report.sort_values('bytes before', ascending=False)
+    report.loc['Total'] = ['', report['bytes before'].sum(), '', report['bytes after'].sum()]
+    return report
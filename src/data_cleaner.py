@@ -1,216 +1,1213 @@
+import argparse
+import difflib
+import functools
+import hashlib
+import json
+import logging
+import os
+import sys
+import time
+from collections import Counter
+from datetime import datetime, timezone
+
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import re
 import streamlit as st
 import ast
 
+from src.compaction import compact_project_frame, memory_report
+from src.instrumentation import timed
+from src.tes_layer import (
+    TES_MANIFEST_FILE, TES_SOURCE_FILES, file_sha256, get_tes_layer, locate_points, manifest_sources, source_hashes, store_applies,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FILE_PATHS = {
+    'original_data': "data/Geocoded_MCDC-Sample-Info.csv",
+    'new_data': "data/usda_species_extracted_with_ollama_and_goals.csv"
+}
+
+# Broader tree categories used to group the canonical species
+TREE_TYPE_MAP = {
+    'Fruit & Nut': ['Apple', 'Cherry', 'Hazelnut', 'Hickory', 'Pawpaw', 'Peach', 'Pear', 'Pecan', 'Plum', 'Walnut'],
+    'Shade Trees': ['Ash', 'Beech', 'Birch', 'Buckeye', 'Catalpa', 'Elm', 'Ginkgo', 'Gum', 'Hackberry', 'Honeylocust', 'Kentucky Coffeetree', 'Linden', 'Maple', 'Oak', 'Sycamore', 'Tulip Tree'],
+    'Ornamental/Flowering': ['Dogwood', 'Fringe Tree', 'Hornbeam', 'Redbud', 'Serviceberry'],
+    'Evergreens/Conifers': ['Cedar', 'Cypress', 'Pine', 'Spruce'],
+    'Unspecified/Native': ['Unspecified/Generic'] # Grouping these together
+}
+SPECIES_TO_TREE_TYPE = {species: tree_type for tree_type, species_list in TREE_TYPE_MAP.items() for species in species_list}
+# The canonical species names, without the generic placeholder
+TREE_TYPE_MAP_SPECIES = [species for species in SPECIES_TO_TREE_TYPE if species != 'Unspecified/Generic']
+
+# Multi-hot (uint8) columns added by the pipeline, one per species, tree type and goal category,
+# so charts and metrics are column sums instead of explode + groupby
+SPECIES_COLUMN_PREFIX = "Species: "
+TREE_TYPE_COLUMN_PREFIX = "Tree Type: "
+GOAL_CATEGORY_COLUMN_PREFIX = "Goal Category: "
+ENCODED_COLUMN_PREFIXES = (SPECIES_COLUMN_PREFIX, TREE_TYPE_COLUMN_PREFIX, GOAL_CATEGORY_COLUMN_PREFIX)
+
+# Impact categories and the goal keywords that signal them, editable without code changes
+GOAL_CATEGORIES_FILE = "data/goal_categories.json"
+
+# Cleaned dataset written by `python -m src.data_cleaner build`. Bump the schema version
+# whenever the pipeline's output columns change, so existing artifacts get rebuilt.
+PROCESSED_DATA_FILE = "data/processed/projects.parquet"
+PROCESSED_SCHEMA_VERSION = 10
+PROCESSED_METADATA_KEY = b"faithinplace.processed"
+# Columns the pipeline reads from each CSV, with their dtypes. '# Trees To Be Planted' is typed by hand
+# in the applications, so it is read as text and coerced, dropping malformed rows instead of failing the load.
+# 'Project Description' is only read to key the join and is dropped from the cleaned dataset.
+ORIGINAL_DATA_COLUMNS = {
+    'Organization Name': 'str',
+    'Project Description': 'str',
+    '# Trees To Be Planted': 'str',
+    'Project Location City': 'str',
+    'Project Location State': 'str',
+    'Latitude': 'float64',
+    'Longitude': 'float64',
+}
+NLP_DATA_COLUMNS = {
+    'Organization Name': 'str',
+    'Project Description': 'str',
+    'USDA Matched Species': 'str',
+    'Species from Ollama': 'str',
+    'Goals from Ollama': 'str',
+}
+# Unmatched applications named in the join report log; the rest are counted
+JOIN_REPORT_LOG_LIMIT = 20
+# Rows per chunk when reading the CSVs, which bounds the parser's memory on multi-year files
+CSV_CHUNK_ROWS = 50_000
+
+# Long application text the charts never use, kept out of the cleaned dataset in a separate store
+# read one project at a time by the detail view
+PROJECT_TEXT_COLUMNS = ['Project Description', 'Project Goals', 'Workforce Development', 'Planting and Maintenance Plan', 'Project Address']
+PROJECT_TEXT_FILE = "data/processed/project_text.parquet"
+PROJECT_TEXT_METADATA_KEY = b"faithinplace.project_text"
+
+# Content hash of each raw merged row, used to reuse unchanged rows on incremental ingestion
+ROW_HASH_COLUMN = 'Row Hash'
+LIST_COLUMNS = ['USDA Matched Species', 'Goals from Ollama', 'All Species', 'Cleaned Species', 'Goal Categories']
+# Stored as JSON text: their values mix counts, None and lists, which Arrow can't type as one map
+DICT_COLUMNS = ['Species from Ollama', 'Goal Term Counts']
+
+# Tree Equity Score priority bands (lower scores mean a greater need for trees)
+TES_PRIORITY_BINS = [-np.inf, 70, 80, 90, 100, np.inf]
+TES_PRIORITY_LABELS = ["Highest", "High", "Moderate", "Low", "None"]
+
+# Python literals that have no JSON spelling; cells containing them go straight to ast.literal_eval
+_PYTHON_ONLY_LITERALS = re.compile(r"\b(?:None|True|False)\b")
+_PYTHON_QUOTES_TO_JSON = str.maketrans("'", '"')
+
+
+def _decode_literal(text):
+    """
+    Decodes one Python-literal cell, trying the fast JSON decoder before ast.literal_eval.
+    Returns (value, path) where path names the decoder that succeeded.
+    """
+    try:
+        return json.loads(text), 'json'
+    except ValueError:
+        pass
+    # Without double quotes or escapes, single quotes can only be string delimiters,
+    # so swapping them yields the JSON spelling of the same literal.
+    if '"' not in text and '\\' not in text and not _PYTHON_ONLY_LITERALS.search(text):
+        try:
+            return json.loads(text.translate(_PYTHON_QUOTES_TO_JSON)), 'normalized_json'
+        except ValueError:
+            pass
+    try:
+        return ast.literal_eval(text), 'literal_eval'
+    except (ValueError, SyntaxError, TypeError, MemoryError, RecursionError):
+        return None, 'failed'
+
+
+def parse_literal_column(values, start_char, empty_val):
+    """
+    Parses a column of Python-literal strings (lists or dicts written by the Ollama extraction step) in bulk.
+    Each distinct cell is decoded once; cells that aren't strings starting with `start_char`, or that fail
+    to parse, get a copy of `empty_val`. Returns the parsed Series and a count of cells per decoding path.
+    """
+    expected_type = type(empty_val)
+    is_literal = values.map(lambda x: isinstance(x, str) and x.lstrip().startswith(start_char)).astype(bool)
+    stats = {'empty': int((~is_literal).sum()), 'json': 0, 'normalized_json': 0, 'literal_eval': 0, 'failed': 0}
+
+    decoded = {}
+    for text in pd.unique(values[is_literal]):
+        value, path = _decode_literal(text)
+        if not isinstance(value, expected_type):
+            value, path = None, 'failed'
+        decoded[text] = (value, path)
+
+    parsed = []
+    for text, literal in zip(values, is_literal):
+        value, path = decoded[text] if literal else (None, 'empty')
+        if literal:
+            stats[path] += 1
+        parsed.append(value if value is not None else expected_type(empty_val))
+    return pd.Series(parsed, index=values.index, dtype=object), stats
+
+
+# Every known spelling (lowercase) of a species, mapped to its canonical name.
+_SPECIES_NAME_MAP = {
+    # --- Apple ---
+    'apple': 'Apple', 'apple (malus domestica)': 'Apple', 'apples': 'Apple',
+    'dwarf apple': 'Apple', 'granny smith': 'Apple', 'honeycrisp': 'Apple',
+    'honeycrisp apple': 'Apple', 'red apple': 'Apple', 'malus domestica': 'Apple',
+    'crabapple': 'Apple',
+    # --- Ash ---
+    'ash': 'Ash',
+    # --- Beech ---
+    'beech': 'Beech', 'american beech': 'Beech', 'fagus grandifolia': 'Beech',
+    # --- Birch ---
+    'birch': 'Birch', 'river birch': 'Birch', 'river birch (betula nigra)': 'Birch',
+    # --- Buckeye ---
+    'buckeye': 'Buckeye', 'aesculus glabra': 'Buckeye', 'ohio buckeye': 'Buckeye',
+    'red buckeye': 'Buckeye',
+    # --- Catalpa ---
+    'catalpa': 'Catalpa', 'northern catalpa': 'Catalpa',
+    # --- Cedar ---
+    'cedar': 'Cedar', 'white cedar': 'Cedar', 'thuja occidentalis': 'Cedar',
+    # --- Cherry ---
+    'cherry': 'Cherry', 'lapins cherry': 'Cherry', 'rainier cherry': 'Cherry',
+    'stella cherry': 'Cherry', 'sand cherry tree': 'Cherry',
+    # --- Coffeetree ---
+    'coffee': 'Kentucky Coffeetree', 'coffeetree': 'Kentucky Coffeetree',
+    'kentucky coffee': 'Kentucky Coffeetree', 'kentucky coffee tree': 'Kentucky Coffeetree',
+    'gymnocladus dioicus': 'Kentucky Coffeetree', 'gymnocladus dioicus-kentucky coffee tree': 'Kentucky Coffeetree',
+    # --- Cypress ---
+    'cypress': 'Cypress', 'bald cypress': 'Cypress',
+    # --- Dogwood ---
+    'dogwood': 'Dogwood', 'japanese dogwood': 'Dogwood', 'pagoda dogwood': 'Dogwood',
+    'pagoda_dogwood': 'Dogwood',
+    # --- Elm ---
+    'elm': 'Elm', 'american elm': 'Elm', 'ulmus americana': 'Elm',
+    'ulmus americana "princeton"': 'Elm', 'ulmus x "morton glossy"': 'Elm',
+    # --- Ginkgo ---
+    'ginkgo': 'Ginkgo',
+    # --- Gum ---
+    'gum': 'Gum', 'sweet gum': 'Gum',
+    # --- Hackberry ---
+    'hackberry': 'Hackberry', 'hack berry': 'Hackberry', 'celtis occidentalis': 'Hackberry',
+    'celtis occidentalis-hackberry': 'Hackberry', 'common hackberry': 'Hackberry',
+    'sugarberry': 'Hackberry',
+    # --- Fringe Tree ---
+    'fringetree': 'Fringe Tree', 'fringe tree': 'Fringe Tree',
+    # --- Hazelnut ---
+    'hazelnut': 'Hazelnut', 'hedges of hazelnuts': 'Hazelnut', 'american hazelnut (corylus americana)': 'Hazelnut',
+    'corylus americana': 'Hazelnut',
+    # --- Hickory ---
+    'butternut hickory': 'Hickory', 'shagbark hickory': 'Hickory', 'carya ovata': 'Hickory',
+    'butternut': 'Hickory',
+    # --- Honeylocust ---
+    'honeylocust': 'Honeylocust', 'thornless honeylocust': 'Honeylocust',
+    'gleditsia triacanthos': 'Honeylocust', 'gleditsia triacanthos inermis "shademaster"': 'Honeylocust',
+    'locust': 'Honeylocust',
+    # --- Hornbeam ---
+    'hornbeam': 'Hornbeam', 'american hornbeam': 'Hornbeam', 'carpinus caroliniana': 'Hornbeam',
+    'hophornbeam': 'Hornbeam', 'ostrya virginiana': 'Hornbeam',
+    # --- Linden ---
+    'linden': 'Linden', 'american linden': 'Linden', 'littleleaf linden': 'Linden', 'basswood': 'Linden',
+    # --- Maple ---
+    'maple': 'Maple', 'red maple': 'Maple', 'acer rubrum': 'Maple', 'sugar maple': 'Maple',
+    'autumn blaze maple': 'Maple', 'red sunset maple': 'Maple', 'acer x freemanii `jeffsred`': 'Maple',
+    'memorial tree (red maple)': 'Maple',
+    # --- Oak ---
+    'oak': 'Oak', 'bur oak': 'Oak', 'burr oak': 'Oak', 'northern red oak': 'Oak', 'quercus rubra': 'Oak',
+    'red oak': 'Oak', 'white oak': 'Oak', 'chinkapin oak': 'Oak', 'chinquapin oak': 'Oak',
+    'northern red oak (quercus rubra)': 'Oak', 'northern_red_oak': 'Oak', 'oak species': 'Oak',
+    'quercus alba': 'Oak', 'quercus bicolor': 'Oak', 'swamp white oak': 'Oak', 'shingle oak': 'Oak',
+    'shumard oak': 'Oak', 'quercus shumardii': 'Oak', 'quercus imbricaria': 'Oak',
+    'quercus x schuetti': 'Oak', 'swamp white oak (quercus alba)': 'Oak', 'chinquapin': 'Oak',
+    # --- Pawpaw ---
+    'paw paw': 'Pawpaw', 'paw paw (asimina triloba)': 'Pawpaw', 'pawpaw': 'Pawpaw',
+    'pennsylvania golden pawpaw': 'Pawpaw', 'sunflower pawpaw': 'Pawpaw', 'asimina triloba': 'Pawpaw',
+    'sunflower': 'Pawpaw',
+    # --- Peach ---
+    'peach': 'Peach', 'elberta peach': 'Peach', 'harvester peach': 'Peach',
+    'majestic peach': 'Peach', 'peach tree': 'Peach', 'peaches': 'Peach',
+    # --- Pear ---
+    'pear': 'Pear', 'pear (pyrus communis)': 'Pear', 'pear_tree': 'Pear', 'pears': 'Pear',
+    'ornamental pear': 'Pear', 'pyrus communis': 'Pear',
+    # --- Pecan ---
+    'pecan': 'Pecan', 'northern pecan': 'Pecan', 'carya illinoinensis': 'Pecan', 'pecan tree': 'Pecan',
+    # --- Pine ---
+    'pine': 'Pine', 'eastern white pine': 'Pine', 'white pine': 'Pine',
+    # --- Plum ---
+    'plum': 'Plum', 'plums': 'Plum', 'american plum': 'Plum',
+    # --- Redbud ---
+    'redbud': 'Redbud', 'eastern redbud': 'Redbud', 'eastern red bud': 'Redbud',
+    'cercis canadensis': 'Redbud', 'eastern redbud (cercis canadensis)': 'Redbud',
+    'redbud eastern': 'Redbud',
+    # --- Serviceberry ---
+    'serviceberry': 'Serviceberry', 'allegheny serviceberry': 'Serviceberry',
+    'amelanchier': 'Serviceberry', 'amelanchier laevis': 'Serviceberry', 'service berry': 'Serviceberry',
+    'service berry (amenlanchier)': 'Serviceberry', 'serviceberry (amelanchier arborea)': 'Serviceberry',
+    # --- Spruce ---
+    'spruce': 'Spruce', 'dwarf alberta spruce': 'Spruce',
+    # --- Sycamore ---
+    'sycamore': 'Sycamore', 'american sycamore': 'Sycamore', 'platanus occidentalis': 'Sycamore',
+    'platanus occidentalis-sycamore': 'Sycamore',
+    # --- Tulip Tree ---
+    'tulip': 'Tulip Tree', 'tulip poplar': 'Tulip Tree', 'tulip tree': 'Tulip Tree',
+    'tuliptree': 'Tulip Tree', 'liriodendron tulipifera': 'Tulip Tree',
+    'liriodendron tulipifera-tulip poplar': 'Tulip Tree',
+    # --- Walnut ---
+    'walnut': 'Walnut',
+    # --- Unspecified/Generic ---
+    'count': 'Unspecified/Generic', 'species': 'Unspecified/Generic', 'tree': 'Unspecified/Generic',
+    'others': 'Unspecified/Generic', 'unspecified': 'Unspecified/Generic',
+    'threefold': 'Unspecified/Generic', 'street trees (not specified)': 'Unspecified/Generic',
+    'shade trees': 'Unspecified/Generic', 'native trees': 'Unspecified/Generic',
+    'indiana native (undetermined)': 'Unspecified/Generic', 'fruit bearing trees': 'Unspecified/Generic',
+    'large fruit and nut trees': 'Unspecified/Generic', 'small fruit trees': 'Unspecified/Generic',
+    'espaliered fruit trees': 'Unspecified/Generic',
+}
+# Canonical names also map to themselves, and lookups are always done in lowercase
+SPECIES_NORMALIZATION_MAP = {
+    **{canonical.lower(): canonical for canonical in set(_SPECIES_NAME_MAP.values())},
+    **{name.lower(): canonical for name, canonical in _SPECIES_NAME_MAP.items()},
+}
+
+# Minimum difflib similarity for a misspelled name to be resolved to a known spelling
+SPECIES_MATCH_CUTOFF = 0.85
+
+# Genera that name a single canonical species, for Latin names missing from the map ("acer saccharum" -> Maple).
+# Genera shared by several canonical species (Prunus, Carya) are left out on purpose.
+SPECIES_GENERA = {
+    'malus': 'Apple', 'fraxinus': 'Ash', 'fagus': 'Beech', 'betula': 'Birch', 'aesculus': 'Buckeye',
+    'catalpa': 'Catalpa', 'thuja': 'Cedar', 'gymnocladus': 'Kentucky Coffeetree', 'taxodium': 'Cypress',
+    'cornus': 'Dogwood', 'ulmus': 'Elm', 'ginkgo': 'Ginkgo', 'liquidambar': 'Gum', 'nyssa': 'Gum',
+    'celtis': 'Hackberry', 'chionanthus': 'Fringe Tree', 'corylus': 'Hazelnut', 'gleditsia': 'Honeylocust',
+    'carpinus': 'Hornbeam', 'ostrya': 'Hornbeam', 'tilia': 'Linden', 'acer': 'Maple', 'quercus': 'Oak',
+    'asimina': 'Pawpaw', 'pyrus': 'Pear', 'pinus': 'Pine', 'cercis': 'Redbud', 'amelanchier': 'Serviceberry',
+    'picea': 'Spruce', 'platanus': 'Sycamore', 'liriodendron': 'Tulip Tree', 'juglans': 'Walnut',
+}
+# Cultivar names in quotes and parenthesized notes, which never hold a name's head noun
+_SPECIES_NAME_NOISE = re.compile(r"'[^']*'|\"[^\"]*\"|`[^`]*`|\([^)]*\)")
+
+# name (lowercase) -> (canonical name, how it was resolved), for every name seen so far in this process
+_species_resolutions = {}
+
+
+def _trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+@functools.lru_cache(maxsize=None)
+def _species_match_index():
+    """
+    Builds the trigram index of the known spellings used for fuzzy matching, once per process.
+    """
+    trigram_index = {}
+    for name in SPECIES_NORMALIZATION_MAP:
+        for trigram in _trigrams(name):
+            trigram_index.setdefault(trigram, set()).add(name)
+    return trigram_index
+
+
+def _closest(text, candidates):
+    best, best_score = None, SPECIES_MATCH_CUTOFF
+    for candidate in candidates:
+        score = difflib.SequenceMatcher(None, text, candidate).ratio()
+        if score >= best_score:
+            best, best_score = candidate, score
+    return best
+
+
+def _singular_forms(word):
+    forms = [word]
+    if word.endswith('ies'):
+        forms.append(word[:-3] + 'y')
+    if word.endswith('es'):
+        forms.append(word[:-2])
+    if word.endswith('s') and not word.endswith('ss'):
+        forms.append(word[:-1])
+    return forms
+
+
+def head_noun_species(text):
+    """
+    Returns the canonical species a name's head noun names exactly, or None. The head of a Latin name is its
+    genus ("acer saccharum"), looked up in SPECIES_GENERA allowing for typos; the head of a common name is its last word, after
+    dropping "tree(s)" ("norway maple tree"), and must be a canonical species name, singular or plural.
+    Modifiers never count: "japanese tree lilac" and "river rocks" stay unresolved.
+    """
+    words = re.findall(r"[a-z]+", _SPECIES_NAME_NOISE.sub(" ", text))
+    if not words:
+        return None
+    genus = words[0] if len(words[0]) < 5 else _closest(words[0], SPECIES_GENERA)
+    if genus in SPECIES_GENERA:
+        return SPECIES_GENERA[genus]
+    canonical_names = {canonical.lower(): canonical for canonical in TREE_TYPE_MAP_SPECIES}
+    head = words
+    if len(head) > 1 and head[-1] in ('tree', 'trees') and ' '.join(head[-2:]) not in canonical_names:
+        head = head[:-1]
+    # Two-word canonical names ("tulip tree", "kentucky coffeetree") before single words
+    for size in (2, 1):
+        if len(head) < size:
+            continue
+        *modifiers, last = head[-size:]
+        for form in _singular_forms(last):
+            canonical = canonical_names.get(' '.join([*modifiers, form]))
+            if canonical is not None:
+                return canonical
+    return None
+
+
+def resolve_species_name(name):
+    """
+    Resolves a species name missing from SPECIES_NORMALIZATION_MAP to a canonical name.
+    Tries, in order: the closest known spelling of the whole name (catching typos such as "amenlanchier"),
+    then the name's head noun when it is exactly a genus or canonical species name ("norway maple" -> Maple,
+    see `head_noun_species`). Everything else is left unresolved, title-cased, for `species-report` to list.
+    Returns (canonical name, "fuzzy" | "head noun" | "unresolved"); results are cached per process.
+    """
+    key = name.lower()
+    if key in _species_resolutions:
+        return _species_resolutions[key]
+    trigram_index = _species_match_index()
+    text = re.sub(r"[_\-]+", " ", key).strip()
+
+    shared = {}
+    for trigram in _trigrams(text):
+        for candidate in trigram_index.get(trigram, ()):
+            shared[candidate] = shared.get(candidate, 0) + 1
+    candidates = sorted(shared, key=shared.get, reverse=True)[:10]
+    match = _closest(text, candidates)
+    head_species = head_noun_species(text) if match is None else None
+    if match is not None:
+        resolution = (SPECIES_NORMALIZATION_MAP[match], 'fuzzy')
+    elif head_species is not None:
+        resolution = (head_species, 'head noun')
+    else:
+        resolution = (name.title(), 'unresolved')
+    _species_resolutions[key] = resolution
+    return resolution
+
+
+def species_resolutions():
+    """
+    Returns every automatic resolution made so far in this process, for review, unresolved names first.
+    """
+    resolutions = pd.DataFrame(
+        [(name, canonical, how) for name, (canonical, how) in sorted(_species_resolutions.items())],
+        columns=['Name', 'Canonical Species', 'Resolution']
+    )
+    return resolutions.sort_values('Resolution', key=lambda how: how != 'unresolved', kind='stable', ignore_index=True)
+
+
 def normalize_species_list(species_list):
     """
-    Normalizes a list of species names using a comprehensive mapping dictionary.
-    """
-    # This map is now much more detailed to handle the variations from the data.
-    species_normalization_map = {
-        # --- Apple ---
-        'apple': 'Apple', 'apple (malus domestica)': 'Apple', 'apples': 'Apple',
-        'dwarf apple': 'Apple', 'granny smith': 'Apple', 'honeycrisp': 'Apple',
-        'honeycrisp apple': 'Apple', 'red apple': 'Apple', 'malus domestica': 'Apple',
-        'crabapple': 'Apple',
-        # --- Ash ---
-        'ash': 'Ash',
-        # --- Beech ---
-        'beech': 'Beech', 'american beech': 'Beech', 'fagus grandifolia': 'Beech',
-        # --- Birch ---
-        'birch': 'Birch', 'river birch': 'Birch', 'river birch (betula nigra)': 'Birch',
-        # --- Buckeye ---
-        'buckeye': 'Buckeye', 'aesculus glabra': 'Buckeye', 'ohio buckeye': 'Buckeye',
-        'red buckeye': 'Buckeye',
-        # --- Catalpa ---
-        'catalpa': 'Catalpa', 'northern catalpa': 'Catalpa',
-        # --- Cedar ---
-        'cedar': 'Cedar', 'white cedar': 'Cedar', 'thuja occidentalis': 'Cedar',
-        # --- Cherry ---
-        'cherry': 'Cherry', 'lapins cherry': 'Cherry', 'rainier cherry': 'Cherry',
-        'stella cherry': 'Cherry', 'sand cherry tree': 'Cherry',
-        # --- Coffeetree ---
-        'coffee': 'Kentucky Coffeetree', 'coffeetree': 'Kentucky Coffeetree',
-        'kentucky coffee': 'Kentucky Coffeetree', 'kentucky coffee tree': 'Kentucky Coffeetree',
-        'gymnocladus dioicus': 'Kentucky Coffeetree', 'gymnocladus dioicus-kentucky coffee tree': 'Kentucky Coffeetree',
-        # --- Cypress ---
-        'cypress': 'Cypress', 'bald cypress': 'Cypress',
-        # --- Dogwood ---
-        'dogwood': 'Dogwood', 'japanese dogwood': 'Dogwood', 'pagoda dogwood': 'Dogwood',
-        'pagoda_dogwood': 'Dogwood',
-        # --- Elm ---
-        'elm': 'Elm', 'american elm': 'Elm', 'ulmus americana': 'Elm',
-        'ulmus americana "princeton"': 'Elm', 'ulmus x "morton glossy"': 'Elm',
-        # --- Ginkgo ---
-        'ginkgo': 'Ginkgo',
-        # --- Gum ---
-        'gum': 'Gum', 'sweet gum': 'Gum',
-        # --- Hackberry ---
-        'hackberry': 'Hackberry', 'hack berry': 'Hackberry', 'celtis occidentalis': 'Hackberry',
-        'celtis occidentalis-hackberry': 'Hackberry', 'common hackberry': 'Hackberry',
-        'sugarberry': 'Hackberry',
-        'Fringetree': 'Fringe Tree', 'Fringe Tree': 'Fringe Tree',
-        # --- Hazelnut ---
-        'hazelnut': 'Hazelnut', 'hedges of hazelnuts': 'Hazelnut', 'american hazelnut (corylus americana)': 'Hazelnut',
-        'corylus americana': 'Hazelnut',
-        # --- Hickory ---
-        'butternut hickory': 'Hickory', 'shagbark hickory': 'Hickory', 'carya ovata': 'Hickory',
-        'butternut': 'Hickory',
-        # --- Honeylocust ---
-        'honeylocust': 'Honeylocust', 'thornless honeylocust': 'Honeylocust',
-        'gleditsia triacanthos': 'Honeylocust', 'gleditsia triacanthos inermis "shademaster"': 'Honeylocust',
-        'locust': 'Honeylocust',
-        # --- Hornbeam ---
-        'hornbeam': 'Hornbeam', 'american hornbeam': 'Hornbeam', 'carpinus caroliniana': 'Hornbeam',
-        'hophornbeam': 'Hornbeam', 'ostrya virginiana': 'Hornbeam',
-        # --- Linden ---
-        'linden': 'Linden', 'american linden': 'Linden', 'littleleaf linden': 'Linden', 'basswood': 'Linden',
-        # --- Maple ---
-        'maple': 'Maple', 'red maple': 'Maple', 'acer rubrum': 'Maple', 'sugar maple': 'Maple',
-        'autumn blaze maple': 'Maple', 'red sunset maple': 'Maple', 'acer x freemanii `jeffsred`': 'Maple',
-        'memorial tree (red maple)': 'Maple',
-        # --- Oak ---
-        'oak': 'Oak', 'bur oak': 'Oak', 'burr oak': 'Oak', 'northern red oak': 'Oak', 'quercus rubra': 'Oak',
-        'red oak': 'Oak', 'white oak': 'Oak', 'chinkapin oak': 'Oak', 'chinquapin oak': 'Oak',
-        'northern red oak (quercus rubra)': 'Oak', 'northern_red_oak': 'Oak', 'oak species': 'Oak',
-        'quercus alba': 'Oak', 'quercus bicolor': 'Oak', 'swamp white oak': 'Oak', 'shingle oak': 'Oak',
-        'shumard oak': 'Oak', 'quercus shumardii': 'Oak', 'quercus imbricaria': 'Oak',
-        'quercus x schuetti': 'Oak', 'swamp white oak (quercus alba)': 'Oak', 'chinquapin': 'Oak',
-        # --- Pawpaw ---
-        'paw paw': 'Pawpaw', 'paw paw (asimina triloba)': 'Pawpaw', 'pawpaw': 'Pawpaw',
-        'pennsylvania golden pawpaw': 'Pawpaw', 'sunflower pawpaw': 'Pawpaw', 'asimina triloba': 'Pawpaw',
-        'sunflower': 'Pawpaw',
-        # --- Peach ---
-        'peach': 'Peach', 'elberta peach': 'Peach', 'harvester peach': 'Peach',
-        'majestic peach': 'Peach', 'peach tree': 'Peach', 'peaches': 'Peach',
-        # --- Pear ---
-        'pear': 'Pear', 'pear (pyrus communis)': 'Pear', 'pear_tree': 'Pear', 'pears': 'Pear',
-        'ornamental pear': 'Pear', 'pyrus communis': 'Pear',
-        # --- Pecan ---
-        'pecan': 'Pecan', 'northern pecan': 'Pecan', 'carya illinoinensis': 'Pecan', 'pecan tree': 'Pecan',
-        # --- Pine ---
-        'pine': 'Pine', 'eastern white pine': 'Pine', 'white pine': 'Pine',
-        # --- Plum ---
-        'plum': 'Plum', 'plums': 'Plum', 'american plum': 'Plum',
-        # --- Redbud ---
-        'redbud': 'Redbud', 'eastern redbud': 'Redbud', 'eastern red bud': 'Redbud',
-        'cercis canadensis': 'Redbud', 'eastern redbud (cercis canadensis)': 'Redbud',
-        'redbud eastern': 'Redbud',
-        # --- Serviceberry ---
-        'serviceberry': 'Serviceberry', 'allegheny serviceberry': 'Serviceberry',
-        'amelanchier laevis': 'Serviceberry', 'service berry': 'Serviceberry',
-        'service berry (amenlanchier)': 'Serviceberry', 'serviceberry (amelanchier arborea)': 'Serviceberry',
-        # --- Spruce ---
-        'spruce': 'Spruce', 'dwarf alberta spruce': 'Spruce',
-        # --- Sycamore ---
-        'sycamore': 'Sycamore', 'american sycamore': 'Sycamore', 'platanus occidentalis': 'Sycamore',
-        'platanus occidentalis-sycamore': 'Sycamore',
-        # --- Tulip Tree ---
-        'tulip': 'Tulip Tree', 'tulip poplar': 'Tulip Tree', 'tulip tree': 'Tulip Tree',
-        'tuliptree': 'Tulip Tree', 'liriodendron tulipifera': 'Tulip Tree',
-        'liriodendron tulipifera-tulip poplar': 'Tulip Tree',
-        # --- Walnut ---
-        'walnut': 'Walnut',
-        # --- Unspecified/Generic ---
-        'count': 'Unspecified/Generic', 'species': 'Unspecified/Generic', 'tree': 'Unspecified/Generic',
-        'others': 'Unspecified/Generic', 'unspecified': 'Unspecified/Generic',
-        'threefold': 'Unspecified/Generic', 'street trees (not specified)': 'Unspecified/Generic',
-        'shade trees': 'Unspecified/Generic', 'native trees': 'Unspecified/Generic',
-        'indiana native (undetermined)': 'Unspecified/Generic', 'fruit bearing trees': 'Unspecified/Generic',
-        'large fruit and nut trees': 'Unspecified/Generic', 'small fruit trees': 'Unspecified/Generic',
-        'espaliered fruit trees': 'Unspecified/Generic',
+    Normalizes a list of species names to sorted, unique canonical names.
+    """
+    return sorted({
+        SPECIES_NORMALIZATION_MAP.get(species.lower()) or resolve_species_name(species)[0]
+        for species in species_list
+    })
+
+
+def normalize_species_column(species_lists):
+    """
+    Normalizes a column of species lists in one pass over the exploded names: known spellings are
+    mapped with a single vectorized lookup and only the distinct unknown names go through the resolver.
+    """
+    start = time.perf_counter()
+    names = species_lists.explode().dropna().astype(str)
+    canonical = names.str.lower().map(SPECIES_NORMALIZATION_MAP)
+    unmapped = canonical.isna()
+    unknown_names = pd.unique(names[unmapped])
+    resolved = {name: resolve_species_name(name) for name in unknown_names}
+    canonical[unmapped] = names[unmapped].map(lambda name: resolved[name][0])
+
+    pairs = pd.DataFrame({'row': canonical.index, 'species': canonical.to_numpy()}).drop_duplicates()
+    cleaned = pairs.sort_values(['row', 'species']).groupby('row', sort=False)['species'].agg(list)
+    result = pd.Series([cleaned.get(row, []) for row in species_lists.index], index=species_lists.index, dtype=object)
+
+    elapsed = time.perf_counter() - start
+    how_counts = pd.Series([how for _, how in resolved.values()], dtype=object).value_counts()
+    logger.info(
+        "Normalized %d species names (%d distinct unknown) in %.3fs (%.0f names/s): %d auto-resolved, %d unresolved",
+        len(names), len(unknown_names), elapsed, len(names) / elapsed if elapsed else float('inf'),
+        how_counts.get('fuzzy', 0) + how_counts.get('head noun', 0), how_counts.get('unresolved', 0)
+    )
+    return result
+
+
+@functools.lru_cache(maxsize=4)
+def _goal_matcher(path, mtime_ns):
+    """
+    Compiles the keyword table into one regex, once per version of the file.
+    Returns (pattern, {keyword: categories it signals}, category names, fallback category).
+    """
+    with open(path) as f:
+        table = json.load(f)
+    keyword_categories = {}
+    for category, keywords in table['categories'].items():
+        for keyword in keywords:
+            keyword_categories.setdefault(keyword.lower(), set()).add(category)
+    # A keyword matching at a word start also means every keyword that is its prefix matches there
+    # ("educational" -> "education"), so fold those categories in; the regex then only needs the longest.
+    signals = {
+        keyword: sorted(set().union(*(cats for other, cats in keyword_categories.items() if keyword.startswith(other))))
+        for keyword in keyword_categories
     }
+    alternation = '|'.join(re.escape(keyword) for keyword in sorted(keyword_categories, key=len, reverse=True))
+    # Keywords must start a word but may carry a suffix: "stem" matches "stems", not "system"
+    pattern = re.compile(rf"\b({alternation})")
+    return pattern, signals, list(table['categories']), table['fallback_category']
 
-    cleaned_list = set()
-    for species in species_list:
-        standardized_name = species_normalization_map.get(species.lower(), species.title())
-        cleaned_list.add(standardized_name)
 
-    return sorted(list(cleaned_list))
+def goal_matcher(path=GOAL_CATEGORIES_FILE):
+    """
+    Returns the compiled goal matcher for the keyword table at `path`, rebuilt when the file changes.
+    """
+    return _goal_matcher(path, os.stat(path).st_mtime_ns)
+
+
+def categorize_goals_column(goals_lists, path=GOAL_CATEGORIES_FILE):
+    """
+    Categorizes a whole column of goal lists with one regex pass over the lowercased goal text.
+    Returns a boolean matrix (one row per project, one column per category, with the fallback category
+    set where nothing matched) and the per-row sorted category lists derived from it.
+    """
+    pattern, signals, categories, fallback = goal_matcher(path)
+    goal_text = pd.Series([' '.join(goals) for goals in goals_lists], index=goals_lists.index).str.lower()
+
+    keywords = goal_text.str.extractall(pattern)[0]
+    hits = keywords.map(signals).explode()
+    matrix = pd.crosstab(hits.index.get_level_values(0), hits.to_numpy()).astype(bool)
+    matrix = matrix.reindex(index=goals_lists.index, columns=categories, fill_value=False).rename_axis(index=None, columns=None)
+    matrix[fallback] = ~matrix.any(axis=1)
+
+    sorted_categories = sorted(matrix.columns)
+    category_lists = pd.Series(
+        [[category for category, hit in zip(sorted_categories, row) if hit] for row in matrix[sorted_categories].to_numpy()],
+        index=goals_lists.index, dtype=object
+    )
+    return matrix, category_lists
 
 
 def categorize_project_goals(goals_list):
     """
     Analyzes a list of goals and assigns them to predefined impact categories.
     """
-    categories = set()
-    goal_text = ' '.join(goals_list).lower()
+    _, category_lists = categorize_goals_column(pd.Series([goals_list], dtype=object))
+    return category_lists.iloc[0]
+
+
+# Locally vendored NLTK data, filled by `python -m src.data_cleaner build` or `download-nltk`. The dashboard never downloads it
+NLTK_DATA_DIR = "nltk_data"
+# NLTK data packages the goal term counts need, with the resource path each one provides
+NLTK_PACKAGES = {
+    "punkt": "tokenizers/punkt",
+    "punkt_tab": "tokenizers/punkt_tab",
+    "wordnet": "corpora/wordnet",
+    "omw-1.4": "corpora/omw-1.4",
+}
+
+# --- EVEN MORE AGGRESSIVE STOPWORDS LIST ---
+# Left out of the goal term counts, so the word cloud never sees them
+GOAL_TERM_STOPWORDS = frozenset([
+    'of', 'the', 'for', 'a', 'in', 'with', 'project', 'tree', 'to', 'planting', 'through', 'provide', 'create', 'help', 'well',
+    'also', 'area', 'will', 'plan', 'our', 'place', 'campus', 'effort',
+    'surrounding', 'natural', 'goal', 'ha', 'student', 'program', 'new',
+    'year', 'work', 'member', 'organization', 'group', 'city',
+    'state', 'local', 'partner', 'people', 'site', 'ground', 'chicago',
+    'illinois', 'indiana', 'wisconsin', 'hand', 'etc', 'use', 'need', 'enhance',
+    'additional', 'make', 'ensure', 'within', 'around', 'including', 'and', 'to'
+])
+# The words WordCloud.generate would pick out of the lemmatized text
+_WORD_PATTERN = re.compile(r"\w[\w']*")
+
+
+@functools.lru_cache(maxsize=None)
+def _nltk():
+    # NLTK takes about a second to import, so only the pipeline steps that tokenize goals load it
+    import nltk
+    vendored = os.path.abspath(NLTK_DATA_DIR)
+    if vendored not in nltk.data.path:
+        nltk.data.path.insert(0, vendored)
+    return nltk
+
+
+def nltk_data_dirs():
+    """
+    Returns the directories NLTK searches for its data, vendored NLTK_DATA_DIR first, without importing NLTK.
+    """
+    dirs = [os.path.abspath(NLTK_DATA_DIR)]
+    dirs += [path for path in os.environ.get("NLTK_DATA", "").split(os.pathsep) if path]
+    dirs.append(os.path.expanduser("~/nltk_data"))
+    if sys.platform.startswith("win"):
+        dirs += [os.path.join(sys.prefix, "nltk_data"), os.path.join(sys.prefix, "share", "nltk_data"),
+                 os.path.join(sys.prefix, "lib", "nltk_data"), os.path.join(os.environ.get("APPDATA", "C:\\"), "nltk_data"),
+                 "C:\\nltk_data", "D:\\nltk_data", "E:\\nltk_data"]
+    else:
+        dirs += [os.path.join(sys.prefix, "nltk_data"), os.path.join(sys.prefix, "share", "nltk_data"),
+                 os.path.join(sys.prefix, "lib", "nltk_data"), "/usr/share/nltk_data", "/usr/local/share/nltk_data",
+                 "/usr/lib/nltk_data", "/usr/local/lib/nltk_data"]
+    return dirs
+
+
+def _nltk_resource_found(resource, dirs):
+    return any(
+        os.path.exists(os.path.join(data_dir, resource)) or os.path.exists(os.path.join(data_dir, resource) + ".zip")
+        for data_dir in dirs
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def nltk_data_available():
+    """
+    Returns whether every NLTK data package in NLTK_PACKAGES can be found locally, checked once per process.
+    Looks through NLTK's own search path (see `nltk_data_dirs`) on disk, so NLTK isn't imported to answer.
+    """
+    start = time.perf_counter()
+    dirs = nltk_data_dirs()
+    available = all(_nltk_resource_found(resource, dirs) for resource in NLTK_PACKAGES.values())
+    logger.info("NLTK data %s (checked in %.3fs)", "available" if available else "missing", time.perf_counter() - start)
+    return available
+
+
+def download_nltk_data(download_dir=NLTK_DATA_DIR):
+    """
+    Downloads the NLTK data packages into the vendored data directory.
+    """
+    nltk = _nltk()
+    for package in NLTK_PACKAGES:
+        if not nltk.download(package, download_dir=download_dir, quiet=True, raise_on_error=True):
+            raise RuntimeError(f"Could not download the NLTK package '{package}'.")
+        logger.info("Downloaded NLTK package '%s' to %s", package, download_dir)
+
+
+def ensure_nltk_data():
+    """
+    Downloads the NLTK data into NLTK_DATA_DIR unless it is already available, and returns whether it is now.
+    A failed download (e.g. offline) is only logged: the goal term counts are then left unlemmatized.
+    """
+    if nltk_data_available():
+        return True
+    try:
+        download_nltk_data()
+    except (OSError, ValueError, RuntimeError) as e:
+        logger.warning("Could not download the NLTK data, goal terms won't be lemmatized: %s", e)
+    nltk_data_available.cache_clear()
+    return nltk_data_available()
+
+
+def goal_term_counts(goals_lists):
+    """
+    Returns each project's lemmatized goal term counts as a {term: count} dict, tokenized the way
+    WordCloud.generate does it (no possessive 's, numbers or stopwords). Without the NLTK data, terms
+    are only lowercased; the word cloud still folds plurals into their singulars.
+    """
+    start = time.perf_counter()
+    lemmatized = nltk_data_available()
+    if lemmatized:
+        _nltk()
+        from nltk.stem import WordNetLemmatizer
+        from nltk.tokenize import word_tokenize
+        tokenize, lemmatize = word_tokenize, WordNetLemmatizer().lemmatize
+    else:
+        tokenize, lemmatize = _WORD_PATTERN.findall, str
+    # Goals share most of their vocabulary, so each distinct token is lemmatized once
+    lemmas = {}
+    term_counts = []
+    for goals in goals_lists:
+        if not goals:
+            term_counts.append({})
+            continue
+        tokens = tokenize(' '.join(goals))
+        for token in tokens:
+            if token not in lemmas:
+                lemmas[token] = lemmatize(token.lower())
+        words = _WORD_PATTERN.findall(' '.join(lemmas[token] for token in tokens))
+        words = (word[:-2] if word.endswith("'s") else word for word in words)
+        term_counts.append(dict(Counter(word for word in words if not word.isdigit() and word not in GOAL_TERM_STOPWORDS)))
+    logger.info(
+        "Counted goal terms of %d projects (%d distinct tokens%s) in %.3fs",
+        len(term_counts), len(lemmas), "" if lemmatized else ", not lemmatized: NLTK data missing",
+        time.perf_counter() - start
+    )
+    return pd.Series(term_counts, index=goals_lists.index, dtype=object)
+
+
+def fold_term_plurals(totals):
+    """
+    Returns a {term: count} frequency table with each plural folded into its singular when both occur,
+    like WordCloud does.
+    """
+    totals = dict(totals)
+    for term in [term for term in totals if term.endswith('s') and not term.endswith('ss') and term[:-1] in totals]:
+        totals[term[:-1]] += totals.pop(term)
+    return totals
+
+
+def encode_multi_hot(lists, prefix):
+    """
+    Returns a uint8 multi-hot frame for a column of lists: one column per distinct value (sorted), named `prefix + value`.
+    """
+    values = lists.explode().dropna()
+    matrix = pd.crosstab(values.index, values.to_numpy()).clip(upper=1).astype(np.uint8)
+    matrix = matrix.reindex(index=lists.index, fill_value=0).rename_axis(index=None, columns=None)
+    return matrix.add_prefix(prefix)
+
+
+def multi_hot(df, prefix):
+    """
+    Returns the multi-hot columns of `df` with the given prefix, named by value.
+    """
+    columns = [col for col in df.columns if col.startswith(prefix)]
+    return df[columns].rename(columns=lambda col: col[len(prefix):])
+
+
+def without_encoded_columns(df):
+    """
+    Returns `df` without its multi-hot columns, for display.
+    """
+    return df[[col for col in df.columns if not col.startswith(ENCODED_COLUMN_PREFIXES)]]
+
+
+def tree_types(species_lists):
+    """
+    Maps each project's canonical species to tree types. Species outside TREE_TYPE_MAP, and projects
+    without any species, count as 'Other'.
+    """
+    return pd.Series(
+        [sorted({SPECIES_TO_TREE_TYPE.get(species, 'Other') for species in species_list} or {'Other'}) for species_list in species_lists],
+        index=species_lists.index, dtype=object
+    )
+
+
+def attach_tree_equity_scores(df, tes_paths=TES_SOURCE_FILES):
+    """
+    Adds the Tree Equity Score, block group ID and priority band of the block group each project falls in,
+    from the TES layer built from `tes_paths`.
+    Projects outside the TES layer (or all of them, if the layer can't be loaded) get a missing score and the "Unknown" band.
+    """
+    df = df.copy()
+    tes, block_group = pd.Series(np.nan, index=df.index), pd.Series(None, index=df.index, dtype=object)
+    try:
+        # Full detail, so projects close to a block group edge are assigned correctly
+        tes_layer = get_tes_layer("full", tes_paths)
+    except Exception as e:
+        logger.warning("Tree Equity Scores not attached, the TES layer could not be loaded: %s", e)
+    else:
+        positions = locate_points(tes_layer, df['Longitude'], df['Latitude'])
+        matched = positions >= 0
+        tes[matched] = tes_layer.gdf['tes'].to_numpy()[positions[matched]]
+        if 'GEOID' in tes_layer.gdf.columns:
+            block_group[matched] = tes_layer.gdf['GEOID'].to_numpy()[positions[matched]]
+        logger.info("Matched %d of %d projects to a TES block group", matched.sum(), len(df))
+
+    df['TES'] = tes
+    df['Block Group ID'] = block_group
+    df['TES Priority'] = pd.cut(tes, bins=TES_PRIORITY_BINS, labels=TES_PRIORITY_LABELS, right=False).astype(object).fillna('Unknown')
+    return df
+
+def project_keys(org_names, descriptions):
+    """
+    Returns a fingerprint per project, hashed from its organization name and project description after
+    normalizing Unicode form, case and whitespace, so formatting differences between files still join.
+    """
+    def normalize(values):
+        return (
+            values.fillna('').astype(str).str.normalize('NFKC').str.casefold()
+            .str.replace(r'\s+', ' ', regex=True).str.strip()
+        )
+    texts = normalize(org_names) + '\x1f' + normalize(descriptions)
+    return pd.Series(
+        [hashlib.blake2b(text.encode(), digest_size=8).hexdigest() for text in texts],
+        index=org_names.index
+    )
+
+
+def merge_project_sources(df_original, df_new_nlp):
+    """
+    Left-joins the Ollama columns onto the original applications by project key.
+    Returns the merged frame and a join report listing unmatched applications, applications with
+    several conflicting NLP rows (the first is kept) and exact duplicate NLP rows that were dropped.
+    """
+    key_cols = ['Organization Name', 'Project Description']
+    for source_df in (df_original, df_new_nlp):
+        if not all(col in source_df.columns for col in key_cols):
+            raise ValueError("No common identifying columns found")
+    df_original = df_original.assign(**{'Project Key': project_keys(df_original['Organization Name'], df_original['Project Description'])})
+    # Blank spreadsheet rows carry no project to join on
+    df_new_nlp = df_new_nlp.dropna(subset=key_cols, how='all')
+    nlp_cols = [col for col in ['USDA Matched Species', 'Species from Ollama', 'Goals from Ollama'] if col in df_new_nlp.columns]
+    df_nlp = df_new_nlp[nlp_cols].assign(**{
+        'Project Key': project_keys(df_new_nlp['Organization Name'], df_new_nlp['Project Description']),
+        'Organization Name': df_new_nlp['Organization Name'],
+    })
+
+    exact_duplicates = df_nlp.duplicated(subset=['Project Key'] + nlp_cols)
+    df_nlp = df_nlp[~exact_duplicates]
+    conflicting = df_nlp.duplicated(subset=['Project Key'], keep=False)
+    df_nlp_unique = df_nlp.drop_duplicates(subset=['Project Key'], keep='first')
+
+    df_merged = pd.merge(
+        df_original, df_nlp_unique[['Project Key'] + nlp_cols],
+        on='Project Key', how='left', validate='many_to_one', indicator=True
+    )
+    unmatched = df_merged['_merge'] == 'left_only'
+    report = {
+        'applications': len(df_original),
+        'matched': int((~unmatched).sum()),
+        'unmatched': df_merged.loc[unmatched, 'Organization Name'].tolist(),
+        'many_to_one': (
+            df_nlp[conflicting].groupby('Project Key', sort=False)
+            .agg(organization=('Organization Name', 'first'), nlp_rows=('Organization Name', 'size'))
+            .to_dict(orient='records')
+        ),
+        'dropped_duplicates': int(exact_duplicates.sum()),
+        'unused_nlp_rows': int((~df_nlp_unique['Project Key'].isin(df_original['Project Key'])).sum()),
+    }
+    return df_merged.drop(columns='_merge'), report
+
+
+def log_join_report(report):
+    """
+    Logs a join report produced by merge_project_sources.
+    """
+    logger.info(
+        "Joined %d of %d applications to the NLP file (%d NLP rows unused, %d duplicate NLP rows dropped)",
+        report['matched'], report['applications'], report['unused_nlp_rows'], report['dropped_duplicates']
+    )
+    unmatched = report['unmatched']
+    if unmatched:
+        more = f" (and {len(unmatched) - JOIN_REPORT_LOG_LIMIT} more)" if len(unmatched) > JOIN_REPORT_LOG_LIMIT else ""
+        logger.warning("Applications without NLP results: %s%s", "; ".join(unmatched[:JOIN_REPORT_LOG_LIMIT]), more)
+    for match in report['many_to_one'][:JOIN_REPORT_LOG_LIMIT]:
+        logger.warning("'%s' matches %d different NLP rows, keeping the first", match['organization'], match['nlp_rows'])
+    if len(report['many_to_one']) > JOIN_REPORT_LOG_LIMIT:
+        logger.warning("%d more applications match several NLP rows", len(report['many_to_one']) - JOIN_REPORT_LOG_LIMIT)
+
+
+def read_csv_chunks(path, columns, chunksize=CSV_CHUNK_ROWS):
+    """
+    Yields chunks of a CSV holding only `columns` ({name: dtype}); columns the file doesn't have are skipped.
+    """
+    yield from pd.read_csv(path, usecols=lambda col: col in columns, dtype=columns, chunksize=chunksize)
+
+
+def read_csv_columns(path, columns, chunksize=CSV_CHUNK_ROWS):
+    """
+    Reads only `columns` ({name: dtype}) of a CSV, in chunks.
+    """
+    return pd.concat(read_csv_chunks(path, columns, chunksize), ignore_index=True)
+
+
+def read_project_sources(file_paths):
+    """
+    Reads the columns the pipeline needs from both CSVs and joins them. Returns (merged frame, join report).
+    """
+    with timed("data: read original CSV", payload_bytes=os.path.getsize(file_paths['original_data'])) as timing:
+        df_original = read_csv_columns(file_paths['original_data'], ORIGINAL_DATA_COLUMNS)
+        timing["rows"] = len(df_original)
+    with timed("data: read NLP CSV", payload_bytes=os.path.getsize(file_paths['new_data'])) as timing:
+        df_new_nlp = read_csv_columns(file_paths['new_data'], NLP_DATA_COLUMNS)
+        timing["rows"] = len(df_new_nlp)
+    with timed("data: merge sources") as timing:
+        df_merged, join_report = merge_project_sources(df_original, df_new_nlp)
+        timing["rows"] = len(df_merged)
+    log_join_report(join_report)
+    # The description lives in the project text store; the Project Key already identifies it
+    return df_merged.drop(columns='Project Description'), join_report
+
+
+def row_content_hashes(df):
+    """
+    Returns a uint64 hash of each raw row's content. Values are hashed as text, so a column's inferred
+    dtype changing when new rows arrive doesn't change the hashes of the old ones.
+    """
+    return pd.util.hash_pandas_object(df.astype(str), index=False).to_numpy()
+
+
+def clean_project_rows(df_merged, tes_paths=TES_SOURCE_FILES):
+    """
+    Runs the row-by-row cleaning stages on merged rows: parse, normalize species, categorize goals (as a list
+    column and multi-hot columns) and attach TES. Rows missing a location or tree count are dropped; the index of the remaining rows is kept.
+    """
+    df_cleaned = df_merged.copy()
+    if 'Project Location State' in df_cleaned.columns:
+        state_mapping = {'ILLINOIS': 'IL', 'INDIANA': 'IN', 'WISCONSIN': 'WI'}
+        df_cleaned['Project Location State'] = df_cleaned['Project Location State'].astype(str).str.strip().str.upper().replace(state_mapping)
+        valid_states = ['IL', 'IN', 'WI']
+        df_cleaned['Project Location State'] = df_cleaned['Project Location State'].apply(lambda x: x if x in valid_states else 'Other/Invalid')
+    for col in ['Latitude', 'Longitude', '# Trees To Be Planted']:
+        if col in df_cleaned.columns:
+            df_cleaned[col] = pd.to_numeric(df_cleaned[col], errors='coerce')
+    df_cleaned.dropna(subset=['Latitude', 'Longitude', '# Trees To Be Planted'], inplace=True)
+    df_cleaned['# Trees To Be Planted'] = df_cleaned['# Trees To Be Planted'].astype(int)
+    for col, start_char, empty_val in [
+        ('Species from Ollama', '{', {}),
+        ('USDA Matched Species', '[', []),
+        ('Goals from Ollama', '[', [])
+    ]:
+        if col in df_cleaned.columns:
+            with timed(f"clean: parse {col}", rows=len(df_cleaned)):
+                df_cleaned[col], parse_stats = parse_literal_column(df_cleaned[col], start_char, empty_val)
+            logger.info("Parsed '%s': %s", col, ", ".join(f"{path}={count}" for path, count in parse_stats.items()))
+
+    # --- Species Cleaning (unchanged) ---
+    def combine_species(row):
+        ollama_species = list(row.get('Species from Ollama', {}).keys())
+        usda_species = row.get('USDA Matched Species', [])
+        return list(set(ollama_species + usda_species))
+    with timed("clean: combine species", rows=len(df_cleaned)):
+        df_cleaned['All Species'] = df_cleaned.apply(combine_species, axis=1) if len(df_cleaned) else pd.Series(dtype=object)
+    with timed("clean: normalize species", rows=len(df_cleaned)):
+        df_cleaned['Cleaned Species'] = normalize_species_column(df_cleaned['All Species'])
+
+    # --- ADD GOAL CATEGORIZATION ---
+    if 'Goals from Ollama' in df_cleaned.columns:
+        with timed("clean: categorize goals", rows=len(df_cleaned)):
+            goal_matrix, df_cleaned['Goal Categories'] = categorize_goals_column(df_cleaned['Goals from Ollama'])
+            # The categorizer's matrix already is the multi-hot encoding; every configured category gets a column
+            df_cleaned = df_cleaned.join(goal_matrix.astype(np.uint8).add_prefix(GOAL_CATEGORY_COLUMN_PREFIX))
+        with timed("clean: goal term counts", rows=len(df_cleaned)):
+            df_cleaned['Goal Term Counts'] = goal_term_counts(df_cleaned['Goals from Ollama'])
+
+    # --- ATTACH TREE EQUITY SCORES ---
+    with timed("clean: attach TES", rows=len(df_cleaned)):
+        return attach_tree_equity_scores(df_cleaned, tes_paths)
+
+
+def encode_project_columns(df):
+    """
+    Appends the multi-hot species and tree type columns derived from the cleaned species lists.
+    The goal category columns come straight from the categorizer, in `clean_project_rows`.
+    """
+    encoded = [
+        encode_multi_hot(df['Cleaned Species'], SPECIES_COLUMN_PREFIX),
+        encode_multi_hot(tree_types(df['Cleaned Species']), TREE_TYPE_COLUMN_PREFIX),
+    ]
+    return pd.concat([df, *encoded], axis=1)
+
+
+def build_project_data(file_paths):
+    """
+    Runs the full cleaning pipeline on the raw CSVs: merge, parse, normalize species, categorize goals and attach TES.
+    """
+    df_merged, join_report = read_project_sources(file_paths)
+    with timed("data: row hashes", rows=len(df_merged)):
+        df_merged[ROW_HASH_COLUMN] = row_content_hashes(df_merged)
+    df_cleaned = clean_project_rows(df_merged).reset_index(drop=True)
+    with timed("data: encode columns", rows=len(df_cleaned)):
+        df_cleaned = encode_project_columns(df_cleaned)
+    df_cleaned.attrs['join_report'] = join_report
+    df_cleaned.attrs['dropped_row_hashes'] = dropped_row_hashes(df_merged[ROW_HASH_COLUMN], df_cleaned[ROW_HASH_COLUMN])
+    return df_cleaned
+
+
+def dropped_row_hashes(merged_hashes, kept_hashes):
+    """
+    Returns the sorted hashes of the merged rows the cleaning stages dropped, as plain ints for the artifact metadata.
+    """
+    return sorted(int(row_hash) for row_hash in set(merged_hashes.to_numpy()) - set(kept_hashes.to_numpy()))
+
 
-    # Define keywords for each category
-    category_keywords = {
-        "Environmental & Climate": ['environment', 'sustainability', 'climate', 'canopy', 'green', 'beautification', 'ecosystem', 'air quality', 'stormwater', 'biodiversity'],
-        "Youth & Education": ['education', 'youth', 'students', 'learning', 'school', 'educational', 'stem'],
-        "Community Building": ['community', 'engagement', 'neighborhood', 'beautify', 'volunteer', 'public', 'space', 'gathering', 'social'],
-        "Workforce & Economic": ['workforce', 'job', 'skills', 'economic', 'employment', 'career', 'development'],
-        "Food & Agriculture": ['food', 'agriculture', 'orchard', 'fruit', 'harvest', 'garden']
+def update_project_data(file_paths, previous):
+    """
+    Rebuilds the dataset from the raw CSVs, reusing the cleaned rows of `previous` (the last processed
+    snapshot) whose raw content is unchanged, and running the cleaning stages only on new or changed rows.
+    Rows the snapshot's cleaning dropped (its 'dropped_row_hashes' attr) are skipped without recleaning.
+    Rows no longer in the CSVs are dropped.
+    """
+    start = time.perf_counter()
+    df_merged, join_report = read_project_sources(file_paths)
+    with timed("data: row hashes", rows=len(df_merged)):
+        df_merged[ROW_HASH_COLUMN] = row_content_hashes(df_merged)
+
+    # Goal category columns are per-row cleaning output and are reused; species columns are re-encoded below
+    species_columns = [col for col in previous.columns if col.startswith((SPECIES_COLUMN_PREFIX, TREE_TYPE_COLUMN_PREFIX))]
+    snapshot = previous.drop(columns=species_columns).drop_duplicates(ROW_HASH_COLUMN).set_index(ROW_HASH_COLUMN, drop=False)
+    reuse = df_merged[ROW_HASH_COLUMN].isin(snapshot.index).to_numpy()
+    known_dropped = np.array(previous.attrs.get('dropped_row_hashes') or [], dtype=np.uint64)
+    skip = df_merged[ROW_HASH_COLUMN].isin(known_dropped).to_numpy() & ~reuse
+    recompute = ~reuse & ~skip
+    reused = snapshot.loc[df_merged.loc[reuse, ROW_HASH_COLUMN]]
+    # Take the merged rows' positions, so the result keeps the row order a full build gives
+    reused.index = df_merged.index[reuse]
+    parts, columns, recomputed_rows = [reused], snapshot.columns, 0
+    if recompute.any():
+        recomputed = clean_project_rows(df_merged[recompute])
+        # The fresh rows define the columns, in case the CSVs gained or lost one
+        parts.append(recomputed)
+        columns, recomputed_rows = recomputed.columns, len(recomputed)
+    df_cleaned = pd.concat(parts)[columns].sort_index().reset_index(drop=True)
+    with timed("data: encode columns", rows=len(df_cleaned)):
+        df_cleaned = encode_project_columns(df_cleaned)
+    df_cleaned.attrs['join_report'] = join_report
+    df_cleaned.attrs['dropped_row_hashes'] = dropped_row_hashes(df_merged[ROW_HASH_COLUMN], df_cleaned[ROW_HASH_COLUMN])
+
+    removed = (~snapshot.index.isin(df_merged[ROW_HASH_COLUMN])).sum()
+    logger.info(
+        "Ingested %d rows: reused %d, skipped %d dropped before, recomputed %d new or changed "
+        "(%d kept after cleaning), removed %d stale in %.2fs",
+        len(df_merged), reuse.sum(), skip.sum(), recompute.sum(), recomputed_rows, removed,
+        time.perf_counter() - start
+    )
+    return df_cleaned
+
+
+def dataset_sources(file_paths, tes_paths=TES_SOURCE_FILES):
+    """
+    Returns {path: SHA-256} of every input the processed dataset depends on, with the TES data read
+    from `tes_paths`, plus whether the NLTK data for the goal term counts is available.
+    """
+    paths = [file_paths['original_data'], file_paths['new_data'], GOAL_CATEGORIES_FILE]
+    recorded = {}
+    if store_applies(tes_paths):
+        # The TES store manifest pins the GeoJSON hashes it was built from
+        paths.append(TES_MANIFEST_FILE)
+        recorded = manifest_sources(TES_MANIFEST_FILE)
+    sources = {path: file_sha256(path) for path in paths}
+    # A GeoJSON edited since the store was built (the scores are then read from it, not the stale store) is keyed
+    # on its own hash, rehashed only once its size or modification time changes
+    sources.update({path: digest for path, digest in source_hashes(tes_paths).items() if recorded.get(path) != digest})
+    # Rebuild once the NLTK data shows up, so the goal term counts get lemmatized
+    sources['nltk_data'] = "available" if nltk_data_available() else "missing"
+    return sources
+
+
+def dataset_version(sources):
+    """
+    Returns a short, stable identifier of the processed dataset for a schema version and set of sources.
+    """
+    payload = json.dumps({"schema_version": PROCESSED_SCHEMA_VERSION, "sources": sources}, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+def write_processed_data(df, sources, path=PROCESSED_DATA_FILE):
+    """
+    Writes the cleaned dataset to Parquet, with the schema version and source hashes in the file metadata.
+    List columns are stored as native Arrow lists; dict columns as JSON text.
+    """
+    table_df = df.copy()
+    for col in DICT_COLUMNS:
+        if col in table_df.columns:
+            table_df[col] = [json.dumps(value, default=str) for value in table_df[col]]
+    table = pa.Table.from_pandas(table_df, preserve_index=False)
+    metadata = {
+        "schema_version": PROCESSED_SCHEMA_VERSION,
+        "dataset_version": dataset_version(sources),
+        "sources": sources,
+        "rows": len(df),
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "join_report": df.attrs.get('join_report'),
+        "dropped_row_hashes": df.attrs.get('dropped_row_hashes', []),
     }
+    table = table.replace_schema_metadata({**table.schema.metadata, PROCESSED_METADATA_KEY: json.dumps(metadata).encode()})
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    pq.write_table(table, path, compression="zstd")
+    return metadata
 
-    for category, keywords in category_keywords.items():
-        if any(keyword in goal_text for keyword in keywords):
-            categories.add(category)
 
-    if not categories:
-        return ["General Improvement"]
-    return sorted(list(categories))
+def read_processed_metadata(path=PROCESSED_DATA_FILE):
+    """
+    Returns the metadata stored with a processed dataset, or None if there is no usable artifact.
+    """
+    if not os.path.exists(path):
+        return None
+    metadata = pq.read_schema(path).metadata or {}
+    if PROCESSED_METADATA_KEY not in metadata:
+        return None
+    return json.loads(metadata[PROCESSED_METADATA_KEY])
+
+
+def read_processed_data(path=PROCESSED_DATA_FILE):
+    """
+    Reads a processed dataset back into the frame build_project_data produces.
+    """
+    table = pq.read_table(path)
+    metadata = json.loads(table.schema.metadata[PROCESSED_METADATA_KEY])
+    nested_cols = [col for col in LIST_COLUMNS + DICT_COLUMNS if col in table.column_names]
+    df = table.drop_columns(nested_cols).to_pandas()
+    # to_pylist gives plain Python lists, which the charts expect (not NumPy arrays)
+    for col in nested_cols:
+        values = table.column(col).to_pylist()
+        df[col] = [json.loads(value) for value in values] if col in DICT_COLUMNS else values
+    df = df[table.column_names]
+    df.attrs['join_report'] = metadata.get('join_report')
+    df.attrs['dropped_row_hashes'] = metadata.get('dropped_row_hashes', [])
+    return df
+
+
+def write_project_text(file_paths, version, path=PROJECT_TEXT_FILE):
+    """
+    Streams the long text columns of the applications CSV, chunk by chunk, into a Parquet store keyed by
+    Project Key and tagged with the dataset version it belongs to.
+    """
+    start = time.perf_counter()
+    columns = {'Organization Name': 'str', **{col: 'str' for col in PROJECT_TEXT_COLUMNS}}
+    schema = pa.schema(
+        [('Project Key', pa.string())] + [(col, pa.string()) for col in PROJECT_TEXT_COLUMNS],
+        metadata={PROJECT_TEXT_METADATA_KEY: json.dumps({"dataset_version": version}).encode()}
+    )
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    partial_path, rows = f"{path}.partial", 0
+    with pq.ParquetWriter(partial_path, schema, compression="zstd") as writer:
+        for chunk in read_csv_chunks(file_paths['original_data'], columns):
+            chunk = chunk.reindex(columns=['Organization Name', *PROJECT_TEXT_COLUMNS])
+            chunk.insert(0, 'Project Key', project_keys(chunk['Organization Name'], chunk['Project Description']))
+            writer.write_table(pa.Table.from_pandas(chunk[schema.names], schema=schema, preserve_index=False))
+            rows += len(chunk)
+    # Readers never see a half-written store
+    os.replace(partial_path, path)
+    logger.info("Wrote %d projects' text to %s in %.2fs", rows, path, time.perf_counter() - start)
+
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def load_project_text(project_key, version, file_paths, path=PROJECT_TEXT_FILE):
+    """
+    Returns the long text fields of one project as a dict (empty when the key is unknown). Reads only that
+    row from the project text store, or scans the applications CSV when the store is missing or from
+    another dataset version.
+    """
+    metadata = (pq.read_schema(path).metadata or {}) if os.path.exists(path) else {}
+    if json.loads(metadata.get(PROJECT_TEXT_METADATA_KEY, b"{}")).get("dataset_version") == version:
+        rows = pq.read_table(path, filters=[('Project Key', '==', project_key)]).to_pylist()
+    else:
+        logger.info("Project text store %s is missing or stale, reading %s", path, file_paths['original_data'])
+        columns = {'Organization Name': 'str', **{col: 'str' for col in PROJECT_TEXT_COLUMNS}}
+        rows = []
+        for chunk in read_csv_chunks(file_paths['original_data'], columns):
+            chunk = chunk.reindex(columns=['Organization Name', *PROJECT_TEXT_COLUMNS])
+            keys = project_keys(chunk['Organization Name'], chunk['Project Description'])
+            rows = chunk.loc[keys == project_key, PROJECT_TEXT_COLUMNS].to_dict(orient='records')
+            if rows:
+                break
+    if not rows:
+        return {}
+    return {col: value for col, value in rows[0].items() if col in PROJECT_TEXT_COLUMNS and pd.notna(value)}
+
+
+def can_update_incrementally(metadata, sources, file_paths):
+    """
+    Returns whether a processed dataset with `metadata` can be updated row by row to `sources`:
+    same schema, and only the two CSVs changed (new keywords, TES data or NLTK data affect every row).
+    """
+    if not metadata or metadata.get("schema_version") != PROCESSED_SCHEMA_VERSION:
+        return False
+    csv_paths = {file_paths['original_data'], file_paths['new_data']}
+    previous = {path: digest for path, digest in metadata.get("sources", {}).items() if path not in csv_paths}
+    return previous == {path: digest for path, digest in sources.items() if path not in csv_paths}
+
+
+def ingest_project_data(file_paths, sources, metadata):
+    """
+    Brings the processed dataset up to date with `sources` and writes it: incrementally when only the CSVs
+    changed since the last snapshot, and with a full rebuild otherwise.
+    """
+    start = time.perf_counter()
+    if can_update_incrementally(metadata, sources, file_paths):
+        df_cleaned = update_project_data(file_paths, read_processed_data())
+        logger.info("Updated the project dataset incrementally in %.2fs", time.perf_counter() - start)
+    else:
+        df_cleaned = build_project_data(file_paths)
+        logger.info("Rebuilt the project dataset from the raw CSVs in %.2fs", time.perf_counter() - start)
+    try:
+        with timed("data: write artifact", rows=len(df_cleaned)) as timing:
+            write_processed_data(df_cleaned, sources)
+            timing["payload_bytes"] = os.path.getsize(PROCESSED_DATA_FILE)
+        with timed("data: write project text") as timing:
+            write_project_text(file_paths, dataset_version(sources))
+            timing["payload_bytes"] = os.path.getsize(PROJECT_TEXT_FILE)
+    except OSError as e:
+        # A read-only deployment still works, it just rebuilds on every cold start
+        logger.warning("Could not write the processed dataset %s: %s", PROCESSED_DATA_FILE, e)
+    return df_cleaned
+
 
 @st.cache_data
 def load_project_data(file_paths):
     """
-    Loads, cleans, and categorizes project data.
+    Loads the cleaned project data from the processed artifact when it matches the current sources,
+    and otherwise brings the artifact up to date (incrementally when only the CSVs changed).
     """
     try:
-        df_original = pd.read_csv(file_paths['original_data'])
-        df_new_nlp = pd.read_csv(file_paths['new_data'])
-
-        # --- Merging and Basic Cleaning (unchanged) ---
-        merge_on_candidate_cols = ['Organization Name', 'Project Description']
-        actual_merge_on_cols = [col for col in merge_on_candidate_cols if col in df_original.columns and col in df_new_nlp.columns]
-        if not actual_merge_on_cols:
-            st.error("Error: No common identifying columns found.")
-            return None
-        cols_from_new_nlp = actual_merge_on_cols + ['USDA Matched Species', 'Species from Ollama', 'Goals from Ollama']
-        cols_from_new_nlp_existing = [col for col in cols_from_new_nlp if col in df_new_nlp.columns]
-        df_merged = pd.merge(
-            df_original, df_new_nlp[cols_from_new_nlp_existing].drop_duplicates(),
-            on=actual_merge_on_cols, how='left', suffixes=('_original', '_nlp')
+        start = time.perf_counter()
+        with timed("data: hash sources"):
+            sources = dataset_sources(file_paths)
+            metadata = read_processed_metadata()
+        if metadata and metadata.get("schema_version") == PROCESSED_SCHEMA_VERSION and metadata.get("sources") == sources:
+            with timed("data: read artifact", payload_bytes=os.path.getsize(PROCESSED_DATA_FILE)) as timing:
+                df_cleaned = read_processed_data()
+                timing["rows"] = len(df_cleaned)
+            logger.info("Loaded processed dataset %s in %.3fs", PROCESSED_DATA_FILE, time.perf_counter() - start)
+        else:
+            with timed("data: ingest") as timing:
+                df_cleaned = ingest_project_data(file_paths, sources, metadata)
+                timing["rows"] = len(df_cleaned)
+        with timed("data: compact frame", rows=len(df_cleaned)):
+            df_compact = compact_project_frame(df_cleaned)
+        with timed("data: memory report", rows=len(df_cleaned)) as timing:
+            report = memory_report(df_cleaned, df_compact)
+            timing["payload_bytes"] = int(report.loc['Total', 'bytes after'])
+        logger.info(
+            "Compacted the project frame from %d to %d bytes",
+            report.loc['Total', 'bytes before'], report.loc['Total', 'bytes after']
         )
-        df_cleaned = df_merged.copy()
-        if 'Project Location State' in df_cleaned.columns:
-            state_mapping = {'ILLINOIS': 'IL', 'INDIANA': 'IN', 'WISCONSIN': 'WI'}
-            df_cleaned['Project Location State'] = df_cleaned['Project Location State'].astype(str).str.strip().str.upper().replace(state_mapping)
-            valid_states = ['IL', 'IN', 'WI']
-            df_cleaned['Project Location State'] = df_cleaned['Project Location State'].apply(lambda x: x if x in valid_states else 'Other/Invalid')
-        for col in ['Latitude', 'Longitude', '# Trees To Be Planted']:
-            if col in df_cleaned.columns:
-                df_cleaned[col] = pd.to_numeric(df_cleaned[col], errors='coerce')
-        df_cleaned.dropna(subset=['Latitude', 'Longitude', '# Trees To Be Planted'], inplace=True)
-        df_cleaned['# Trees To Be Planted'] = df_cleaned['# Trees To Be Planted'].astype(int)
-        for col, start_char, empty_val in [
-            ('Species from Ollama', '{', {}),
-            ('USDA Matched Species', '[', []),
-            ('Goals from Ollama', '[', [])
-        ]:
-            if col in df_cleaned.columns:
-                df_cleaned[col] = df_cleaned[col].apply(
-                    lambda x: ast.literal_eval(x) if pd.notna(x) and isinstance(x, str) and x.strip().startswith(start_char) else empty_val
-                )
-
-        # --- Species Cleaning (unchanged) ---
-        def combine_species(row):
-            ollama_species = list(row.get('Species from Ollama', {}).keys())
-            usda_species = row.get('USDA Matched Species', [])
-            return list(set(ollama_species + usda_species))
-        df_cleaned['All Species'] = df_cleaned.apply(combine_species, axis=1)
-        df_cleaned['Cleaned Species'] = df_cleaned['All Species'].apply(normalize_species_list)
-
-        # --- ADD GOAL CATEGORIZATION ---
-        if 'Goals from Ollama' in df_cleaned.columns:
-            df_cleaned['Goal Categories'] = df_cleaned['Goals from Ollama'].apply(categorize_project_goals)
-
-        return df_cleaned
+        df_compact.attrs['dataset_version'] = dataset_version(sources)
+        return df_compact
     except FileNotFoundError as e:
         st.error(f"Error: A data file was not found. Please check '{e.filename}'.")
         return None
     except Exception as e:
         st.error(f"An error occurred while processing data: {e}.")
-        return None
\ No newline at end of file
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the processed project dataset used by the dashboard.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("build", help=f"Download the NLTK data if missing, run the cleaning pipeline and write {PROCESSED_DATA_FILE}.")
+    subparsers.add_parser("ingest", help=f"Update {PROCESSED_DATA_FILE}, recomputing only new or changed CSV rows when possible.")
+    subparsers.add_parser("memory-report", help="Load the dataset and list the bytes per column before and after compaction.")
+    subparsers.add_parser("species-report", help="Run the cleaning pipeline and list the species names missing from the map, unresolved ones first.")
+    subparsers.add_parser("download-nltk", help=f"Download the NLTK data the goal term counts need into {NLTK_DATA_DIR}.")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    if args.command == "build":
+        start = time.perf_counter()
+        ensure_nltk_data()
+        sources = dataset_sources(DEFAULT_FILE_PATHS)
+        df_cleaned = build_project_data(DEFAULT_FILE_PATHS)
+        metadata = write_processed_data(df_cleaned, sources)
+        write_project_text(DEFAULT_FILE_PATHS, metadata["dataset_version"])
+        logger.info(
+            "Wrote %s (%d projects, dataset version %s) in %.2fs",
+            PROCESSED_DATA_FILE, len(df_cleaned), metadata["dataset_version"], time.perf_counter() - start
+        )
+    elif args.command == "ingest":
+        sources = dataset_sources(DEFAULT_FILE_PATHS)
+        df_cleaned = ingest_project_data(DEFAULT_FILE_PATHS, sources, read_processed_metadata())
+        logger.info("Wrote %s (%d projects, dataset version %s)", PROCESSED_DATA_FILE, len(df_cleaned), dataset_version(sources))
+    elif args.command == "memory-report":
+        sources = dataset_sources(DEFAULT_FILE_PATHS)
+        metadata = read_processed_metadata()
+        if metadata and metadata.get("schema_version") == PROCESSED_SCHEMA_VERSION and metadata.get("sources") == sources:
+            df_cleaned = read_processed_data()
+        else:
+            df_cleaned = ingest_project_data(DEFAULT_FILE_PATHS, sources, metadata)
+        print(memory_report(df_cleaned, compact_project_frame(df_cleaned)).to_string())
+    elif args.command == "species-report":
+        build_project_data(DEFAULT_FILE_PATHS)
+        resolutions = species_resolutions()
+        print(resolutions.to_string(index=False))
+        unresolved = int((resolutions['Resolution'] == 'unresolved').sum())
+        if unresolved:
+            print(f"\n{unresolved} unresolved name(s): add them to _SPECIES_NAME_MAP to map them.")
+    elif args.command == "download-nltk":
+        download_nltk_data()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+import logging
+import threading
+import time
+from dataclasses import dataclass
+
+import streamlit as st
+
+from src.caching import ByteLRUCache
+
+logger = logging.getLogger(__name__)
+
+# Memory held by the figures shared by all sessions; the vector map of the whole region is the largest
+FIGURE_CACHE_BYTES = 256 * 1024 * 1024
+# Memory a Plotly figure takes per byte of its JSON (the map's GeoJSON dicts are the bulk of it)
+FIGURE_MEMORY_FACTOR = 8
+
+
+@dataclass(frozen=True)
+class CachedFigure:
+    """
+    A built and validated figure shared read-only by every session, and the size of the JSON st.plotly_chart
+    sends for it. `figure` is None for a chart with nothing to draw.
+    """
+    figure: "go.Figure | None"
+    payload_bytes: int
+
+
+@st.cache_resource
+def figure_cache():
+    """
+    Returns the process-wide cache of chart figures.
+    """
+    return ByteLRUCache(FIGURE_CACHE_BYTES)
+
+
+def figure_key(chart, dataset_version, selection, **options):
+    """
+    Returns the cache key of a chart's figure: the dataset version, the canonical filter selection
+    (see `filter_index.canonical_selection`) and the chart's options.
+    """
+    return (chart, dataset_version, selection, tuple(sorted(options.items())))
+
+
+def _prewarm(df, states, cache, marker_index):
+    # Imported here, so a cold start doesn't wait for Plotly before serving the first page
+    from src.map_visualizations import prewarm_default_figures
+
+    start = time.perf_counter()
+    try:
+        prewarm_default_figures(df, states, cache, marker_index)
+    except Exception:
+        logger.exception("Could not pre-warm the default figures")
+        return
+    stats = cache.stats()
+    logger.info(
+        "Pre-warmed the default figures in %.2fs (%d figures, %d bytes cached)",
+        time.perf_counter() - start, stats["entries"], stats["bytes"]
+    )
+
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def _prewarm_thread(dataset_version, states, _df):
+    from src.map_markers import get_marker_index
+
+    # The thread has no ScriptRunContext, so the Streamlit-cached objects it shares with the sessions are
+    # resolved here; the TES layer is too slow for the script thread and comes from `shared_tes_layer`
+    thread = threading.Thread(
+        target=_prewarm, args=(_df, list(states), figure_cache(), get_marker_index(_df)), name="figure-prewarm", daemon=True
+    )
+    thread.start()
+    return thread
+
+
+def start_figure_prewarm(df, states=None):
+    """
+    Builds the figures of the unfiltered default views into the shared cache in the background,
+    once per dataset version. `states` are the states the sidebar selects by default.
+    """
+    return _prewarm_thread(df.attrs.get("dataset_version", len(df)), tuple(states or ()), df)
@@ -0,0 +1,167 @@
+import logging
+import time
+from dataclasses import dataclass, field
+from itertools import combinations
+
+import numpy as np
+import streamlit as st
+
+logger = logging.getLogger(__name__)
+
+STATE_COLUMN = "Project Location State"
+ORGANIZATION_COLUMN = "Organization Name"
+PRIORITY_COLUMN = "TES Priority"
+# Columns the sidebar filters on, indexed by value
+FILTER_COLUMNS = (STATE_COLUMN, ORGANIZATION_COLUMN, PRIORITY_COLUMN)
+
+# Organization options are precomputed for every state combination up to this many states;
+# beyond that the combinations are resolved on first use and memoized
+MAX_PRECOMPUTED_STATES = 8
+
+
+@dataclass(frozen=True)
+class FilterIndex:
+    """
+    Row positions of every filter value in the cached dataset, shared read-only by every session.
+    """
+    n_rows: int
+    dataset_version: str
+    # column -> {value: sorted row positions}
+    positions: dict
+    # column -> values in sorted order
+    values: dict
+    # frozenset of states -> sorted organization names with projects in those states
+    organization_options: dict = field(default_factory=dict)
+
+
+def _value_positions(values):
+    """
+    Returns {value: sorted row positions} for a column in one pass over it.
+    Missing values are not indexed, matching `isin` which never selects them.
+    """
+    factorized, labels = values.factorize(sort=True)
+    order = np.argsort(factorized, kind="stable")
+    counts = np.bincount(factorized[factorized >= 0], minlength=len(labels))
+    # Missing values are coded -1 and sort first
+    start = int((factorized < 0).sum())
+    positions = {}
+    for label, count in zip(labels, counts):
+        positions[label] = order[start:start + count]
+        start += count
+    return positions
+
+
+def _organizations_in(index, states):
+    organizations = set()
+    for state in states:
+        organizations.update(index.organization_options.get(frozenset([state]), ()))
+    return sorted(organizations)
+
+
+def build_filter_index(df, dataset_version=None):
+    """
+    Builds the value -> row position index for the filter columns present in `df`,
+    along with the organization options of each combination of states.
+    """
+    start = time.perf_counter()
+    positions = {}
+    values = {}
+    for column in FILTER_COLUMNS:
+        if column in df.columns:
+            positions[column] = _value_positions(df[column])
+            values[column] = list(positions[column])
+
+    index = FilterIndex(n_rows=len(df), dataset_version=dataset_version, positions=positions, values=values)
+    if STATE_COLUMN in positions and ORGANIZATION_COLUMN in df.columns:
+        organizations = df[ORGANIZATION_COLUMN]
+        for state, rows in positions[STATE_COLUMN].items():
+            index.organization_options[frozenset([state])] = sorted(organizations.iloc[rows].dropna().unique().tolist())
+        states = values[STATE_COLUMN]
+        if len(states) <= MAX_PRECOMPUTED_STATES:
+            for size in range(2, len(states) + 1):
+                for combination in combinations(states, size):
+                    index.organization_options[frozenset(combination)] = _organizations_in(index, combination)
+
+    logger.info(
+        "Built filter index over %d rows (%s) in %.3fs",
+        len(df), ", ".join(f"{column}: {len(column_values)}" for column, column_values in values.items()),
+        time.perf_counter() - start
+    )
+    return index
+
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def _cached_filter_index(dataset_version, _df):
+    return build_filter_index(_df, dataset_version)
+
+
+def get_filter_index(df):
+    """
+    Returns the process-wide filter index for the loaded dataset, rebuilt only when its version changes.
+    """
+    return _cached_filter_index(df.attrs.get("dataset_version", len(df)), df)
+
+
+def organization_options(index, states=None):
+    """
+    Returns the sorted organization names with projects in any of `states`,
+    or in the whole dataset when no states are given.
+    """
+    if not states:
+        return sorted(index.positions.get(ORGANIZATION_COLUMN, {}))
+    key = frozenset(states)
+    if key not in index.organization_options:
+        index.organization_options[key] = _organizations_in(index, key)
+    return index.organization_options[key]
+
+
+def _narrows(index, column, chosen):
+    """
+    Returns whether selecting `chosen` values of `column` drops any row.
+    """
+    if not chosen or column not in index.positions:
+        return False
+    column_positions = index.positions[column]
+    if len(set(chosen) & set(column_positions)) == len(column_positions):
+        # Every value of the column is selected, which only drops rows with missing values
+        return sum(len(rows) for rows in column_positions.values()) != index.n_rows
+    return True
+
+
+def canonical_selection(index, selections):
+    """
+    Returns a hashable form of `selections`, equal for selections that match the same rows however they
+    were picked: values are sorted, and selections that don't narrow the rows are left out.
+    """
+    return tuple(
+        (column, tuple(sorted(value for value in set(chosen) if value in index.positions[column])))
+        for column, chosen in sorted(selections.items())
+        if _narrows(index, column, chosen)
+    )
+
+
+def select_positions(index, selections):
+    """
+    Returns the sorted row positions matching every {column: selected values} entry,
+    or None when no selection narrows the rows. Empty selections are ignored.
+    """
+    selected = None
+    for column, chosen in selections.items():
+        if not _narrows(index, column, chosen):
+            continue
+        column_positions = index.positions[column]
+        parts = [column_positions[value] for value in chosen if value in column_positions]
+        rows = np.sort(np.concatenate(parts)) if parts else np.empty(0, dtype=np.intp)
+        selected = rows if selected is None else np.intersect1d(selected, rows, assume_unique=True)
+    return selected
+
+
+def apply_filters(df, index, selections):
+    """
+    Returns the rows of `df` matching `selections`: `df` itself when nothing is filtered,
+    otherwise a single positional take.
+    """
+    positions = select_positions(index, selections)
+    if positions is None:
+        return df
+    return df.take(positions)
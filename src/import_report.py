@@ -0,0 +1,99 @@
+import argparse
+import json
+import logging
+import subprocess
+import sys
+from datetime import datetime, timezone
+
+logger = logging.getLogger(__name__)
+
+# Modules each page needs, in the order a cold server process imports them
+STARTUP_IMPORTS = (
+    "streamlit", "src.data_cleaner", "src.compaction", "src.filter_index", "src.figure_cache", "src.instrumentation", "src.rollup",
+)
+PAGE_IMPORTS = {
+    "Project Overview": STARTUP_IMPORTS,
+    "Tree Planting Map": STARTUP_IMPORTS + ("src.map_visualizations", "geopandas"),
+    "Community & Workforce Impact": STARTUP_IMPORTS + ("src.map_visualizations", "wordcloud"),
+}
+
+# Run in a fresh interpreter so nothing is imported yet; the marker separates interpreter startup from our imports
+_CHILD_SCRIPT = """
+import importlib, json, sys, time
+sys.stderr.write("--imports--\\n")
+sys.stderr.flush()
+seconds = {}
+for name in sys.argv[1:]:
+    start = time.perf_counter()
+    importlib.import_module(name)
+    seconds[name] = time.perf_counter() - start
+print(json.dumps(seconds))
+"""
+
+
+def parse_importtime(stderr):
+    """
+    Returns [(package, cumulative seconds)] for the top-level imports in `python -X importtime` output
+    after the child's start marker, slowest first.
+    """
+    lines = stderr.splitlines()
+    if "--imports--" in lines:
+        lines = lines[lines.index("--imports--") + 1:]
+    packages = []
+    for line in lines:
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        _, cumulative, package = line[len("import time:"):].split("|", 2)
+        # Nested imports are indented by two spaces per level after the separator space
+        if not package[1:].startswith(" "):
+            packages.append((package.strip(), int(cumulative) / 1e6))
+    return sorted(packages, key=lambda item: item[1], reverse=True)
+
+
+def measure_imports(modules):
+    """
+    Imports `modules` in a fresh interpreter and returns the seconds each one took (including what it
+    pulled in that wasn't loaded yet) and the slowest top-level packages underneath.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _CHILD_SCRIPT, *modules],
+        capture_output=True, text=True, check=True
+    )
+    seconds = json.loads(result.stdout.strip().splitlines()[-1])
+    return {"seconds": seconds, "total": sum(seconds.values()), "packages": parse_importtime(result.stderr)}
+
+
+def import_report(pages=PAGE_IMPORTS):
+    """
+    Measures the cold import time of each page's modules.
+    """
+    return {page: measure_imports(modules) for page, modules in pages.items()}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Report how long a cold dashboard process spends importing modules per page.")
+    parser.add_argument("--top", type=int, default=10, help="Number of slowest top-level packages to list per page.")
+    parser.add_argument("--json", metavar="PATH", help="Also write the report to PATH, to track cold-start latency over time.")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    report = import_report()
+    for page, result in report.items():
+        print(f"{page}: {result['total']:.3f}s")
+        for name, seconds in result["seconds"].items():
+            print(f"  {name:<32} {seconds:8.3f}s")
+        print("  slowest packages:")
+        for name, seconds in result["packages"][:args.top]:
+            print(f"    {name:<30} {seconds:8.3f}s")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({
+                "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                "python": sys.version.split()[0],
+                "pages": report,
+            }, f, indent=2)
+        logger.info("Wrote the import report to %s", args.json)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+import contextlib
+import contextvars
+import cProfile
+import functools
+import io
+import json
+import logging
+import marshal
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+logger = logging.getLogger(__name__)
+
+# Path the timing records are appended to as JSON lines ("-" for stderr); unset keeps them out of the logs
+TIMING_LOG_ENV = "FAITHINPLACE_TIMING_LOG"
+# The sidebar debug panel is shown when this is "1", or for a session opened with ?debug=1
+DEBUG_PANEL_ENV = "FAITHINPLACE_DEBUG"
+DEBUG_QUERY_PARAM = "debug"
+
+# Timings kept process-wide for the panel, so stages that ran in another rerun (like a cache miss) still show
+RECENT_TIMINGS = 200
+PROFILE_TOP_FUNCTIONS = 30
+PROFILE_BUTTON_KEY = "debug_profile_rerun"
+PROFILE_STATE_KEY = "debug_rerun_profile"
+# Scope of a rerun of the whole script; a fragment's own rerun is scoped to its stage name
+APP_SCOPE = "app"
+
+_recent_timings = deque(maxlen=RECENT_TIMINGS)
+_current_trace = contextvars.ContextVar("rerun_trace", default=None)
+_stage_depth = contextvars.ContextVar("stage_depth", default=0)
+_timing_log_lock = threading.Lock()
+_timing_log_configured = False
+
+
+@dataclass
+class RerunTrace:
+    """
+    The timings of one script rerun, plus its profiler when the rerun is being profiled.
+    """
+    started: float
+    scope: str = APP_SCOPE
+    timings: list = field(default_factory=list)
+    debug_panel: bool = False
+    profiler: cProfile.Profile = None
+
+
+def configure_timing_log():
+    """
+    Sends the timing records to the JSON lines file named by FAITHINPLACE_TIMING_LOG, once per process.
+    """
+    global _timing_log_configured
+    path = os.environ.get(TIMING_LOG_ENV)
+    with _timing_log_lock:
+        if _timing_log_configured or not path:
+            return
+        handler = logging.StreamHandler(sys.stderr) if path == "-" else logging.FileHandler(path)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+        logger.setLevel(logging.DEBUG)
+        _timing_log_configured = True
+
+
+def _emit(record):
+    _recent_timings.append(record)
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.timings.append(record)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("%s", json.dumps(record, default=str))
+
+
+@contextlib.contextmanager
+def timed(stage, **fields):
+    """
+    Times the enclosed block as `stage`. Yields the record, so the block can add row counts or payload
+    bytes; it is logged as one JSON object and kept for the debug panel when the block ends.
+    """
+    trace = _current_trace.get()
+    record = {
+        "time": datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+        "stage": stage,
+        "depth": _stage_depth.get(),
+        **fields,
+    }
+    if trace is not None:
+        record["offset"] = round(time.perf_counter() - trace.started, 6)
+    depth_token = _stage_depth.set(record["depth"] + 1)
+    start = time.perf_counter()
+    try:
+        yield record
+    finally:
+        record["seconds"] = round(time.perf_counter() - start, 6)
+        _stage_depth.reset(depth_token)
+        _emit(record)
+
+
+def timed_chart(stage):
+    """
+    Decorates a create_* function taking the project frame first, timing each call as `stage`
+    with the number of projects it was given.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(df, *args, **kwargs):
+            with timed(stage, rows=len(df) if df is not None else 0):
+                return func(df, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _fragment_rerun():
+    # True while an interaction inside a fragment reruns only that fragment
+    ctx = get_script_run_ctx()
+    return ctx is not None and bool(ctx.fragment_ids_this_run)
+
+
+def timed_fragment(stage):
+    """
+    Decorates a page component as a `st.fragment` timed as `stage`. Widgets inside it rerun only the
+    component, and each of those reruns is logged as a rerun of its own, scoped to `stage`.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _fragment_rerun():
+                with timed(stage):
+                    return func(*args, **kwargs)
+            trace = RerunTrace(started=time.perf_counter(), scope=stage)
+            trace_token = _current_trace.set(trace)
+            depth_token = _stage_depth.set(0)
+            try:
+                with timed(stage):
+                    return func(*args, **kwargs)
+            finally:
+                _stage_depth.reset(depth_token)
+                _current_trace.reset(trace_token)
+                finish_rerun(trace)
+        return st.fragment(wrapper)
+    return decorator
+
+
+def debug_panel_enabled():
+    return os.environ.get(DEBUG_PANEL_ENV) == "1" or st.query_params.get(DEBUG_QUERY_PARAM) == "1"
+
+
+def start_rerun():
+    """
+    Starts collecting the timings of the current script rerun, profiling it when the debug panel's
+    profile button was just pressed.
+    """
+    previous = _current_trace.get()
+    if previous is not None and previous.profiler is not None:
+        # A rerun that raised never reached finish_rerun
+        previous.profiler.disable()
+    trace = RerunTrace(started=time.perf_counter(), debug_panel=debug_panel_enabled())
+    if trace.debug_panel and st.session_state.get(PROFILE_BUTTON_KEY):
+        trace.profiler = cProfile.Profile()
+        try:
+            trace.profiler.enable()
+        except ValueError as e:
+            # Another session is being profiled, and the interpreter only allows one profiler at a time
+            st.session_state[PROFILE_STATE_KEY] = {"error": str(e)}
+            trace.profiler = None
+    _current_trace.set(trace)
+    _stage_depth.set(0)
+    return trace
+
+
+def profile_summary(profiler, limit=PROFILE_TOP_FUNCTIONS):
+    """
+    Returns the slowest functions of a finished profile by cumulative time, and the profile in
+    the .prof format that pstats, snakeviz and other viewers read.
+    """
+    profiler.create_stats()
+    text = io.StringIO()
+    pstats.Stats(profiler, stream=text).sort_stats("cumulative").print_stats(limit)
+    return {"text": text.getvalue(), "data": marshal.dumps(profiler.stats)}
+
+
+def finish_rerun(trace):
+    """
+    Stops the rerun's profiler, if any, and draws the debug panel when it is enabled.
+    """
+    seconds = time.perf_counter() - trace.started
+    if trace.profiler is not None:
+        trace.profiler.disable()
+        st.session_state[PROFILE_STATE_KEY] = {"seconds": seconds, **profile_summary(trace.profiler)}
+        trace.profiler = None
+    logger.debug("%s", json.dumps({
+        "stage": "rerun", "scope": trace.scope, "seconds": round(seconds, 6), "stages": len(trace.timings)
+    }))
+    if trace.debug_panel and trace.scope == APP_SCOPE:
+        render_debug_panel(trace, seconds)
+
+
+def _cache_summary(record):
+    # A figure's cache hit or miss, or the state of the image cache a word cloud went through
+    if "cache_entries" in record:
+        return f"{record['cache_entries']} entries, {record['cache_bytes']} bytes, {record['cache_hit_ratio']:.0%} hits"
+    return record.get("cache")
+
+
+def _timings_frame(timings):
+    import pandas as pd
+
+    rows = [{
+        "stage": " " * record.get("depth", 0) + record["stage"],
+        "seconds": record["seconds"],
+        "rows": record.get("rows"),
+        "payload bytes": record.get("payload_bytes"),
+        "cache": _cache_summary(record),
+    } for record in timings]
+    return pd.DataFrame(rows, columns=["stage", "seconds", "rows", "payload bytes", "cache"])
+
+
+def render_debug_panel(trace, seconds):
+    """
+    Shows the rerun's stage timings, the latest timings of the whole process and the profile button in the sidebar.
+    """
+    with st.sidebar.expander("Performance (debug)", expanded=True):
+        st.caption(f"This rerun took {seconds:.3f}s.")
+        # Inner stages finish first; list them in the order they started
+        timings = sorted(trace.timings, key=lambda record: record.get("offset", 0))
+        if timings:
+            st.dataframe(_timings_frame(timings), hide_index=True, use_container_width=True)
+        else:
+            st.caption("No timed stages ran in this rerun.")
+        st.caption("Cached stages only run on a cache miss. The latest timings from every session:")
+        st.dataframe(_timings_frame(list(_recent_timings)[::-1]), hide_index=True, use_container_width=True, height=200)
+
+        st.button(
+            "Profile a rerun", key=PROFILE_BUTTON_KEY,
+            help="Reruns the page under cProfile and lists the functions it spent the most time in."
+        )
+        profile = st.session_state.get(PROFILE_STATE_KEY)
+        if profile and "error" in profile:
+            st.warning(f"Could not profile the rerun: {profile['error']}")
+        elif profile:
+            st.caption(f"Profiled rerun: {profile['seconds']:.3f}s")
+            st.code(profile["text"], language=None)
+            st.download_button("Download profile (.prof)", profile["data"], file_name="rerun.prof")
@@ -0,0 +1,164 @@
+import logging
+import time
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from src.compaction import joined_values
+
+logger = logging.getLogger(__name__)
+
+# Zoom levels the projects are binned at; a map is clustered at the level closest to its initial zoom
+CLUSTER_ZOOM_LEVELS = (3, 5, 7, 9, 11)
+# Width of a cluster cell on screen at its zoom level, the diameter of the largest marker
+CLUSTER_CELL_PIXELS = 40
+# Selections with more mappable projects than this are clustered in the automatic mode
+MAX_INDIVIDUAL_MARKERS = 2000
+# "auto" clusters only large selections, "projects" always draws one marker per project, "clusters" always bins
+MARKER_MODES = ("auto", "projects", "clusters")
+
+# Columns of a marker frame, as drawn by `build_layered_map_figure`
+MARKER_COLUMNS = ['Latitude', 'Longitude', '# Trees To Be Planted', 'Projects', 'Hover Text']
+
+
+@dataclass(frozen=True)
+class MarkerIndex:
+    """
+    The grid cell of every project at each cluster zoom level, shared read-only by every session.
+    """
+    dataset_version: str
+    # Index of the dataset the cells were computed for, to look up the rows of a filtered selection
+    row_index: pd.Index
+    # zoom level -> cell code of each row, -1 for projects without a location
+    cells: dict
+
+
+def cell_codes(longitudes, latitudes, zoom, cell_pixels=CLUSTER_CELL_PIXELS):
+    """
+    Returns the grid cell of each point at `zoom`, in the Web Mercator pixels the map is drawn in.
+    """
+    lon = np.asarray(longitudes, dtype=float)
+    lat = np.clip(np.asarray(latitudes, dtype=float), -85.05, 85.05)
+    cells_per_side = int(np.ceil(256 * 2 ** zoom / cell_pixels))
+    sin_lat = np.sin(np.radians(lat))
+    x = (lon + 180) / 360
+    y = 0.5 - np.log((1 + sin_lat) / (1 - sin_lat)) / (4 * np.pi)
+    valid = np.isfinite(x) & np.isfinite(y)
+    column = np.clip(np.floor(np.where(valid, x, 0) * cells_per_side), 0, cells_per_side - 1).astype(np.int64)
+    row = np.clip(np.floor(np.where(valid, y, 0) * cells_per_side), 0, cells_per_side - 1).astype(np.int64)
+    return np.where(valid, column * cells_per_side + row, -1)
+
+
+def build_marker_index(df, dataset_version=None, zoom_levels=CLUSTER_ZOOM_LEVELS):
+    """
+    Bins every project of `df` into the grid cells of each cluster zoom level.
+    """
+    start = time.perf_counter()
+    cells = {zoom: cell_codes(df['Longitude'], df['Latitude'], zoom) for zoom in zoom_levels}
+    logger.info("Built marker index over %d rows at %d zoom levels in %.3fs", len(df), len(cells), time.perf_counter() - start)
+    return MarkerIndex(dataset_version=dataset_version, row_index=df.index, cells=cells)
+
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def _cached_marker_index(dataset_version, _df):
+    return build_marker_index(_df, dataset_version)
+
+
+def get_marker_index(df):
+    """
+    Returns the process-wide marker index for the loaded dataset, rebuilt only when its version changes.
+    """
+    return _cached_marker_index(df.attrs.get("dataset_version", len(df)), df)
+
+
+def cluster_level(zoom, zoom_levels=CLUSTER_ZOOM_LEVELS):
+    """
+    Returns the cluster zoom level closest to `zoom`, the finer one on a tie.
+    """
+    return min(sorted(zoom_levels, reverse=True), key=lambda level: abs(level - zoom))
+
+
+def project_hover_text(map_df):
+    """
+    Returns the hover text of each project, built column-wise.
+    """
+    species = joined_values(map_df, 'Cleaned Species').replace('', 'N/A')
+    if 'TES' in map_df.columns:
+        tes = map_df['TES'].round().astype('Int64').astype(str) + ' (' + map_df['TES Priority'].astype(str) + ')'
+        tes = tes.where(map_df['TES'].notna(), 'N/A')
+    else:
+        tes = 'N/A'
+    return (
+        '<b>' + map_df['Organization Name'].astype(str) + '</b><br>Trees: '
+        + map_df['# Trees To Be Planted'].astype('int64').astype(str)
+        + '<br>Species: ' + species + '<br>Tree Equity Score: ' + tes
+    )
+
+
+def project_markers(map_df):
+    """
+    Returns one marker per project.
+    """
+    markers = map_df[['Latitude', 'Longitude', '# Trees To Be Planted']].astype(float)
+    markers['Projects'] = 1
+    markers['Hover Text'] = project_hover_text(map_df)
+    return markers[MARKER_COLUMNS]
+
+
+def cluster_markers(map_df, zoom, marker_index=None):
+    """
+    Returns one marker per grid cell at cluster zoom level `zoom` holding any project of `map_df`,
+    placed at the mean location of its projects and sized by their summed trees. Cells are looked up
+    in `marker_index` when it covers the rows of `map_df`, and computed otherwise.
+    """
+    if map_df.empty:
+        return pd.DataFrame(columns=MARKER_COLUMNS)
+    codes = None
+    if marker_index is not None and zoom in marker_index.cells:
+        positions = marker_index.row_index.get_indexer(map_df.index)
+        if (positions >= 0).all():
+            codes = marker_index.cells[zoom][positions]
+    if codes is None:
+        codes = cell_codes(map_df['Longitude'], map_df['Latitude'], zoom)
+
+    _, first, inverse, projects = np.unique(codes, return_index=True, return_inverse=True, return_counts=True)
+    trees = np.bincount(inverse, weights=map_df['# Trees To Be Planted'].to_numpy(dtype=float))
+    latitude = np.bincount(inverse, weights=map_df['Latitude'].to_numpy(dtype=float)) / projects
+    longitude = np.bincount(inverse, weights=map_df['Longitude'].to_numpy(dtype=float)) / projects
+
+    # Distinct organizations per cell, from the distinct (cell, organization) pairs
+    organization_codes, organization_names = pd.factorize(map_df['Organization Name'], use_na_sentinel=False)
+    pairs = np.unique(inverse.astype(np.int64) * len(organization_names) + organization_codes)
+    organizations = np.bincount(pairs // len(organization_names), minlength=len(projects))
+
+    first_organization = pd.Series(np.asarray(organization_names, dtype=object)[organization_codes[first]]).astype(str)
+    organization_text = ('Organization: ' + first_organization).where(
+        organizations == 1, pd.Series(organizations).astype(str) + ' organizations'
+    )
+    hover = (
+        '<b>' + pd.Series(projects).astype(str) + ' projects</b><br>' + organization_text
+        + '<br>Trees: ' + pd.Series(trees.astype(np.int64)).astype(str)
+    )
+    # A cell with a single project shows that project's own details
+    single = projects == 1
+    hover[single] = project_hover_text(map_df.iloc[first[single]]).to_numpy()
+
+    return pd.DataFrame({
+        'Latitude': latitude,
+        'Longitude': longitude,
+        '# Trees To Be Planted': trees,
+        'Projects': projects,
+        'Hover Text': hover.to_numpy(),
+    })
+
+
+def map_markers(map_df, zoom, mode="auto", marker_index=None):
+    """
+    Returns (marker frame, trace name) for the projects of `map_df` on a map opened at `zoom`:
+    one marker per project for small selections, clusters at the closest cluster zoom level otherwise.
+    """
+    if mode == "projects" or (mode == "auto" and len(map_df) <= MAX_INDIVIDUAL_MARKERS):
+        return project_markers(map_df), "Project Locations"
+    return cluster_markers(map_df, cluster_level(zoom), marker_index), "Project Clusters"
@@ -1,73 +1,169 @@
 
+import hashlib
+import io
+import json
+import logging
+from random import Random
+
 import streamlit as st
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
-from collections import Counter
-from wordcloud import WordCloud
-import matplotlib.pyplot as plt
-import geopandas as gpd
-import nltk
-from nltk.stem import WordNetLemmatizer
-from nltk.tokenize import word_tokenize
+import plotly.io as pio
 import numpy as np
 
-def create_layered_map(df):
+from src.caching import ByteLRUCache
+from src.compaction import count_totals
+from src.figure_cache import FIGURE_MEMORY_FACTOR, CachedFigure, figure_cache, figure_key
+from src.instrumentation import timed, timed_chart
+from src.data_cleaner import GOAL_CATEGORY_COLUMN_PREFIX, SPECIES_COLUMN_PREFIX, TREE_TYPE_COLUMN_PREFIX, fold_term_plurals, multi_hot
+from src.map_markers import map_markers
+from src.rollup import rollup_metrics, rollup_tree_type_organizations
+from src.tes_layer import DEFAULT_TES_DETAIL, clip_bounds, get_tes_layer, select_tes_positions, subset_geojson
+
+logger = logging.getLogger(__name__)
+
+
+# --- SHARED FIGURE CACHE ---
+def _figure_cache_key(chart, df, selection, options):
+    selected = selection if selection is not None else selection_fingerprint(df)[1]
+    return figure_key(chart, df.attrs.get('dataset_version'), selected, **options)
+
+
+def find_figure(chart, df, selection, cache=None, **options):
     """
-    Creates a map with a Tree Equity Score background layer and project locations on top.
+    Returns the CachedFigure of a chart in the shared figure cache (see `cached_figure`), or None on a miss.
     """
-    if df is None:
-        st.warning("No project data provided to create the map.")
-        return
+    cache = cache if cache is not None else figure_cache()
+    return cache.get(_figure_cache_key(chart, df, selection, options))
 
-    try:
-        state_files = [
-            "data/il_tes.geojson",
-            "data/in_tes.geojson",
-            "data/wi_tes.geojson"
-        ]
-        list_of_gdfs = [gpd.read_file(file) for file in state_files]
-        tes_data = pd.concat(list_of_gdfs, ignore_index=True)
-    except Exception as e:
-        st.error(f"Error loading GeoJSON files: {e}. Make sure the files are in the 'data' folder and filenames are correct.")
-        return
 
-    fig = go.Figure()
+def put_figure(chart, df, selection, build, cache=None, **options):
+    """
+    Builds a chart's figure with `build()` and stores it in the shared figure cache, returning its CachedFigure.
+    """
+    cache = cache if cache is not None else figure_cache()
+    with timed(f"{chart}: build figure", rows=len(df)):
+        fig = build()
+        # Plotly validated the figure as it was built; the JSON is only measured, for the cache and the timings
+        payload_bytes = len(pio.to_json(fig, validate=False)) if fig is not None else 0
+    entry = CachedFigure(fig, payload_bytes)
+    cache.put(_figure_cache_key(chart, df, selection, options), entry, size=max(payload_bytes, 1) * FIGURE_MEMORY_FACTOR)
+    return entry
 
-    # Add the Tree Equity Score background layer (Unchanged)
-    fig.add_trace(go.Choroplethmapbox(
-        geojson=tes_data.__geo_interface__,
-        locations=tes_data.index,
-        z=tes_data['tes'],
-        colorscale="RdYlGn",
-        zmin=0,
-        zmax=100,
-        marker_opacity=0.6,
-        marker_line_width=0,
-        colorbar_title="Tree Equity Score"
-    ))
 
-    map_df = df.dropna(subset=['Latitude', 'Longitude', '# Trees To Be Planted']).copy()
-    map_df['Species List (for hover)'] = map_df['Cleaned Species'].apply(lambda x: ', '.join(x) if x else 'N/A')
+def cached_figure(chart, df, selection, build, cache=None, **options):
+    """
+    Returns (CachedFigure, whether it came from the cache) for a chart of the projects in `df`, calling
+    `build()` on a miss. `selection` is the sidebar's canonical filter selection; without one, the selected
+    projects identify it. A chart with nothing to draw (`build()` returning None) is cached with no figure.
+    """
+    entry = find_figure(chart, df, selection, cache, **options)
+    if entry is not None:
+        return entry, True
+    return put_figure(chart, df, selection, build, cache, **options), False
+
+
+def show_figure(chart, entry, rows, cached):
+    """
+    Sends a cached figure to the browser, timing the transfer. Streamlit only converts a Figure to a dict
+    and serializes it, without validating it again.
+    """
+    with timed(f"{chart}: send", rows=rows, payload_bytes=entry.payload_bytes, cache="hit" if cached else "miss"):
+        st.plotly_chart(entry.figure, use_container_width=True)
+
+
+def prepare_map_frame(df, clip_to_projects=False):
+    """
+    Returns the mappable projects, and the (bounds, zoom, center) view framing them.
+    Bounds are only set when the map is limited to the projects.
+    """
+    map_df = df.dropna(subset=['Latitude', 'Longitude', '# Trees To Be Planted'])
+
+    # Frame the area around the projects when the map is limited to them, otherwise the whole region
+    bounds = clip_bounds(map_df['Longitude'], map_df['Latitude']) if clip_to_projects and not map_df.empty else None
+    map_zoom, map_center = 5, {"lat": 41.8, "lon": -88.0}
+    if bounds is not None:
+        minx, miny, maxx, maxy = bounds
+        map_center = {"lat": (miny + maxy) / 2, "lon": (minx + maxx) / 2}
+        map_zoom = float(np.clip(np.log2(480 / max(maxx - minx, maxy - miny)), 3, 11))
+    return map_df, (bounds, map_zoom, map_center)
+
+
+def build_layered_map_figure(markers, view, tes_layer=None, tes_raster=None, states=None, name="Project Locations"):
+    """
+    Builds the map figure for a marker frame from `src.map_markers` and a view from `prepare_map_frame`. The Tree Equity
+    Score background is the `tes_raster` image overlay when one is given, otherwise the polygons of `tes_layer` in `states`
+    and the view's bounds.
+    """
+    bounds, map_zoom, map_center = view
+    fig = go.Figure()
+    mapbox_layers = []
+
+    if tes_raster is not None:
+        mapbox_layers.append({
+            "sourcetype": "image",
+            "source": tes_raster["source"],
+            "coordinates": tes_raster["coordinates"],
+            "opacity": 0.6,
+            "below": "traces",
+        })
+        # An invisible trace carrying the colour bar the choropleth would otherwise draw
+        fig.add_trace(go.Scattermapbox(
+            lat=[None],
+            lon=[None],
+            mode='markers',
+            marker=go.scattermapbox.Marker(
+                color=[0],
+                colorscale="RdYlGn",
+                cmin=0,
+                cmax=100,
+                showscale=True,
+                colorbar=dict(title="Tree Equity Score")
+            ),
+            hoverinfo='skip',
+            showlegend=False
+        ))
+    elif tes_layer is not None:
+        tes_data = tes_layer.gdf
+        # Only ship the block groups around the current selection
+        positions = select_tes_positions(tes_layer, states=states, bounds=bounds)
+        tes_index = tes_data.index if positions is None else tes_data.index[positions]
+
+        # Add the Tree Equity Score background layer
+        fig.add_trace(go.Choroplethmapbox(
+            geojson=subset_geojson(tes_layer, positions),
+            locations=tes_index,
+            z=tes_data['tes'].loc[tes_index],
+            colorscale="RdYlGn",
+            zmin=0,
+            zmax=100,
+            marker_opacity=0.6,
+            marker_line_width=0,
+            colorbar_title="Tree Equity Score"
+        ))
 
     # --- CHANGE 1: IMPROVE SCALING FOR MARKER SIZE ---
     # We use np.sqrt() to make the size differences between small projects more visible.
     # The divisor in sizeref is also adjusted to get a good overall scale.
+    # Float64 first: the square root of the narrow integer tree counts would be float16, which can't be serialized
+    marker_sizes = np.sqrt(markers["# Trees To Be Planted"].astype(float))
     fig.add_trace(go.Scattermapbox(
-        lat=map_df["Latitude"],
-        lon=map_df["Longitude"],
+        lat=markers["Latitude"],
+        lon=markers["Longitude"],
         mode='markers',
         marker=go.scattermapbox.Marker(
-            size=np.sqrt(map_df["# Trees To Be Planted"]), # Apply a sqrt transformation
+            size=marker_sizes, # Apply a sqrt transformation
             color='#00008B',
             # sizemin is removed to allow for smaller, varied circles
-            sizeref=np.sqrt(map_df["# Trees To Be Planted"].max()) / 40, # Adjust sizeref
+            sizeref=marker_sizes.max() / 40, # Adjust sizeref
             opacity=0.7
         ),
         hoverinfo='text',
-        text=[f"<b>{org}</b><br>Trees: {trees}<br>Species: {species}"
-              for org, trees, species in zip(map_df['Organization Name'], map_df['# Trees To Be Planted'], map_df['Species List (for hover)'])],
-        name="Project Locations" # Give the trace a name
+        # A list, not a Series: plotly's fast orjson path can't serialize string arrays, and the fallback
+        # walks the whole figure, Tree Equity Score polygons included
+        text=markers["Hover Text"].tolist(),
+        name=name # Give the trace a name
     ))
 
     # --- CHANGE 2: CREATE A MANUAL LEGEND FOR CIRCLE SIZES ---
@@ -81,7 +177,7 @@ def create_layered_map(df):
             marker=go.scattermapbox.Marker(
                 size=np.sqrt(size), # Use the same scaling as the real data
                 color='#00008B',
-                sizeref=np.sqrt(map_df["# Trees To Be Planted"].max()) / 40,
+                sizeref=marker_sizes.max() / 40,
                 opacity=0.7
             ),
             name=label,
@@ -92,8 +188,9 @@ def create_layered_map(df):
     fig.update_layout(
         title="Project Locations Over Tree Equity Score",
         mapbox_style="carto-positron",
-        mapbox_zoom=5,
-        mapbox_center={"lat": 41.8, "lon": -88.0},
+        mapbox_zoom=map_zoom,
+        mapbox_center=map_center,
+        mapbox_layers=mapbox_layers,
         margin={"r":0, "t":40, "l":0, "b":0},
         showlegend=True,
         legend=dict(
@@ -109,32 +206,117 @@ def create_layered_map(df):
         )
     )
 
-    st.plotly_chart(fig, use_container_width=True)
+    return fig
 
-    
-def create_species_diversity_chart(df):
+
+def layered_map_options(tes_detail=DEFAULT_TES_DETAIL, states=None, clip_to_projects=False, tes_mode="vector", marker_mode="auto"):
     """
-    Creates a filtered and styled bar chart of species diversity.
+    Returns the options a layered map's figure depends on, in canonical form for its cache key.
     """
-    if df is None or 'Cleaned Species' not in df.columns:
-        st.warning("Cleaned species data not available to create the diversity chart.")
+    return {
+        "tes_mode": tes_mode,
+        "tes_detail": tes_detail if tes_mode == "vector" else None,
+        "states": tuple(sorted(states)) if states else None,
+        "clip_to_projects": clip_to_projects,
+        "marker_mode": marker_mode,
+    }
+
+
+def _layered_map_figure(map_df, view, tes_layer, tes_raster, states, marker_mode, marker_index):
+    with timed("map: markers", rows=len(map_df)) as timing:
+        markers, name = map_markers(map_df, view[1], marker_mode, marker_index)
+        timing["markers"] = len(markers)
+    return build_layered_map_figure(markers, view, tes_layer=tes_layer, tes_raster=tes_raster, states=states, name=name)
+
+
+@timed_chart("map")
+def create_layered_map(df, tes_detail=DEFAULT_TES_DETAIL, states=None, clip_to_projects=False, tes_mode="vector",
+                       marker_mode="auto", marker_index=None, selection=None):
+    """
+    Creates a map with a Tree Equity Score background layer and project locations on top.
+    `tes_mode` draws the background as vector polygons ("vector") or as a pre-rendered image overlay ("raster").
+    In vector mode, `tes_detail` picks the simplification level of the polygons ("full", "high", "medium" or "low"),
+    and the polygons are limited to the block groups in `states` and, with `clip_to_projects`,
+    to a padded bounding box around the projects in `df`.
+    `marker_mode` draws one marker per project ("projects"), clusters of projects binned at the map's zoom level
+    ("clusters"), or clusters only for large selections ("auto"); `marker_index` holds the precomputed bins.
+    The figure is shared through the figure cache with every session showing the same `selection` and options.
+    """
+    if df is None:
+        st.warning("No project data provided to create the map.")
         return
 
-    all_species_list = [species for sublist in df['Cleaned Species'] for species in sublist]
-    if not all_species_list:
-        st.info("No species data to display in the chart for the selected filters.")
+    with timed("map: prepare", rows=len(df)):
+        map_df, view = prepare_map_frame(df, clip_to_projects)
+
+    # A cached figure needs no background, so look it up before loading the TES layer or image
+    options = layered_map_options(tes_detail, states, clip_to_projects, tes_mode, marker_mode)
+    entry = find_figure("map", df, selection, **options)
+    if entry is not None:
+        show_figure("map", entry, len(map_df), True)
         return
+    tes_layer, tes_raster = None, None
+
+    if tes_mode == "raster":
+        try:
+            # One pre-rendered image instead of thousands of polygons (see src/tes_raster.py)
+            from src.tes_raster import get_tes_raster
+            with timed("map: load TES raster"):
+                tes_raster = get_tes_raster(view[1])
+        except Exception as e:
+            # Missing, stale (e.g. after a TES source edit) or unreadable overlays all fall back to the polygons
+            if isinstance(e, FileNotFoundError):
+                st.info("The Tree Equity Score image overlay hasn't been built yet, showing the vector layer instead.")
+            else:
+                logger.warning("Could not load the TES raster overlay: %s", e)
+                st.info("The Tree Equity Score image overlay is out of date or unreadable, showing the vector layer instead.")
+            tes_mode = "vector"
+            # Keyed by the background actually drawn, so the fallback isn't cached as the image version
+            options = layered_map_options(tes_detail, states, clip_to_projects, tes_mode, marker_mode)
+            entry = find_figure("map", df, selection, **options)
+            if entry is not None:
+                show_figure("map", entry, len(map_df), True)
+                return
+
+    if tes_mode != "raster":
+        try:
+            # Parsed once per process and shared by every session (see src/tes_layer.py)
+            with timed(f"map: load TES layer ({tes_detail})") as timing:
+                tes_layer = get_tes_layer(tes_detail)
+                timing["rows"] = len(tes_layer.gdf)
+        except Exception as e:
+            st.error(f"Error loading GeoJSON files: {e}. Make sure the files are in the 'data' folder and filenames are correct.")
+            return
+
+    entry = put_figure(
+        "map", df, selection,
+        lambda: _layered_map_figure(map_df, view, tes_layer, tes_raster, states, marker_mode, marker_index),
+        **options
+    )
+    show_figure("map", entry, len(map_df), False)
 
-    species_counts = Counter(all_species_list)
-    species_df = pd.DataFrame(species_counts.items(), columns=['Species', 'Count'])
+    
+def species_project_counts(df):
+    """
+    Returns the number of projects planting each species, for species planted in at least one project.
+    """
+    # A column sum of the species multi-hot matrix
+    species_counts = multi_hot(df, SPECIES_COLUMN_PREFIX).sum()
+    species_counts = species_counts[species_counts > 0]
+    return pd.DataFrame({'Species': species_counts.index, 'Count': species_counts.to_numpy()})
 
+
+def build_species_diversity_figure(species_df):
+    """
+    Builds the species diversity bar chart from `species_project_counts`, or returns None when
+    no species is planted in more than one project.
+    """
     # --- CHANGE 1: Filter the DataFrame ---
     # Keep only the species that appear in more than one project
     species_df = species_df[species_df['Count'] > 1].sort_values(by='Count', ascending=False)
 
     if species_df.empty:
-        st.info("No species are planted in more than one project for the selected filters.")
-        return
+        return None
 
     fig = px.bar(
         species_df,
@@ -151,19 +333,43 @@ def create_species_diversity_chart(df):
         yaxis={'categoryorder':'total ascending'},
         height=max(400, len(species_df) * 25)
     )
-    st.plotly_chart(fig, use_container_width=True)
+    return fig
 
-def create_impact_category_chart(df):
+@timed_chart("chart: species diversity")
+def create_species_diversity_chart(df, selection=None):
     """
-    Creates a bar chart showing the number of organizations in each goal category.
+    Creates a filtered and styled bar chart of species diversity.
     """
-    if df is None or 'Goal Categories' not in df.columns:
-        st.warning("Goal category data not available.")
+    if df is None or 'Cleaned Species' not in df.columns:
+        st.warning("Cleaned species data not available to create the diversity chart.")
+        return
+
+    with timed("chart: species diversity: count", rows=len(df)):
+        species_df = species_project_counts(df)
+    if species_df.empty:
+        st.info("No species data to display in the chart for the selected filters.")
+        return
+
+    entry, cached = cached_figure("chart: species diversity", df, selection, lambda: build_species_diversity_figure(species_df))
+    if entry.figure is None:
+        st.info("No species are planted in more than one project for the selected filters.")
         return
+    show_figure("chart: species diversity", entry, len(species_df), cached)
+
+def impact_category_counts(df):
+    """
+    Returns the number of projects in each goal category.
+    """
+    # A column sum of the goal category multi-hot matrix
+    return multi_hot(df, GOAL_CATEGORY_COLUMN_PREFIX).sum()
+
 
-    # Explode the lists of categories into separate rows and count them
-    category_counts = df.explode('Goal Categories')['Goal Categories'].value_counts().reset_index()
-    category_counts.columns = ['Category', 'Organization Count']
+def build_impact_category_figure(category_counts):
+    """
+    Builds the bar chart of the number of organizations in each goal category, from `impact_category_counts`.
+    """
+    category_counts = category_counts[category_counts > 0].sort_values(ascending=False)
+    category_counts = pd.DataFrame({'Category': category_counts.index, 'Organization Count': category_counts.to_numpy()})
 
     fig = px.bar(
         category_counts,
@@ -175,36 +381,42 @@ def create_impact_category_chart(df):
         color_discrete_sequence=['#1a7342'] # A darker green from your theme
     )
     fig.update_layout(yaxis={'categoryorder': 'total ascending'})
-    st.plotly_chart(fig, use_container_width=True)
+    return fig
 
-def create_tree_type_chart(df):
+@timed_chart("chart: impact categories")
+def create_impact_category_chart(df, selection=None, rollup=None):
     """
-    Creates a bar chart categorizing projects by the types of trees they are planting.
+    Creates a bar chart showing the number of organizations in each goal category.
+    With the `rollup` cube and the canonical `selection`, the counts come from the cube's cells.
     """
-    if df is None or 'Cleaned Species' not in df.columns:
-        st.warning("Species data not available to create the tree type chart.")
+    if df is None or 'Goal Categories' not in df.columns:
+        st.warning("Goal category data not available.")
         return
 
-    # Define the mapping from individual species to broader categories
-    tree_type_map = {
-        'Fruit & Nut': ['Apple', 'Cherry', 'Hazelnut', 'Hickory', 'Pawpaw', 'Peach', 'Pear', 'Pecan', 'Plum', 'Walnut'],
-        'Shade Trees': ['Ash', 'Beech', 'Birch', 'Buckeye', 'Catalpa', 'Elm', 'Ginkgo', 'Gum', 'Hackberry', 'Honeylocust', 'Kentucky Coffeetree', 'Linden', 'Maple', 'Oak', 'Sycamore', 'Tulip Tree'],
-        'Ornamental/Flowering': ['Dogwood', 'Fringe Tree', 'Hornbeam', 'Redbud', 'Serviceberry'],
-        'Evergreens/Conifers': ['Cedar', 'Cypress', 'Pine', 'Spruce'],
-        'Unspecified/Native': ['Unspecified/Generic'] # Grouping these together
-    }
+    def build():
+        if rollup is not None and selection is not None:
+            return build_impact_category_figure(rollup_metrics(rollup, selection)["goal_projects"])
+        return build_impact_category_figure(impact_category_counts(df))
 
-    # Reverse the map for easy lookup: {Species -> Category}
-    species_to_type = {species: type for type, species_list in tree_type_map.items() for species in species_list}
+    entry, cached = cached_figure("chart: impact categories", df, selection, build)
+    show_figure("chart: impact categories", entry, len(df), cached)
+
+def tree_type_organization_counts(df):
+    """
+    Returns the number of organizations planting each type of tree.
+    """
+    # Count unique organizations per tree type: collapse the tree type multi-hot matrix
+    # to one row per organization, then sum each column
+    tree_type_matrix = multi_hot(df, TREE_TYPE_COLUMN_PREFIX)
+    return tree_type_matrix.groupby(df['Organization Name'], observed=True).max().sum()
 
-    # Create a new DataFrame with one row per project per tree type
-    df_exploded = df.explode('Cleaned Species')
-    df_exploded['Tree Type'] = df_exploded['Cleaned Species'].map(species_to_type).fillna('Other')
 
-    # Count unique projects per tree type
-    # We group by 'Tree Type' and count the number of unique 'Organization Name's
-    type_counts = df_exploded.groupby('Tree Type')['Organization Name'].nunique().reset_index()
-    type_counts.rename(columns={'Organization Name': 'Project Count'}, inplace=True)
+def build_tree_type_figure(type_counts):
+    """
+    Builds the bar chart of projects by the types of trees they are planting, from `tree_type_organization_counts`.
+    """
+    type_counts = type_counts[type_counts > 0]
+    type_counts = pd.DataFrame({'Tree Type': type_counts.index, 'Project Count': type_counts.to_numpy()})
 
     # Create the bar chart
     fig = px.bar(
@@ -220,48 +432,151 @@ def create_tree_type_chart(df):
     fig.update_layout(
         yaxis={'categoryorder':'total ascending'}
     )
-    st.plotly_chart(fig, use_container_width=True)
+    return fig
+
+@timed_chart("chart: tree types")
+def create_tree_type_chart(df, selection=None, rollup=None):
+    """
+    Creates a bar chart categorizing projects by the types of trees they are planting.
+    With the `rollup` cube and the canonical `selection`, the counts come from the cube's cells.
+    """
+    if df is None or 'Cleaned Species' not in df.columns:
+        st.warning("Species data not available to create the tree type chart.")
+        return
+
+    def build():
+        if rollup is not None and selection is not None:
+            return build_tree_type_figure(rollup_tree_type_organizations(rollup, selection))
+        return build_tree_type_figure(tree_type_organization_counts(df))
+
+    entry, cached = cached_figure("chart: tree types", df, selection, build)
+    show_figure("chart: tree types", entry, len(df), cached)
+
+
+def prewarm_default_figures(df, states=None, cache=None, marker_index=None):
+    """
+    Builds the figures the unfiltered pages show first into the shared figure cache (or `cache`): the map
+    with the default settings and every state selected, and the species and impact charts. Calls no
+    Streamlit-cached function, so it can run on a thread outside any script run; the TES layer is the
+    process-wide one the sessions use.
+    """
+    from src.tes_layer import shared_tes_layer
+
+    # The canonical form of a selection that doesn't narrow the rows
+    selection = ()
+    map_df, view = prepare_map_frame(df)
+    options = layered_map_options(states=states)
+    if find_figure("map", df, selection, cache, **options) is None:
+        tes_layer = shared_tes_layer(DEFAULT_TES_DETAIL)
+        put_figure(
+            "map", df, selection,
+            lambda: _layered_map_figure(map_df, view, tes_layer, None, states or None, "auto", marker_index),
+            cache, **options
+        )
+    if 'Cleaned Species' in df.columns:
+        cached_figure("chart: tree types", df, selection, lambda: build_tree_type_figure(tree_type_organization_counts(df)), cache)
+        species_df = species_project_counts(df)
+        cached_figure("chart: species diversity", df, selection, lambda: build_species_diversity_figure(species_df), cache)
+    if 'Goal Categories' in df.columns:
+        cached_figure("chart: impact categories", df, selection, lambda: build_impact_category_figure(impact_category_counts(df)), cache)
 
 
 # --- UPDATED WORD CLOUD FUNCTION ---
+# Goal term frequency tables kept per selection of projects (least recently used evicted first)
+WORDCLOUD_CACHE_ENTRIES = 32
+# Total size of the rendered word cloud PNGs shared by all sessions
+WORDCLOUD_IMAGE_CACHE_BYTES = 16 * 1024 * 1024
+
+
+def selection_fingerprint(df):
+    """
+    Returns a (dataset version, digest of the selected Project Keys) key identifying a filtered selection.
+    """
+    keys = df['Project Key'] if 'Project Key' in df.columns else df.index.astype(str)
+    digest = hashlib.blake2b('\0'.join(keys).encode(), digest_size=16).hexdigest()
+    return (df.attrs.get('dataset_version'), digest)
+
+
+def frequencies_fingerprint(frequencies):
+    """
+    Returns a digest of a {term: count} table; selections with the same terms share one rendered image.
+    """
+    payload = json.dumps(sorted(frequencies.items()), separators=(',', ':'))
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+
+@st.cache_resource(max_entries=WORDCLOUD_CACHE_ENTRIES, show_spinner=False)
+def _goal_frequencies(fingerprint, _df):
+    return fold_term_plurals(count_totals(_df, 'Goal Term Counts'))
+
+
+@st.cache_resource
+def wordcloud_image_cache():
+    """
+    Returns the process-wide cache of rendered word cloud PNGs.
+    """
+    return ByteLRUCache(WORDCLOUD_IMAGE_CACHE_BYTES)
+
+
+class _ColormapColor:
+    """
+    Colours words by sampling a Matplotlib colormap, like WordCloud(colormap=...) does, but without
+    importing pyplot (WordCloud's own helper imports it just to look the colormap up).
+    """
+
+    def __init__(self, name):
+        from matplotlib import colormaps
+        self.colormap = colormaps[name]
+
+    def __call__(self, word, font_size, position, orientation, random_state=None, **kwargs):
+        if random_state is None:
+            random_state = Random()
+        r, g, b, _ = np.maximum(0, 255 * np.array(self.colormap(random_state.uniform(0, 1))))
+        return f"rgb({r:.0f}, {g:.0f}, {b:.0f})"
+
+
+def render_wordcloud_png(frequencies):
+    """
+    Renders a word cloud for a {term: count} table straight to PNG bytes, without a Matplotlib figure.
+    """
+    # WordCloud is only imported when the word cloud is first drawn
+    from wordcloud import WordCloud
+
+    wordcloud = WordCloud(
+        width=800, height=400, background_color='white',
+        color_func=_ColormapColor('Greens'), max_words=100, collocations=False
+    ).generate_from_frequencies(frequencies)
+    buffer = io.BytesIO()
+    wordcloud.to_image().save(buffer, format='PNG', optimize=True)
+    return buffer.getvalue()
+
+
+@timed_chart("word cloud")
 def create_goals_wordcloud(df):
     """
-    Generates a lemmatized and heavily cleaned word cloud from project goals.
+    Generates a lemmatized and heavily cleaned word cloud from the projects' precomputed goal term counts.
     """
     if df is None or 'Goals from Ollama' not in df.columns:
         st.warning("Project goals data not available.")
         return
+    if 'Goal Term Counts' not in df.columns:
+        st.warning("Project goal term counts not available. Rebuild the dataset with `python -m src.data_cleaner build`.")
+        return
 
-    all_goals_list = [goal for sublist in df['Goals from Ollama'] for goal in sublist]
-    if not all_goals_list:
+    with timed("word cloud: frequencies", rows=len(df)) as timing:
+        frequencies = _goal_frequencies(selection_fingerprint(df), df)
+        timing["terms"] = len(frequencies)
+    if not frequencies:
         st.info("No project goals to display in the word cloud.")
         return
 
-    text = ' '.join(all_goals_list)
-
-    lemmatizer = WordNetLemmatizer()
-    tokens = word_tokenize(text)
-    lemmatized_text = ' '.join([lemmatizer.lemmatize(word.lower()) for word in tokens])
-
-    # --- EVEN MORE AGGRESSIVE STOPWORDS LIST ---
-    stopwords = set([
-        'of', 'the', 'for', 'a', 'in', 'with', 'project', 'tree', 'to', 'planting', 'through', 'provide', 'create', 'help', 'well',
-        'also', 'area', 'will', 'plan', 'our', 'place', 'campus', 'effort',
-        'surrounding', 'natural', 'goal', 'ha', 'student', 'program', 'new',
-        'year', 'work', 'member', 'organization', 'group', 'city',
-        'state', 'local', 'partner', 'people', 'site', 'ground', 'chicago',
-        'illinois', 'indiana', 'wisconsin', 'hand', 'etc', 'use', 'need', 'enhance',
-        'additional', 'make', 'ensure', 'within', 'around', 'including', 'and', 'to'
-    ])
-
-    wordcloud = WordCloud(
-        width=800, height=400, background_color='white',
-        colormap='Greens', max_words=100, stopwords=stopwords,
-        collocations=False
-    ).generate(lemmatized_text)
-
-    plt.figure(figsize=(10, 5))
-    plt.imshow(wordcloud, interpolation='bilinear')
-    plt.axis("off")
-    plt.tight_layout(pad=0)
-    st.pyplot(plt.gcf())
\ No newline at end of file
+    image_cache = wordcloud_image_cache()
+    with timed("word cloud: render", rows=len(frequencies)) as timing:
+        png = image_cache.get_or_create(frequencies_fingerprint(frequencies), lambda: render_wordcloud_png(frequencies))
+        timing["payload_bytes"] = len(png)
+        # How well the shared image cache is doing, for the timing log and the debug panel
+        stats = image_cache.stats()
+        timing["cache_hit_ratio"] = round(stats["hit_ratio"], 4)
+        timing["cache_bytes"] = stats["bytes"]
+        timing["cache_entries"] = stats["entries"]
+    st.image(png, use_container_width=True)
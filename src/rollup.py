@@ -0,0 +1,214 @@
+import logging
+import time
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from src.data_cleaner import GOAL_CATEGORY_COLUMN_PREFIX, TREE_TYPE_COLUMN_PREFIX, multi_hot
+from src.filter_index import ORGANIZATION_COLUMN, PRIORITY_COLUMN, STATE_COLUMN
+
+logger = logging.getLogger(__name__)
+
+CITY_COLUMN = "Project Location City"
+TREES_COLUMN = "# Trees To Be Planted"
+# The cube has one cell per combination of the columns the sidebar filters on, so any selection is a set of cells
+DIMENSIONS = (STATE_COLUMN, ORGANIZATION_COLUMN, PRIORITY_COLUMN)
+HIGH_PRIORITY_BANDS = ("Highest", "High")
+# City bitsets are kept while they take less than this; beyond it the city count is computed from the rows
+MAX_SKETCH_BYTES = 64 * 1024 * 1024
+# The median TES comes from per-cell histograms while the scores take at most this many distinct values
+MAX_HISTOGRAM_VALUES = 1024
+
+
+@dataclass(frozen=True)
+class RollupCube:
+    """
+    Measures of every (state, organization, priority band) cell with projects, shared read-only by every session.
+    A selection is answered by summing the additive measures of its cells and OR-ing their distinct-value bitsets.
+    """
+    dataset_version: str
+    # dimension column -> values, and the value code of each cell (-1 for a missing value)
+    labels: dict
+    codes: dict
+    projects: np.ndarray
+    trees: np.ndarray
+    multi_goal_projects: np.ndarray
+    # cell x goal category and cell x tree type measures; the categories and types in multi-hot column order
+    goal_categories: list
+    goal_projects: np.ndarray
+    goal_trees: np.ndarray
+    tree_types: list
+    tree_type_projects: np.ndarray
+    # cell x bitset of the cities the cell's projects are in (as np.packbits), or None when too large
+    city_sketches: np.ndarray = None
+    # sorted distinct TES values, and cell x count of projects with each value, or None when too many values
+    tes_values: np.ndarray = None
+    tes_histogram: np.ndarray = None
+
+
+def _cell_sums(cell_of_row, n_cells, matrix):
+    # Column sums per cell of a rows x columns matrix
+    if matrix.shape[1] == 0:
+        return np.zeros((n_cells, 0), dtype=np.int64)
+    return pd.DataFrame(matrix).groupby(cell_of_row).sum().reindex(range(n_cells), fill_value=0).to_numpy(dtype=np.int64)
+
+
+def _city_sketches(cell_of_row, n_cells, cities):
+    city_codes, city_values = pd.factorize(cities)
+    row_bytes = (len(city_values) + 7) // 8
+    if n_cells * row_bytes > MAX_SKETCH_BYTES:
+        logger.info("City bitsets skipped: %d cells x %d cities exceed %d bytes", n_cells, len(city_values), MAX_SKETCH_BYTES)
+        return None
+    known = city_codes >= 0
+    pairs = np.unique(cell_of_row[known].astype(np.int64) * len(city_values) + city_codes[known])
+    cells, codes = pairs // max(len(city_values), 1), pairs % max(len(city_values), 1)
+    # Bit layout of np.packbits: the first city is the high bit of the first byte
+    sketches = np.zeros((n_cells, row_bytes), dtype=np.uint8)
+    np.bitwise_or.at(sketches, (cells, codes >> 3), (0x80 >> (codes & 7)).astype(np.uint8))
+    return sketches
+
+
+def _tes_histogram(cell_of_row, n_cells, tes):
+    known = tes.notna().to_numpy()
+    values, value_codes = np.unique(tes.to_numpy(dtype=float)[known], return_inverse=True)
+    if len(values) > MAX_HISTOGRAM_VALUES:
+        logger.info("TES histograms skipped: %d distinct scores exceed %d", len(values), MAX_HISTOGRAM_VALUES)
+        return None, None
+    counts = np.bincount(cell_of_row[known] * len(values) + value_codes, minlength=n_cells * len(values))
+    return values, counts.reshape(n_cells, len(values)).astype(np.int32)
+
+
+def build_rollup_cube(df, dataset_version=None):
+    """
+    Aggregates the projects of `df` into the cells of the rollup cube.
+    """
+    start = time.perf_counter()
+    dimensions = [column for column in DIMENSIONS if column in df.columns]
+    labels, row_codes = {}, {}
+    for column in dimensions:
+        row_codes[column], uniques = pd.factorize(df[column])
+        labels[column] = list(uniques)
+
+    # Mixed-radix cell key over the dimension codes, shifted by one so missing values get their own cells
+    key = np.zeros(len(df), dtype=np.int64)
+    for column in dimensions:
+        key = key * (len(labels[column]) + 1) + row_codes[column] + 1
+    _, first, cell_of_row = np.unique(key, return_index=True, return_inverse=True)
+    cell_of_row = cell_of_row.reshape(-1)
+    n_cells = len(first)
+
+    goal_matrix = multi_hot(df, GOAL_CATEGORY_COLUMN_PREFIX)
+    tree_type_matrix = multi_hot(df, TREE_TYPE_COLUMN_PREFIX)
+    trees = df[TREES_COLUMN].to_numpy(dtype=np.int64)
+    goal_values = goal_matrix.to_numpy(dtype=np.int64)
+    tes_values, tes_histogram = _tes_histogram(cell_of_row, n_cells, df["TES"]) if "TES" in df.columns else (None, None)
+
+    cube = RollupCube(
+        dataset_version=dataset_version,
+        labels=labels,
+        codes={column: row_codes[column][first] for column in dimensions},
+        projects=np.bincount(cell_of_row, minlength=n_cells),
+        trees=np.bincount(cell_of_row, weights=trees, minlength=n_cells).astype(np.int64),
+        multi_goal_projects=np.bincount(cell_of_row, weights=goal_values.sum(axis=1) > 1, minlength=n_cells).astype(np.int64),
+        goal_categories=list(goal_matrix.columns),
+        goal_projects=_cell_sums(cell_of_row, n_cells, goal_values),
+        goal_trees=_cell_sums(cell_of_row, n_cells, goal_values * trees[:, None]),
+        tree_types=list(tree_type_matrix.columns),
+        tree_type_projects=_cell_sums(cell_of_row, n_cells, tree_type_matrix.to_numpy(dtype=np.int64)),
+        city_sketches=_city_sketches(cell_of_row, n_cells, df[CITY_COLUMN]) if CITY_COLUMN in df.columns else None,
+        tes_values=tes_values,
+        tes_histogram=tes_histogram,
+    )
+    logger.info("Built rollup cube of %d cells over %d rows in %.3fs", n_cells, len(df), time.perf_counter() - start)
+    return cube
+
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def _cached_rollup_cube(dataset_version, _df):
+    return build_rollup_cube(_df, dataset_version)
+
+
+def get_rollup_cube(df):
+    """
+    Returns the process-wide rollup cube for the loaded dataset, rebuilt only when its version changes.
+    """
+    return _cached_rollup_cube(df.attrs.get("dataset_version", len(df)), df)
+
+
+def select_cells(cube, selection):
+    """
+    Returns the mask of the cells matching a canonical selection (see `filter_index.canonical_selection`).
+    Like the row filters, a narrowing selection never matches missing values.
+    """
+    cells = np.ones(len(cube.projects), dtype=bool)
+    for column, values in selection:
+        chosen = set(values)
+        codes = [code for code, label in enumerate(cube.labels.get(column, [])) if label in chosen]
+        cells &= np.isin(cube.codes[column], codes) if column in cube.codes else False
+    return cells
+
+
+def _distinct(cube, column, cells):
+    if column not in cube.codes:
+        return 0
+    codes = cube.codes[column][cells]
+    return len(np.unique(codes[codes >= 0]))
+
+
+def _median(values, counts):
+    total = counts.sum()
+    if total == 0:
+        return np.nan
+    ranks = np.cumsum(counts)
+    # The value at the middle rank, or the mean of the two middle ones
+    lower, upper = values[np.searchsorted(ranks, [(total - 1) // 2 + 1, total // 2 + 1])]
+    return (lower + upper) / 2
+
+
+def rollup_metrics(cube, selection, df=None):
+    """
+    Returns the dashboard's summary measures of the projects matching `selection`, from the cube's cells.
+    The city count and median TES come from the rows of `df` (the filtered projects) when the cube
+    couldn't keep their sketches.
+    """
+    cells = select_cells(cube, selection)
+    high_priority = np.zeros(len(cells), dtype=bool)
+    if PRIORITY_COLUMN in cube.codes:
+        high_codes = [code for code, label in enumerate(cube.labels[PRIORITY_COLUMN]) if label in HIGH_PRIORITY_BANDS]
+        high_priority = np.isin(cube.codes[PRIORITY_COLUMN], high_codes)
+
+    if cube.city_sketches is not None:
+        cities = int(np.unpackbits(np.bitwise_or.reduce(cube.city_sketches[cells], axis=0)).sum()) if cells.any() else 0
+    else:
+        cities = df[CITY_COLUMN].nunique() if df is not None and CITY_COLUMN in df.columns else None
+    if cube.tes_histogram is not None:
+        median_tes = _median(cube.tes_values, cube.tes_histogram[cells].sum(axis=0))
+    else:
+        median_tes = df["TES"].median() if df is not None and "TES" in df.columns else None
+
+    goal_projects = cube.goal_projects[cells].sum(axis=0)
+    return {
+        "projects": int(cube.projects[cells].sum()),
+        "trees": int(cube.trees[cells].sum()),
+        "organizations": _distinct(cube, ORGANIZATION_COLUMN, cells),
+        "states": _distinct(cube, STATE_COLUMN, cells),
+        "cities": cities,
+        "median_tes": median_tes,
+        "high_priority_projects": int(cube.projects[cells & high_priority].sum()),
+        "multi_goal_projects": int(cube.multi_goal_projects[cells].sum()),
+        "goal_projects": pd.Series(goal_projects, index=cube.goal_categories),
+        "goal_trees": pd.Series(cube.goal_trees[cells].sum(axis=0), index=cube.goal_categories),
+    }
+
+
+def rollup_tree_type_organizations(cube, selection):
+    """
+    Returns the number of organizations with projects of each tree type among the projects matching `selection`.
+    """
+    cells = select_cells(cube, selection)
+    organizations = cube.codes.get(ORGANIZATION_COLUMN, np.full(len(cells), -1))[cells]
+    has_type = cube.tree_type_projects[cells] > 0
+    counts = [len(np.unique(organizations[has_type[:, i] & (organizations >= 0)])) for i in range(len(cube.tree_types))]
+    return pd.Series(counts, index=cube.tree_types, dtype=np.int64)
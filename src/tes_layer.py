@@ -0,0 +1,468 @@
+import argparse
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from functools import cached_property
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING
+
+import numpy as np
+import pandas as pd
+import shapely
+import streamlit as st
+
+if TYPE_CHECKING:
+    import geopandas as gpd
+
+logger = logging.getLogger(__name__)
+
+# Block group Tree Equity Score files, one per state covered by the initiative
+TES_SOURCE_FILES = (
+    "data/il_tes.geojson",
+    "data/in_tes.geojson",
+    "data/wi_tes.geojson",
+)
+
+# Pre-built columnar copy of the sources, written by `python -m src.tes_layer build-store`
+TES_STORE_DIR = "data/tes_store"
+TES_STORE_FILE = os.path.join(TES_STORE_DIR, "tes.parquet")
+TES_MANIFEST_FILE = os.path.join(TES_STORE_DIR, "manifest.json")
+# Source hashes by size and modification time, so each source is hashed once per checkout instead of on every
+# cold start. Local to the checkout, not committed
+TES_HASH_CACHE_FILE = "data/.tes_source_hashes.json"
+
+# Block group identifier column names seen across TES releases, normalized to GEOID
+TES_ID_COLUMNS = ("GEOID", "geoid", "GEOID20", "bgid")
+
+# Simplification tolerance (degrees) per detail level; "full" keeps the source geometry untouched. Coverage
+# simplification drops a vertex when its triangle is smaller than tolerance squared, so tolerances much below
+# the block groups' edge detail (~0.002 degrees) remove nothing. Check each level with `python -m src.tes_layer report`
+TES_DETAIL_LEVELS = {"full": 0.0, "high": 0.002, "medium": 0.004, "low": 0.01}
+DEFAULT_TES_DETAIL = "medium"
+# Decimal places kept in simplified coordinates (1e-5 degrees is roughly 1 m)
+TES_COORDINATE_PRECISION = 5
+# Padding (degrees) added around the filtered projects when clipping the layer to them
+TES_CLIP_PADDING = 0.25
+
+# Layers loaded in this process by (fingerprint, paths, detail), shared by every session and the figure prewarm thread
+_loaded_layers = {}
+_loading_locks = {}
+_layers_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class TesLayer:
+    """
+    The Tree Equity Score background layer, shared read-only by every session.
+    """
+    gdf: "gpd.GeoDataFrame"
+    fingerprint: tuple
+    source: str
+    detail: str
+    tree: shapely.STRtree
+    state_positions: dict
+
+    @cached_property
+    def geojson(self):
+        # Serialized on first use only: the spatial join needs the full-detail polygons but never their GeoJSON
+        start = time.perf_counter()
+        geojson = layer_geojson(self.gdf)
+        logger.info("Serialized %s TES layer to GeoJSON in %.2fs", self.detail, time.perf_counter() - start)
+        return geojson
+
+
+def file_stat(path):
+    """
+    Returns (path, size, modification time), with empty stats when the file is missing.
+    """
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return (path, None, None)
+    return (path, stat.st_size, stat.st_mtime_ns)
+
+
+def source_fingerprint(paths=TES_SOURCE_FILES):
+    """
+    Returns a cheap fingerprint (path, size, modification time) of the TES store and source files.
+    Missing files are recorded with empty stats so adding or removing one also changes it.
+    """
+    return tuple(file_stat(path) for path in (TES_STORE_FILE, TES_MANIFEST_FILE, *paths))
+
+
+def file_sha256(path):
+    """
+    Returns the SHA-256 hex digest of a file, read in 1 MiB blocks.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def cached_file_sha256(path, cache_file=TES_HASH_CACHE_FILE):
+    """
+    Returns a file's SHA-256, reusing the digest recorded in `cache_file` while the file's size and modification
+    time are unchanged. The cache is best effort: where it can't be written, files are hashed every time.
+    """
+    _, size, mtime = file_stat(path)
+    try:
+        with open(cache_file) as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        cache = {}
+    entry = cache.get(path)
+    if entry is not None and entry[:2] == [size, mtime]:
+        return entry[2]
+    digest = file_sha256(path)
+    cache[path] = [size, mtime, digest]
+    try:
+        with open(cache_file, "w") as f:
+            json.dump(cache, f, indent=2, sort_keys=True)
+    except OSError as e:
+        logger.debug("Could not write the TES source hash cache %s: %s", cache_file, e)
+    return digest
+
+
+def _state_from_path(path):
+    # "data/il_tes.geojson" -> "IL"
+    return os.path.basename(path).split("_")[0].upper()
+
+
+def read_tes_sources(paths=TES_SOURCE_FILES):
+    """
+    Reads the TES GeoJSON files into one frame with GEOID (when available), state, tes and geometry.
+    """
+    # GeoPandas is only imported once the TES layer is actually read, keeping it off the app's startup path
+    import geopandas as gpd
+
+    list_of_gdfs = []
+    for path in paths:
+        gdf = gpd.read_file(path)
+        id_col = next((col for col in TES_ID_COLUMNS if col in gdf.columns), None)
+        columns = {"state": _state_from_path(path), "tes": gdf["tes"]}
+        if id_col is not None:
+            columns = {"GEOID": gdf[id_col].astype(str), **columns}
+        list_of_gdfs.append(gpd.GeoDataFrame(columns, geometry=gdf.geometry, crs=gdf.crs))
+    return pd.concat(list_of_gdfs, ignore_index=True)
+
+
+def level_store_file(detail):
+    """
+    Returns the store path for a detail level ("full" is the main store file).
+    """
+    if detail == "full":
+        return TES_STORE_FILE
+    return os.path.join(TES_STORE_DIR, f"tes_{detail}.parquet")
+
+
+def simplify_tes_geometry(tes_data, tolerance, precision=TES_COORDINATE_PRECISION):
+    """
+    Returns a copy of the layer simplified to `tolerance` degrees, with coordinates rounded to `precision` decimals.
+    Block groups are simplified as one coverage, so neighbouring polygons keep their shared edges (no gaps or slivers).
+    """
+    import geopandas as gpd
+
+    geoms = np.asarray(tes_data.geometry.array)
+    if hasattr(shapely, "coverage_simplify"):
+        simplified = shapely.coverage_simplify(geoms, tolerance)
+    else:
+        # Older GEOS builds: per-polygon simplification, which can open hairline gaps between neighbours
+        simplified = shapely.simplify(geoms, tolerance, preserve_topology=True)
+    simplified = shapely.transform(simplified, lambda coords: np.round(coords, precision))
+    return tes_data.set_geometry(gpd.GeoSeries(simplified, index=tes_data.index, crs=tes_data.crs))
+
+
+def layer_geojson(tes_data):
+    """
+    Returns the GeoJSON dict sent to the browser: geometry and feature ids only, since scores travel as `z`.
+    """
+    return tes_data.geometry.__geo_interface__
+
+
+def geojson_payload_bytes(geojson):
+    """
+    Returns the size of a GeoJSON dict serialized compactly, as it is embedded in the figure JSON.
+    """
+    return len(json.dumps(geojson, separators=(",", ":")))
+
+
+def simplify_all_levels(tes_data):
+    """
+    Returns {detail: layer} for every detail level, reusing `tes_data` as the "full" level.
+    """
+    return {
+        detail: tes_data if detail == "full" else simplify_tes_geometry(tes_data, tolerance)
+        for detail, tolerance in TES_DETAIL_LEVELS.items()
+    }
+
+
+def payload_report(levels):
+    """
+    Returns a table of vertex counts and GeoJSON payload bytes for every detail level, relative to "full".
+    """
+    rows = []
+    for detail, level_data in levels.items():
+        rows.append({
+            "detail": detail,
+            "tolerance": TES_DETAIL_LEVELS[detail],
+            "block_groups": len(level_data),
+            "vertices": int(shapely.get_num_coordinates(np.asarray(level_data.geometry.array)).sum()),
+            "payload_bytes": geojson_payload_bytes(layer_geojson(level_data)),
+        })
+    report = pd.DataFrame(rows)
+    report["vertex_ratio"] = (report["vertices"] / report["vertices"].iloc[0]).round(3)
+    report["payload_ratio"] = (report["payload_bytes"] / report["payload_bytes"].iloc[0]).round(3)
+    return report
+
+
+def source_hashes(paths=TES_SOURCE_FILES):
+    """
+    Returns {path: SHA-256} for the TES source files present on disk.
+    """
+    return {path: cached_file_sha256(path) for path in paths if os.path.exists(path)}
+
+
+def manifest_sources(manifest_file):
+    """
+    Returns the {path: SHA-256} of the sources recorded in a build manifest.
+    """
+    with open(manifest_file) as f:
+        return json.load(f).get("sources", {})
+
+
+def manifest_is_current(manifest_file, paths=TES_SOURCE_FILES):
+    """
+    Checks the source hashes recorded in a build manifest against the sources that are present on disk.
+    Sources are only rehashed after their size or modification time changes (see `cached_file_sha256`).
+    A deployment that only ships the built assets (no GeoJSON) is considered current.
+    """
+    recorded = manifest_sources(manifest_file)
+    for path in paths:
+        if os.path.exists(path) and recorded.get(path) != cached_file_sha256(path):
+            return False
+    return True
+
+
+def build_tes_store(paths=TES_SOURCE_FILES):
+    """
+    Converts the TES GeoJSON sources into a GeoParquet store (WKB geometry) plus a manifest of source hashes.
+    """
+    start = time.perf_counter()
+    tes_data = read_tes_sources(paths)
+    os.makedirs(TES_STORE_DIR, exist_ok=True)
+    levels = simplify_all_levels(tes_data)
+    for detail, level_data in levels.items():
+        level_data.to_parquet(level_store_file(detail), compression="zstd", index=False)
+    report = payload_report(levels)
+    logger.info("TES payload by detail level:\n%s", report.to_string(index=False))
+    manifest = {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "format": "geoparquet",
+        "rows": len(tes_data),
+        "sources": source_hashes(paths),
+        "levels": report.set_index("detail").to_dict(orient="index"),
+    }
+    with open(TES_MANIFEST_FILE, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    logger.info(
+        "Wrote TES store %s (%d block groups) in %.2fs",
+        TES_STORE_FILE, len(tes_data), time.perf_counter() - start
+    )
+    return manifest
+
+
+def store_applies(paths=TES_SOURCE_FILES):
+    """
+    Returns whether the TES store was built from `paths`. Layers read from other sources (like the
+    benchmarks' synthetic ones) never use it, current or not.
+    """
+    return os.path.exists(TES_MANIFEST_FILE) and set(manifest_sources(TES_MANIFEST_FILE)) == set(paths)
+
+
+def _store_available(paths):
+    if not (os.path.exists(TES_STORE_FILE) and store_applies(paths)):
+        return False
+    if not manifest_is_current(TES_MANIFEST_FILE, paths):
+        logger.warning("TES store %s is stale; rebuild it with `python -m src.tes_layer build-store`", TES_STORE_FILE)
+        return False
+    return True
+
+
+def read_tes_data(paths=TES_SOURCE_FILES):
+    """
+    Returns (full-detail TES frame, "store" or "geojson"), preferring the GeoParquet store when it is current.
+    """
+    import geopandas as gpd
+
+    if _store_available(paths):
+        return gpd.read_parquet(TES_STORE_FILE), "store"
+    return read_tes_sources(paths), "geojson"
+
+
+def load_tes_layer(paths, detail, fingerprint=None, load_full=None):
+    """
+    Reads and indexes the TES layer at a detail level. Levels missing from the store are simplified from
+    `load_full()`, or from a fresh full read. Use `shared_tes_layer` or `get_tes_layer` to share one per process.
+    """
+    import geopandas as gpd
+
+    start = time.perf_counter()
+    if detail == "full":
+        tes_data, source = read_tes_data(paths)
+        source_name = TES_STORE_FILE if source == "store" else "GeoJSON sources"
+    else:
+        level_file = level_store_file(detail)
+        if os.path.exists(level_file) and _store_available(paths):
+            tes_data, source, source_name = gpd.read_parquet(level_file), "store", level_file
+        else:
+            full_layer = load_full() if load_full is not None else load_tes_layer(paths, "full", fingerprint)
+            tes_data = simplify_tes_geometry(full_layer.gdf, TES_DETAIL_LEVELS[detail])
+            source, source_name = "simplified", f"{full_layer.source} layer simplified in process"
+    read_seconds = time.perf_counter() - start
+
+    tree = shapely.STRtree(np.asarray(tes_data.geometry.array))
+    state_positions = {
+        state: np.flatnonzero(tes_data["state"].to_numpy() == state)
+        for state in tes_data["state"].unique()
+    } if "state" in tes_data.columns else {}
+    logger.info(
+        "Loaded %s TES layer from %s in %.2fs (read %.2fs, index %.2fs, %d block groups)",
+        detail, source_name, time.perf_counter() - start, read_seconds,
+        time.perf_counter() - start - read_seconds, len(tes_data)
+    )
+    return TesLayer(
+        gdf=tes_data, fingerprint=fingerprint, source=source, detail=detail,
+        tree=tree, state_positions=state_positions
+    )
+
+
+def _shared_layer(fingerprint, paths, detail):
+    key = (fingerprint, paths, detail)
+    with _layers_lock:
+        layer = _loaded_layers.get(key)
+        if layer is not None:
+            return layer
+        loading = _loading_locks.setdefault(key, threading.Lock())
+    # Concurrent callers wait for the first one's load instead of parsing a second copy
+    with loading:
+        with _layers_lock:
+            layer = _loaded_layers.get(key)
+        if layer is None:
+            layer = load_tes_layer(paths, detail, fingerprint, load_full=lambda: _shared_layer(fingerprint, paths, "full"))
+            with _layers_lock:
+                # Editing or replacing a store or source file drops the layers read from the old files
+                for stale in [k for k in _loaded_layers if k[1] == paths and k[0] != fingerprint]:
+                    del _loaded_layers[stale]
+                _loaded_layers[key] = layer
+                _loading_locks.pop(key, None)
+    return layer
+
+
+def _check_detail(detail):
+    if detail not in TES_DETAIL_LEVELS:
+        raise ValueError(f"Unknown TES detail level '{detail}'. Choose one of {list(TES_DETAIL_LEVELS)}.")
+
+
+def shared_tes_layer(detail=DEFAULT_TES_DETAIL, paths=TES_SOURCE_FILES):
+    """
+    Returns the process-wide TES layer at the requested detail level without going through Streamlit,
+    so threads outside a script run can share it with the sessions (see `get_tes_layer`).
+    """
+    _check_detail(detail)
+    paths = tuple(paths)
+    return _shared_layer(source_fingerprint(paths), paths, detail)
+
+
+# Keyed on the fingerprint, so editing or replacing a store or source file triggers a
+# rebuild and the stale entries are evicted. One entry per detail level. Holds the same
+# objects as the process-wide layers, adding only the loading spinner.
+@st.cache_resource(max_entries=len(TES_DETAIL_LEVELS), show_spinner="Loading Tree Equity Score layer...")
+def _build_tes_layer(fingerprint, paths, detail):
+    return _shared_layer(fingerprint, paths, detail)
+
+
+def get_tes_layer(detail=DEFAULT_TES_DETAIL, paths=TES_SOURCE_FILES):
+    """
+    Returns the process-wide TES layer at the requested detail level (see TES_DETAIL_LEVELS),
+    building it only when the store or source files change.
+    """
+    _check_detail(detail)
+    paths = tuple(paths)
+    return _build_tes_layer(source_fingerprint(paths), paths, detail)
+
+
+def select_tes_positions(layer, states=None, bounds=None):
+    """
+    Returns the sorted row positions of the block groups in `states` and/or intersecting
+    `bounds` (minx, miny, maxx, maxy), or None when no clipping applies.
+    States resolve through precomputed positions and bounds through the layer's STRtree,
+    so neither scans every polygon.
+    """
+    positions = None
+    if states is not None and set(layer.state_positions) - set(states):
+        state_arrays = [layer.state_positions[state] for state in states if state in layer.state_positions]
+        positions = np.sort(np.concatenate(state_arrays)) if state_arrays else np.array([], dtype=np.intp)
+    if bounds is not None:
+        in_bounds = np.sort(layer.tree.query(shapely.box(*bounds), predicate="intersects"))
+        positions = in_bounds if positions is None else np.intersect1d(positions, in_bounds, assume_unique=True)
+    return positions
+
+
+def locate_points(layer, lons, lats):
+    """
+    Returns the layer row position of the block group containing each point, or -1 when none does.
+    Runs one bulk STRtree query instead of a point-in-polygon test per row.
+    """
+    positions = np.full(len(lons), -1, dtype=np.intp)
+    points = shapely.points(np.asarray(lons, dtype=float), np.asarray(lats, dtype=float))
+    point_idx, tes_idx = layer.tree.query(points, predicate="intersects")
+    # A point on a shared boundary touches several block groups; keep the first match
+    point_idx, first = np.unique(point_idx, return_index=True)
+    positions[point_idx] = tes_idx[first]
+    return positions
+
+
+def clip_bounds(lons, lats, padding=TES_CLIP_PADDING):
+    """
+    Returns the padded bounding box (minx, miny, maxx, maxy) around a set of project coordinates.
+    """
+    return (lons.min() - padding, lats.min() - padding, lons.max() + padding, lats.max() + padding)
+
+
+def subset_geojson(layer, positions):
+    """
+    Returns a FeatureCollection holding only the features at `positions`, reusing the prebuilt feature dicts.
+    """
+    if positions is None:
+        return layer.geojson
+    features = layer.geojson["features"]
+    return {"type": "FeatureCollection", "features": [features[i] for i in positions]}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build assets for the Tree Equity Score map layer.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("build-store", help="Convert the TES GeoJSON files into the GeoParquet store.")
+    subparsers.add_parser("report", help="Print the GeoJSON payload size of every detail level.")
+    subparsers.add_parser("build-raster", help="Render the TES layer to PNG overlays for the raster map mode.")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    if args.command == "build-store":
+        build_tes_store()
+    elif args.command == "report":
+        levels = simplify_all_levels(read_tes_data()[0])
+        print(payload_report(levels).to_string(index=False))
+    elif args.command == "build-raster":
+        from src.tes_raster import build_tes_raster
+        build_tes_raster()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+import base64
+import io
+import json
+import logging
+import os
+import time
+from datetime import datetime, timezone
+
+import shapely
+import streamlit as st
+
+from src.tes_layer import TES_SOURCE_FILES, file_stat, manifest_is_current, read_tes_data, source_fingerprint, source_hashes
+
+logger = logging.getLogger(__name__)
+
+# Pre-rendered PNG overlays of the TES layer, written by `python -m src.tes_layer build-raster`
+TES_RASTER_DIR = "data/tes_raster"
+TES_RASTER_MANIFEST_FILE = os.path.join(TES_RASTER_DIR, "manifest.json")
+
+# Overlay width in pixels per level, and the lowest map zoom each level is shown from
+TES_RASTER_LEVELS = {
+    "low": {"width": 1024, "min_zoom": 0},
+    "medium": {"width": 2048, "min_zoom": 6},
+    "high": {"width": 4096, "min_zoom": 8},
+}
+
+# Same colouring as the vector choropleth
+TES_COLORMAP = "RdYlGn"
+
+
+def raster_file(level):
+    return os.path.join(TES_RASTER_DIR, f"tes_{level}.png")
+
+
+def raster_level_for_zoom(zoom):
+    """
+    Returns the sharpest raster level meant for the given map zoom.
+    """
+    eligible = [level for level, spec in TES_RASTER_LEVELS.items() if zoom >= spec["min_zoom"]]
+    return max(eligible, key=lambda level: TES_RASTER_LEVELS[level]["width"])
+
+
+def render_tes_png(tes_mercator, bounds, width, path):
+    """
+    Renders Web Mercator TES polygons to a transparent PNG that exactly covers `bounds`.
+    The image is stored as a 256-colour palette PNG, which is several times smaller than RGBA.
+    """
+    # Imported here so the dashboard process never loads Matplotlib for the raster mode
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+    from PIL import Image
+
+    minx, miny, maxx, maxy = bounds
+    height = max(1, round(width * (maxy - miny) / (maxx - minx)))
+    dpi = 100
+    fig = Figure(figsize=(width / dpi, height / dpi), dpi=dpi)
+    FigureCanvasAgg(fig)
+    ax = fig.add_axes([0, 0, 1, 1])
+    ax.set_axis_off()
+    tes_mercator.plot(column="tes", cmap=TES_COLORMAP, vmin=0, vmax=100, linewidth=0, ax=ax)
+    ax.set_xlim(minx, maxx)
+    ax.set_ylim(miny, maxy)
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png", dpi=dpi, transparent=True)
+    buffer.seek(0)
+    image = Image.open(buffer).quantize(colors=256, method=Image.Quantize.FASTOCTREE)
+    image.save(path, optimize=True)
+    return width, height
+
+
+def build_tes_raster(paths=TES_SOURCE_FILES):
+    """
+    Renders the TES layer to one PNG overlay per raster level plus a manifest with the
+    overlay corner coordinates and source hashes.
+    """
+    # Only building the overlays reprojects; the map's raster mode never loads geopandas
+    import geopandas as gpd
+
+    start = time.perf_counter()
+    tes_data, _ = read_tes_data(paths)
+    # Mapbox stretches image sources in Web Mercator, so render in that projection
+    tes_mercator = tes_data.to_crs(epsg=3857)
+    bounds = tuple(tes_mercator.total_bounds)
+    minlon, minlat, maxlon, maxlat = gpd.GeoSeries([shapely.box(*bounds)], crs=3857).to_crs(epsg=4326).total_bounds
+
+    os.makedirs(TES_RASTER_DIR, exist_ok=True)
+    levels = {}
+    for level, spec in TES_RASTER_LEVELS.items():
+        level_start = time.perf_counter()
+        width, height = render_tes_png(tes_mercator, bounds, spec["width"], raster_file(level))
+        levels[level] = {"width": width, "height": height, "bytes": os.path.getsize(raster_file(level))}
+        logger.info(
+            "Rendered %s TES raster (%dx%d, %d bytes) in %.2fs",
+            level, width, height, levels[level]["bytes"], time.perf_counter() - level_start
+        )
+
+    manifest = {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        # Top left, top right, bottom right, bottom left, as Mapbox image sources expect
+        "coordinates": [[minlon, maxlat], [maxlon, maxlat], [maxlon, minlat], [minlon, minlat]],
+        "levels": levels,
+        "sources": source_hashes(paths),
+    }
+    with open(TES_RASTER_MANIFEST_FILE, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    logger.info("Wrote TES rasters to %s in %.2fs", TES_RASTER_DIR, time.perf_counter() - start)
+    return manifest
+
+
+@st.cache_resource(max_entries=len(TES_RASTER_LEVELS), show_spinner=False)
+def _load_tes_raster(fingerprint, paths, level):
+    if not manifest_is_current(TES_RASTER_MANIFEST_FILE, paths):
+        raise RuntimeError("The TES raster overlays are out of date. Rebuild them with `python -m src.tes_layer build-raster`.")
+    with open(TES_RASTER_MANIFEST_FILE) as f:
+        manifest = json.load(f)
+    with open(raster_file(level), "rb") as f:
+        encoded = base64.b64encode(f.read()).decode("ascii")
+    return {
+        "source": f"data:image/png;base64,{encoded}",
+        "coordinates": manifest["coordinates"],
+    }
+
+
+def get_tes_raster(zoom, paths=TES_SOURCE_FILES):
+    """
+    Returns the process-wide {"source": data URI, "coordinates": corners} overlay for the given map zoom.
+    Raises FileNotFoundError when the overlays haven't been built, and RuntimeError when they are out of date.
+    """
+    level = raster_level_for_zoom(zoom)
+    paths = tuple(paths)
+    raster_stats = (file_stat(TES_RASTER_MANIFEST_FILE), file_stat(raster_file(level)))
+    for path, size, _ in raster_stats:
+        if size is None:
+            raise FileNotFoundError(path)
+    return _load_tes_raster(raster_stats + source_fingerprint(paths), paths, level)
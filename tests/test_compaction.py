@@ -0,0 +1,64 @@
+"""
+Tests for the compacted project frame: its list columns must keep reading as lists through the
+frame operations the dashboard applies (filters, copies, concatenation and merges).
+"""
+import copy
+
+import pandas as pd
+import pytest
+
+from src.compaction import compact_project_frame, count_totals, joined_values, list_values, with_list_values
+
+
+@pytest.fixture
+def frames():
+    """
+    A small cleaned frame and its compacted copy.
+    """
+    df = pd.DataFrame({
+        'Organization Name': ['Grace Church', 'Hope Center', 'Grace Church', 'St. Mark'],
+        '# Trees To Be Planted': [10, 3, 7, 25],
+        'Cleaned Species': [['Maple', 'Oak'], [], ['Oak'], ['Pine', 'Redbud']],
+        'Goal Categories': [['Youth & Education'], ['Community Building'], [], ['Youth & Education']],
+        'Goal Term Counts': [{'tree': 2, 'youth': 1}, {}, {'tree': 1}, {'garden': 3, 'tree': 4}],
+    })
+    return df, compact_project_frame(df)
+
+
+OPERATIONS = {
+    'filter': lambda df: df[df['# Trees To Be Planted'] > 5],
+    'slice': lambda df: df.iloc[1:3],
+    'copy': lambda df: df.copy(),
+    'deepcopy': copy.deepcopy,
+    'concat': lambda df: pd.concat([df.iloc[2:], df.iloc[:2]]),
+    'merge': lambda df: df.merge(
+        pd.DataFrame({'Organization Name': ['Grace Church', 'St. Mark'], 'State': ['IL', 'WI']}), on='Organization Name'
+    ),
+}
+
+
+def test_compacted_columns_read_as_lists(frames):
+    df, compact = frames
+    assert compact['Cleaned Species'].iloc[0] == ['Maple', 'Oak']
+    assert compact['Cleaned Species'].tolist() == df['Cleaned Species'].tolist()
+    assert list_values(compact, 'Goal Term Counts').tolist() == df['Goal Term Counts'].tolist()
+    assert with_list_values(compact)['Goal Categories'].tolist() == df['Goal Categories'].tolist()
+
+
+@pytest.mark.parametrize('operation', OPERATIONS.values(), ids=OPERATIONS.keys())
+def test_compacted_columns_survive_frame_operations(frames, operation):
+    df, compact = frames
+    expected, result = operation(df), operation(compact)
+    for column in ('Cleaned Species', 'Goal Categories'):
+        assert result[column].tolist() == expected[column].tolist()
+        assert list_values(result, column).tolist() == expected[column].tolist()
+        assert joined_values(result, column).tolist() == joined_values(expected, column).tolist()
+    assert list_values(result, 'Goal Term Counts').tolist() == expected['Goal Term Counts'].tolist()
+    assert count_totals(result, 'Goal Term Counts') == count_totals(expected, 'Goal Term Counts')
+
+
+def test_separately_compacted_frames_concatenate(frames):
+    df, _ = frames
+    combined = pd.concat([compact_project_frame(df.iloc[:2]), compact_project_frame(df.iloc[2:])])
+    assert combined['Cleaned Species'].tolist() == df['Cleaned Species'].tolist()
+    assert count_totals(combined, 'Goal Term Counts') == {'tree': 7, 'youth': 1, 'garden': 3}
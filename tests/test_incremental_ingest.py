@@ -0,0 +1,80 @@
+"""
+Tests for incremental ingestion: `update_project_data` must give the frame a full build gives,
+and must not reclean rows whose raw content is unchanged.
+"""
+import os
+
+import pandas as pd
+import pytest
+
+from src import data_cleaner
+from src.data_cleaner import (
+    DEFAULT_FILE_PATHS, ROW_HASH_COLUMN, build_project_data, read_processed_data, update_project_data, write_processed_data
+)
+
+
+@pytest.fixture
+def csv_paths(tmp_path):
+    """
+    Copies of the raw CSVs, with one application missing its location so the cleaning stages drop it.
+    """
+    paths = {name: str(tmp_path / os.path.basename(path)) for name, path in DEFAULT_FILE_PATHS.items()}
+    original = pd.read_csv(DEFAULT_FILE_PATHS['original_data'])
+    original.loc[5, 'Latitude'] = None
+    original.to_csv(paths['original_data'], index=False)
+    pd.read_csv(DEFAULT_FILE_PATHS['new_data']).to_csv(paths['new_data'], index=False)
+    return paths
+
+
+@pytest.fixture
+def recleaned(monkeypatch):
+    """
+    Records the number of rows each call to `clean_project_rows` gets.
+    """
+    calls = []
+    clean_project_rows = data_cleaner.clean_project_rows
+
+    def counting_clean_project_rows(df_merged, *args, **kwargs):
+        calls.append(len(df_merged))
+        return clean_project_rows(df_merged, *args, **kwargs)
+
+    monkeypatch.setattr(data_cleaner, 'clean_project_rows', counting_clean_project_rows)
+    return calls
+
+
+def test_incremental_update_equals_full_build(csv_paths):
+    original = pd.read_csv(csv_paths['original_data'])
+    original.iloc[:40].to_csv(csv_paths['original_data'], index=False)
+    snapshot = build_project_data(csv_paths)
+
+    # Grow to the full CSV, with one row changed and one removed
+    original.loc[12, '# Trees To Be Planted'] += 5
+    original.drop(index=20).to_csv(csv_paths['original_data'], index=False)
+    incremental = update_project_data(csv_paths, snapshot)
+
+    full = build_project_data(csv_paths)
+    pd.testing.assert_frame_equal(incremental, full)
+    assert incremental.attrs['dropped_row_hashes'] == full.attrs['dropped_row_hashes']
+
+
+def test_unchanged_input_recomputes_no_rows(csv_paths, recleaned):
+    full = build_project_data(csv_paths)
+    assert len(full.attrs['dropped_row_hashes']) == 1
+    recleaned.clear()
+
+    incremental = update_project_data(csv_paths, full)
+    assert recleaned == []
+    pd.testing.assert_frame_equal(incremental, full)
+
+
+def test_dropped_rows_survive_the_artifact(csv_paths, recleaned, tmp_path):
+    path = str(tmp_path / "projects.parquet")
+    full = build_project_data(csv_paths)
+    write_processed_data(full, {}, path)
+    snapshot = read_processed_data(path)
+    assert snapshot.attrs['dropped_row_hashes'] == full.attrs['dropped_row_hashes']
+    recleaned.clear()
+
+    incremental = update_project_data(csv_paths, snapshot)
+    assert recleaned == []
+    assert incremental[ROW_HASH_COLUMN].tolist() == full[ROW_HASH_COLUMN].tolist()